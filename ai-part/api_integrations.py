@@ -7,31 +7,96 @@ This module provides multiple approaches for getting product data:
 4. Cached image services and CDNs
 """
 
-import requests
-import json
+import contextvars
+import math
 import re
 from typing import List, Dict, Optional
 from urllib.parse import quote, urljoin
+import os
 import time
 import random
-from bs4 import BeautifulSoup
+import threading
+from concurrent.futures import (CancelledError, ThreadPoolExecutor,
+                                TimeoutError as FutureTimeoutError, wait as futures_wait)
 import logging
 
+from circuit_breaker import UpstreamClock, get_breakers, timing_upstream, upstream_call
+from http_client import create_session
+from html_parsing import (STREAM_CHUNK_SIZE, extract_ebay_listings,
+                          get_parser_backend, parse_result_containers,
+                          stream_ebay_listings)
+from rate_limiter import deadline, get_rate_limiter
+from singleflight import get_single_flight, request_key
+
 logger = logging.getLogger(__name__)
 
+SERPAPI_URL = "https://serpapi.com/search.json"
+
+# Extra headers sent with Amazon search requests
+AMAZON_HEADERS = {
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+    'Accept-Encoding': 'gzip, deflate, br',
+    'Referer': 'https://www.amazon.com/',
+}
+
+# Per-source time budgets (seconds) for the concurrent fan-out
+DEFAULT_SOURCE_TIMEOUTS = {
+    'google_shopping': 8.0,
+    'amazon': 6.0,
+    'ebay': 6.0,
+    'aliexpress': 2.0,
+}
+
+
+# Breaker for the Google Shopping page scrape that backs up SerpAPI
+GOOGLE_SCRAPE_BREAKER = 'google_shopping_scrape'
+
+
+# Markers of bot-check pages that marketplaces serve with a 200 status
+BLOCK_PAGE_MARKERS = (
+    b'/errors/validatecaptcha',
+    b'enter the characters you see below',
+    b'pardon our interruption',
+)
+
+
+def is_captcha_page(content) -> bool:
+    """Detect captcha / bot-check pages (they are small, so only the head is checked)"""
+    if isinstance(content, str):
+        content = content.encode('utf-8', 'ignore')
+    head = (content or b'')[:20000].lower()
+    return any(marker in head for marker in BLOCK_PAGE_MARKERS)
+
 
 class ProductAPIManager:
     """
     Manages multiple product data sources and APIs
     """
 
-    def __init__(self):
-        self.session = requests.Session()
+    def __init__(self, concurrent: Optional[bool] = None, max_workers: Optional[int] = None,
+                 source_timeouts: Optional[Dict[str, float]] = None):
+        # Pooled session with default timeouts and retries
+        self.session = create_session()
         self.setup_session()
 
+        # Concurrent fan-out settings (env overridable)
+        if concurrent is None:
+            concurrent = os.getenv(
+                'PRODUCT_SEARCH_CONCURRENT', 'True').lower() == 'true'
+        self.concurrent = concurrent
+        # Enough workers by default for every source of every category
+        # searched in parallel, so fan-outs do not queue behind each other
+        self.max_workers = max_workers or int(os.getenv('PRODUCT_SOURCE_WORKERS', 0)) or (
+            int(os.getenv('CATEGORY_SEARCH_PARALLELISM', 5)) * len(DEFAULT_SOURCE_TIMEOUTS))
+        self.source_timeouts = dict(DEFAULT_SOURCE_TIMEOUTS)
+        if source_timeouts:
+            self.source_timeouts.update(source_timeouts)
+        self._executor = None
+        self._executor_lock = threading.Lock()
+
         # Load API configurations from .env file
         try:
-            import os
             from dotenv import load_dotenv
             
             load_dotenv()
@@ -43,13 +108,19 @@ class ProductAPIManager:
             }
         except ImportError:
             # Fallback if python-dotenv is not installed
-            import os
             self.api_configs = {
             'serpapi_key': os.getenv('SERPAPI_KEY', ''),
             'rapidapi_key': os.getenv('RAPIDAPI_KEY', ''),
             'amazon_tag': os.getenv('AMAZON_ASSOCIATES_TAG', ''),
             }
 
+        # Shared per-host limiter for every upstream request
+        self.rate_limiter = get_rate_limiter()
+        # Per-source circuit breakers
+        self.breakers = get_breakers()
+        # Identical concurrent fetches share one upstream request
+        self.flights = get_single_flight()
+
     def setup_session(self):
         """Setup requests session with proper headers"""
         self.session.headers.update({
@@ -62,21 +133,47 @@ class ProductAPIManager:
             'Upgrade-Insecure-Requests': '1',
         })
 
-    def search_products_multi_source(self, query: str, max_results: int = 6) -> List[Dict]:
+    def _get(self, url: str, **kwargs):
+        """Session GET that waits for the host's rate-limit budget"""
+        self.rate_limiter.acquire(url)
+        with upstream_call():
+            return self.session.get(url, **kwargs)
+
+    def _fetch(self, url: str, **kwargs) -> tuple:
+        """GET a page as (status, content), sharing identical in-flight fetches"""
+        def fetch():
+            response = self._get(url, **kwargs)
+            return response.status_code, response.content
+
+        return self.flights.do(request_key(url), fetch)
+
+    def get_sources(self) -> List[tuple]:
+        """Return (name, search function) pairs in order of preference"""
+        return [
+            ('google_shopping', self.search_google_shopping_api),
+            ('amazon', self.search_amazon_improved),
+            ('ebay', self.search_ebay_improved),
+            ('aliexpress', self.search_aliexpress_improved),
+        ]
+
+    def search_products_multi_source(self, query: str, max_results: int = 6,
+                                     concurrent: Optional[bool] = None) -> List[Dict]:
         """
         Search for products using multiple sources and APIs
         """
+        if concurrent is None:
+            concurrent = self.concurrent
+
+        if concurrent:
+            return self._search_concurrent(query, max_results)
+
         all_products = []
 
         # Try different sources in order of preference
-        sources = [
-            self.search_google_shopping_api,
-            self.search_amazon_improved,
-            self.search_ebay_improved,
-            self.search_aliexpress_improved,
-        ]
+        sources = [func for _, func in self.get_sources()]
 
-        results_per_source = max(1, max_results // len(sources))
+        # Rounded up so the sources together can fill max_results
+        results_per_source = math.ceil(max_results / len(sources))
 
         for source_func in sources:
             if len(all_products) >= max_results:
@@ -85,13 +182,106 @@ class ProductAPIManager:
             try:
                 products = source_func(query, results_per_source)
                 all_products.extend(products)
-                time.sleep(1)  # Rate limiting
             except Exception as e:
                 logger.error(f"Error in {source_func.__name__}: {str(e)}")
                 continue
 
         return all_products[:max_results]
 
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Lazily create the bounded worker pool shared by all searches"""
+        # Parallel category searches can get here at the same time
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix='product-source')
+            return self._executor
+
+    def _search_concurrent(self, query: str, max_results: int) -> List[Dict]:
+        """
+        Query all sources in parallel and merge results in source-preference order.
+        A source's timeout runs from when a worker picks it up. A source that
+        misses it is skipped (its worker finishes in the background); one still
+        queued after its timeout is cancelled.
+        """
+        sources = self.get_sources()
+        results_per_source = math.ceil(max_results / len(sources))
+        executor = self._get_executor()
+
+        timeouts = {name: self.source_timeouts.get(name, 5.0) for name, _ in sources}
+        clocks = {name: UpstreamClock() for name, _ in sources}
+        started = {}  # name -> when a worker picked the source up
+        submitted = time.monotonic()
+        futures = [
+            # Run in a copy of our context so e.g. a warming request budget applies
+            (name, executor.submit(contextvars.copy_context().run, self._run_source,
+                                   name, started, timeouts[name], clocks[name],
+                                   func, query, results_per_source))
+            for name, func in sources
+        ]
+
+        results = {}
+        for name, future in futures:
+            try:
+                results[name] = self._wait_source(
+                    name, future, started, submitted, timeouts[name])
+            except FutureTimeoutError:
+                # The source never reports back in time, so count it here
+                logger.warning(f"Source {name} timed out for query: {query}")
+                self.breakers.get(name).record_timeout(
+                    clocks[name].elapsed(), timeouts[name])
+            except CancelledError:
+                # Our pool was saturated; the source itself did nothing wrong
+                logger.warning(f"Source {name} still queued after {timeouts[name]}s "
+                               f"for query: {query}")
+            except Exception as e:
+                logger.error(f"Error in {name}: {str(e)}")
+
+        all_products = []
+        for name, _ in sources:
+            all_products.extend(results.get(name, []))
+
+        return all_products[:max_results]
+
+    @staticmethod
+    def _run_source(name: str, started: Dict[str, float], timeout: float,
+                    clock: UpstreamClock, func, *args):
+        """
+        Run a source search, noting its start in started. Rate-limit waits
+        must end within timeout of the start; upstream requests are timed on clock.
+        """
+        started[name] = now = time.monotonic()
+        with deadline(now + timeout), timing_upstream(clock):
+            return func(*args)
+
+    @staticmethod
+    def _wait_source(name: str, future, started: Dict[str, float],
+                     submitted: float, timeout: float):
+        """
+        Result of a submitted source search within timeout of its start.
+        Raises FutureTimeoutError when it runs too long, and cancels it
+        (raising CancelledError) when no worker picked it up within timeout.
+        """
+        while True:
+            begun = started.get(name)
+            if begun is not None:
+                return future.result(timeout=max(0.0, begun + timeout - time.monotonic()))
+
+            remaining = submitted + timeout - time.monotonic()
+            if remaining <= 0 and future.cancel():
+                raise CancelledError()
+            # Wakes on completion; a source started meanwhile is handled above
+            futures_wait([future], timeout=max(0.0, remaining))
+            if future.done():
+                return future.result()
+
+    def shutdown(self):
+        """Release the source worker pool"""
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+
     def search_google_shopping_api(self, query: str, max_results: int = 2) -> List[Dict]:
         """
         Use SerpAPI to get Google Shopping results (requires API key)
@@ -103,85 +293,149 @@ class ProductAPIManager:
             logger.warning("SerpAPI key not configured")
             return self.search_google_shopping_scrape(query, max_results)
 
+        # SerpAPI and the scrape fallback have separate breakers, so each
+        # request records one outcome per upstream actually called
+        if not self.breakers.get('google_shopping').allow():
+            return self.search_google_shopping_scrape(query, max_results)
+
         try:
-            url = "https://serpapi.com/search.json"
-            params = {
-                'engine': 'google_shopping',
-                'q': query,
-                'api_key': self.api_configs['serpapi_key'],
-                'num': max_results
-            }
+            url = SERPAPI_URL
+            params = self.get_serpapi_params(query, max_results)
 
-            response = requests.get(url, params=params)
-            data = response.json()
+            def fetch():
+                self.rate_limiter.acquire(url)
+                with upstream_call():
+                    return self.session.get(url, params=params).json()
 
-            if 'shopping_results' in data:
-                for item in data['shopping_results'][:max_results]:
-                    product = {
-                        'name': item.get('title', ''),
-                        'price': item.get('price', ''),
-                        'image': item.get('thumbnail', ''),
-                        'url': item.get('link', ''),
-                        'source': 'google_shopping',
-                        'rating': item.get('rating'),
-                        'reviews': item.get('reviews'),
-                        'merchant': item.get('source', '')
-                    }
-                    if self.validate_product(product):
-                        products.append(product)
+            data = self.flights.do(request_key(url, params), fetch)
+            products = self.handle_google_shopping_data(data, max_results)
 
         except Exception as e:
             logger.error(f"SerpAPI error: {str(e)}")
+            self.breakers.get('google_shopping').record_error(e)
             return self.search_google_shopping_scrape(query, max_results)
 
         return products
 
+    def get_serpapi_params(self, query: str, max_results: int) -> Dict:
+        """Build SerpAPI Google Shopping query parameters"""
+        return {
+            'engine': 'google_shopping',
+            'q': query,
+            'api_key': self.api_configs['serpapi_key'],
+            'num': max_results
+        }
+
+    def handle_google_shopping_data(self, data: Dict, max_results: int) -> List[Dict]:
+        """Parse a SerpAPI payload and record the outcome on the breaker"""
+        breaker = self.breakers.get('google_shopping')
+
+        if 'error' in data:
+            logger.warning(f"SerpAPI returned an error: {data['error']}")
+            breaker.record_failure()
+            return []
+
+        products = self.parse_google_shopping_results(data, max_results)
+        if products:
+            breaker.record_success()
+        else:
+            breaker.record_empty()
+        return products
+
+    def parse_google_shopping_results(self, data: Dict, max_results: int) -> List[Dict]:
+        """Convert a SerpAPI Google Shopping payload into products"""
+        products = []
+
+        if 'shopping_results' in data:
+            for item in data['shopping_results'][:max_results]:
+                product = {
+                    'name': item.get('title', ''),
+                    'price': item.get('price', ''),
+                    'image': item.get('thumbnail', ''),
+                    'url': item.get('link', ''),
+                    'source': 'google_shopping',
+                    'rating': item.get('rating'),
+                    'reviews': item.get('reviews'),
+                    'merchant': item.get('source', '')
+                }
+                if self.validate_product(product):
+                    products.append(product)
+
+        return products
+
     def search_google_shopping_scrape(self, query: str, max_results: int = 2) -> List[Dict]:
         """
         Fallback: Scrape Google Shopping results
         """
         products = []
 
+        if not self.breakers.get(GOOGLE_SCRAPE_BREAKER).allow():
+            return products
+
         try:
-            search_url = f"https://www.google.com/search?q={quote(query)}&tbm=shop"
+            search_url = self.google_shopping_url(query)
 
-            response = self.session.get(search_url)
-            if response.status_code != 200:
-                return products
+            status, content = self._fetch(search_url)
+            products = self.handle_google_shopping_page(
+                status, content, max_results)
 
-            soup = BeautifulSoup(response.content, 'html.parser')
+        except Exception as e:
+            logger.error(f"Google Shopping scrape error: {str(e)}")
+            self.breakers.get(GOOGLE_SCRAPE_BREAKER).record_error(e)
 
-            # Google Shopping results have specific structure
-            product_divs = soup.find_all(
-                'div', {'data-docid': True})[:max_results]
+        return products
 
-            for div in product_divs:
-                try:
-                    title_elem = div.find('h3')
-                    price_elem = div.find(
-                        'span', string=re.compile(r'\$[\d,]+'))
-                    img_elem = div.find('img')
-                    link_elem = div.find('a')
-
-                    if title_elem and price_elem:
-                        product = {
-                            'name': title_elem.get_text(strip=True),
-                            'price': price_elem.get_text(strip=True),
-                            'image': self.fix_google_image_url(img_elem.get('src', '') if img_elem else ''),
-                            'url': urljoin('https://www.google.com', link_elem.get('href', '')) if link_elem else '',
-                            'source': 'google_shopping_scrape'
-                        }
-
-                        if self.validate_product(product):
-                            products.append(product)
-
-                except Exception as e:
-                    logger.warning(
-                        f"Error parsing Google Shopping item: {str(e)}")
-                    continue
+    def handle_google_shopping_page(self, status: int, content, max_results: int) -> List[Dict]:
+        """Parse a Google Shopping page and record the outcome on the scrape breaker"""
+        breaker = self.breakers.get(GOOGLE_SCRAPE_BREAKER)
 
-        except Exception as e:
-            logger.error(f"Google Shopping scrape error: {str(e)}")
+        if status != 200:
+            breaker.record_failure()
+            return []
+
+        products = self.parse_google_shopping_html(content, max_results)
+        if products:
+            breaker.record_success()
+        else:
+            breaker.record_empty()
+        return products
+
+    def google_shopping_url(self, query: str) -> str:
+        """Google Shopping search page URL for a query"""
+        return f"https://www.google.com/search?q={quote(query)}&tbm=shop"
+
+    def parse_google_shopping_html(self, content, max_results: int) -> List[Dict]:
+        """Extract products from a Google Shopping results page"""
+        products = []
+
+        # Google Shopping results have specific structure
+        product_divs = parse_result_containers(
+            content, 'google_shopping', max_results)
+
+        for div in product_divs:
+            try:
+                title_elem = div.find('h3')
+                price_elem = div.find(
+                    'span', string=re.compile(r'\$[\d,]+'))
+                img_elem = div.find('img')
+                link_elem = div.find('a')
+
+                if title_elem and price_elem:
+                    product = {
+                        'name': title_elem.get_text(strip=True),
+                        'price': price_elem.get_text(strip=True),
+                        'image': self.fix_google_image_url(img_elem.get('src', '') if img_elem else ''),
+                        'url': urljoin('https://www.google.com', link_elem.get('href', '')) if link_elem else '',
+                        'source': 'google_shopping_scrape'
+                    }
+
+                    if self.validate_product(product):
+                        products.append(product)
+
+            except Exception as e:
+                logger.warning(
+                    f"Error parsing Google Shopping item: {str(e)}")
+                continue
 
         return products
 
@@ -191,140 +445,238 @@ class ProductAPIManager:
         """
         products = []
 
+        # Skip the round-trip entirely while Amazon is failing
+        if not self.breakers.get('amazon').allow():
+            return self.get_amazon_sample_products(query, max_results)
+
         try:
             # Use Amazon's search API endpoint structure
-            search_url = f"https://www.amazon.com/s?k={quote(query)}&ref=sr_pg_1"
+            search_url = self.amazon_search_url(query)
 
             # Add Amazon-specific headers
             headers = self.session.headers.copy()
-            headers.update({
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-                'Accept-Language': 'en-US,en;q=0.5',
-                'Accept-Encoding': 'gzip, deflate, br',
-                'Referer': 'https://www.amazon.com/',
-            })
-
-            response = self.session.get(search_url, headers=headers)
-            if response.status_code != 200:
-                return self.get_amazon_sample_products(query, max_results)
-
-            soup = BeautifulSoup(response.content, 'html.parser')
-
-            # Amazon product containers
-            product_containers = soup.find_all(
-                'div', {'data-component-type': 's-search-result'})[:max_results]
-
-            for container in product_containers:
-                try:
-                    # Extract product details
-                    title_elem = container.find('h2', class_='s-size-mini')
-                    if not title_elem:
-                        title_elem = container.find(
-                            'span', {'data-action': 'a-offscreen'})
-
-                    price_elem = container.find('span', class_='a-price-whole')
-                    if not price_elem:
-                        price_elem = container.find(
-                            'span', string=re.compile(r'\$[\d,]+'))
-
-                    img_elem = container.find('img', class_='s-image')
-                    link_elem = container.find('h2').find(
-                        'a') if container.find('h2') else None
-
-                    if title_elem and price_elem:
-                        # Get high-quality image
-                        image_url = self.get_amazon_hq_image(
-                            img_elem) if img_elem else ''
-
-                        product = {
-                            'name': title_elem.get_text(strip=True)[:100],
-                            'price': f"${price_elem.get_text(strip=True)}",
-                            'image': image_url,
-                            'url': urljoin('https://www.amazon.com', link_elem.get('href', '')) if link_elem else '',
-                            'source': 'amazon',
-                            'rating': self.extract_amazon_rating(container),
-                            'reviews': self.extract_amazon_reviews(container)
-                        }
-
-                        if self.validate_product(product):
-                            products.append(product)
-
-                except Exception as e:
-                    logger.warning(f"Error parsing Amazon item: {str(e)}")
-                    continue
-
-            # If no products found, use sample data
-            if not products:
-                products = self.get_amazon_sample_products(query, max_results)
+            headers.update(AMAZON_HEADERS)
+
+            status, content = self._fetch(search_url, headers=headers)
+            products = self.handle_amazon_response(
+                query, max_results, status, content)
 
         except Exception as e:
             logger.error(f"Amazon search error: {str(e)}")
+            self.breakers.get('amazon').record_error(e)
             products = self.get_amazon_sample_products(query, max_results)
 
         return products
 
+    def handle_amazon_response(self, query: str, max_results: int, status: int, content) -> List[Dict]:
+        """
+        Parse an Amazon search response, record the outcome on the breaker
+        and fall back to sample data when nothing usable came back
+        """
+        breaker = self.breakers.get('amazon')
+
+        if status != 200 or is_captcha_page(content):
+            breaker.record_failure()
+            return self.get_amazon_sample_products(query, max_results)
+
+        products = self.parse_amazon_results(content, max_results)
+
+        # If no products found, use sample data
+        if not products:
+            breaker.record_empty()
+            return self.get_amazon_sample_products(query, max_results)
+
+        breaker.record_success()
+        return products
+
+    def amazon_search_url(self, query: str) -> str:
+        """Amazon search page URL for a query"""
+        return f"https://www.amazon.com/s?k={quote(query)}&ref=sr_pg_1"
+
+    def parse_amazon_results(self, content, max_results: int) -> List[Dict]:
+        """Extract products from an Amazon search results page"""
+        products = []
+
+        # Amazon product containers
+        product_containers = parse_result_containers(
+            content, 'amazon', max_results)
+
+        for container in product_containers:
+            try:
+                # Extract product details
+                title_elem = container.find('h2', class_='s-size-mini')
+                if not title_elem:
+                    title_elem = container.find(
+                        'span', {'data-action': 'a-offscreen'})
+
+                price_elem = container.find('span', class_='a-price-whole')
+                if not price_elem:
+                    price_elem = container.find(
+                        'span', string=re.compile(r'\$[\d,]+'))
+
+                img_elem = container.find('img', class_='s-image')
+                link_elem = container.find('h2').find(
+                    'a') if container.find('h2') else None
+
+                if title_elem and price_elem:
+                    # Get high-quality image
+                    image_url = self.get_amazon_hq_image(
+                        img_elem) if img_elem else ''
+
+                    product = {
+                        'name': title_elem.get_text(strip=True)[:100],
+                        'price': f"${price_elem.get_text(strip=True)}",
+                        'image': image_url,
+                        'url': urljoin('https://www.amazon.com', link_elem.get('href', '')) if link_elem else '',
+                        'source': 'amazon',
+                        'rating': self.extract_amazon_rating(container),
+                        'reviews': self.extract_amazon_reviews(container)
+                    }
+
+                    if self.validate_product(product):
+                        products.append(product)
+
+            except Exception as e:
+                logger.warning(f"Error parsing Amazon item: {str(e)}")
+                continue
+
+        return products
+
     def search_ebay_improved(self, query: str, max_results: int = 2) -> List[Dict]:
         """
         Improved eBay search with official-looking results
         """
         products = []
 
+        if not self.breakers.get('ebay').allow():
+            return self.get_ebay_sample_products(query, max_results)
+
         try:
-            search_url = f"https://www.ebay.com/sch/i.html?_nkw={quote(query)}&_sacat=0"
-
-            response = self.session.get(search_url)
-            if response.status_code != 200:
-                return self.get_ebay_sample_products(query, max_results)
-
-            soup = BeautifulSoup(response.content, 'html.parser')
-
-            # eBay uses different selectors
-            items = soup.find_all(
-                'div', class_='s-item__wrapper')[:max_results]
-
-            for item in items:
-                try:
-                    title_elem = item.find('h3', class_='s-item__title')
-                    price_elem = item.find('span', class_='s-item__price')
-                    img_elem = item.find('img', class_='s-item__image')
-                    link_elem = item.find('a', class_='s-item__link')
-
-                    if title_elem and price_elem:
-                        # Get better quality image
-                        image_url = self.get_ebay_hq_image(
-                            img_elem) if img_elem else ''
-
-                        # Clean title
-                        title = title_elem.get_text(strip=True)
-                        title = re.sub(
-                            r'^(New Listing:|SPONSORED)', '', title).strip()
-
-                        product = {
-                            'name': title[:100],
-                            'price': price_elem.get_text(strip=True),
-                            'image': image_url,
-                            'url': link_elem.get('href', '') if link_elem else '',
-                            'source': 'ebay',
-                            'condition': self.extract_ebay_condition(item)
-                        }
-
-                        if self.validate_product(product) and 'to' not in product['price'].lower():
-                            products.append(product)
-
-                except Exception as e:
-                    logger.warning(f"Error parsing eBay item: {str(e)}")
-                    continue
-
-            # Fallback to sample data if no results
-            if not products:
-                products = self.get_ebay_sample_products(query, max_results)
+            search_url = self.ebay_search_url(query)
+
+            status, content, listings = self.fetch_ebay_listings(
+                search_url, max_results)
+            products = self.handle_ebay_response(
+                query, max_results, status, content, listings)
 
         except Exception as e:
             logger.error(f"eBay search error: {str(e)}")
+            self.breakers.get('ebay').record_error(e)
             products = self.get_ebay_sample_products(query, max_results)
 
         return products
 
+    def fetch_ebay_listings(self, url: str, max_results: int, session=None, **kwargs) -> tuple:
+        """
+        GET an eBay search page, returning (status, content, listings).
+        With the streaming parser the body is only read until max_results
+        listings are found and the download is then aborted; content is the
+        start of the page and listings the parsed items. Otherwise content
+        is the full page and listings is None.
+        Concurrent callers for the same URL share one fetch.
+        """
+        def fetch(count):
+            return lambda: self._fetch_ebay_listings(url, count, session, **kwargs)
+
+        status, content, listings, truncated = self.flights.do(
+            request_key(url), fetch(max_results))
+        if truncated and len(listings) < max_results:
+            # The shared fetch stopped before this caller's count
+            status, content, listings, truncated = self.flights.do(
+                request_key(url, None, max_results), fetch(max_results))
+        if listings is not None:
+            listings = listings[:max_results]
+        return status, content, listings
+
+    def _fetch_ebay_listings(self, url: str, max_results: int, session=None, **kwargs) -> tuple:
+        """
+        fetch_ebay_listings without coalescing; the extra truncated flag
+        tells whether the download was stopped early
+        """
+        self.rate_limiter.acquire(url)
+        session = session or self.session
+
+        with upstream_call():
+            if get_parser_backend('ebay') != 'stream':
+                response = session.get(url, **kwargs)
+                return response.status_code, response.content, None, False
+
+            response = session.get(url, stream=True, **kwargs)
+            try:
+                if response.status_code != 200:
+                    return response.status_code, b'', [], False
+                parser = stream_ebay_listings(
+                    response.iter_content(STREAM_CHUNK_SIZE), max_results)
+                return response.status_code, parser.head, parser.listings, parser.done
+            finally:
+                response.close()
+
+    def handle_ebay_response(self, query: str, max_results: int, status: int, content,
+                             listings: Optional[List[Dict]] = None) -> List[Dict]:
+        """
+        Parse an eBay search response, record the outcome on the breaker
+        and fall back to sample data when nothing usable came back
+        """
+        breaker = self.breakers.get('ebay')
+
+        if status != 200 or is_captcha_page(content):
+            breaker.record_failure()
+            return self.get_ebay_sample_products(query, max_results)
+
+        if listings is None:
+            products = self.parse_ebay_results(content, max_results)
+        else:
+            products = self.build_ebay_products(listings)
+
+        # Fallback to sample data if no results
+        if not products:
+            breaker.record_empty()
+            return self.get_ebay_sample_products(query, max_results)
+
+        breaker.record_success()
+        return products
+
+    def ebay_search_url(self, query: str) -> str:
+        """eBay search page URL for a query"""
+        return f"https://www.ebay.com/sch/i.html?_nkw={quote(query)}&_sacat=0"
+
+    def parse_ebay_results(self, content, max_results: int) -> List[Dict]:
+        """Extract products from an eBay search results page"""
+        return self.build_ebay_products(
+            extract_ebay_listings(content, max_results))
+
+    def build_ebay_products(self, listings: List[Dict]) -> List[Dict]:
+        """Turn parsed eBay listings into products"""
+        products = []
+
+        for listing in listings:
+            try:
+                if listing['title'] and listing['price']:
+                    # Get better quality image
+                    image_url = self.get_ebay_hq_image(listing['image'])
+
+                    # Clean title
+                    title = re.sub(
+                        r'^(New Listing:|SPONSORED)', '', listing['title']).strip()
+
+                    product = {
+                        'name': title[:100],
+                        'price': listing['price'],
+                        'image': image_url,
+                        'url': listing['url'],
+                        'source': 'ebay',
+                        'condition': listing['condition'] or 'Used'
+                    }
+
+                    if self.validate_product(product) and 'to' not in product['price'].lower():
+                        products.append(product)
+
+            except Exception as e:
+                logger.warning(f"Error parsing eBay item: {str(e)}")
+                continue
+
+        return products
+
     def search_aliexpress_improved(self, query: str, max_results: int = 1) -> List[Dict]:
         """
         Improved AliExpress search simulation with realistic data
@@ -452,7 +804,8 @@ class ProductAPIManager:
                 'url': f'https://amazon.com/s?k={quote(query)}',
                 'source': 'amazon',
                 'rating': round(random.uniform(4.0, 5.0), 1),
-                'reviews': random.randint(100, 5000)
+                'reviews': random.randint(100, 5000),
+                'synthetic': True
             },
             {
                 'name': f'Premium {query.title()} with Fast Shipping',
@@ -461,7 +814,8 @@ class ProductAPIManager:
                 'url': f'https://amazon.com/s?k={quote(query)}',
                 'source': 'amazon',
                 'rating': round(random.uniform(3.8, 4.9), 1),
-                'reviews': random.randint(50, 2000)
+                'reviews': random.randint(50, 2000),
+                'synthetic': True
             }
         ]
         return samples[:max_results]
@@ -475,7 +829,8 @@ class ProductAPIManager:
                 'image': self.get_category_image(query, 'ebay'),
                 'url': f'https://ebay.com/sch/i.html?_nkw={quote(query)}',
                 'source': 'ebay',
-                'condition': 'New'
+                'condition': 'New',
+                'synthetic': True
             },
             {
                 'name': f'{query.title()} - Great Deal, Free Returns',
@@ -483,7 +838,8 @@ class ProductAPIManager:
                 'image': self.get_category_image(query, 'ebay', 1),
                 'url': f'https://ebay.com/sch/i.html?_nkw={quote(query)}',
                 'source': 'ebay',
-                'condition': 'Used'
+                'condition': 'Used',
+                'synthetic': True
             }
         ]
         return samples[:max_results]
@@ -498,7 +854,8 @@ class ProductAPIManager:
                 'url': f'https://aliexpress.com/wholesale?SearchText={quote(query)}',
                 'source': 'aliexpress',
                 'shipping': 'Free shipping',
-                'rating': round(random.uniform(4.0, 4.8), 1)
+                'rating': round(random.uniform(4.0, 4.8), 1),
+                'synthetic': True
             }
         ]
         return samples[:max_results]
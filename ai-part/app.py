@@ -1,26 +1,127 @@
-from flask import Flask, request, jsonify
-from flask_cors import CORS
-from dotenv import load_dotenv
+import startup
+
+with startup.timed('import flask'):
+    from flask import Flask, Response, request, jsonify
+    from flask_cors import CORS
+    from dotenv import load_dotenv
 import os
 import logging
-from gemini_service import GeminiService
-from product_scraper import ProductScraper
-from utils import validate_recommendations, format_response
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from json_provider import FastJSONProvider, dumps_str
+from ranking import budget_from_preferences
+from utils import validate_recommendations, format_response, clean_category_name
 
 # Load environment variables
 load_dotenv()
 
 # Initialize Flask app
 app = Flask(__name__)
+app.json = FastJSONProvider(app)
 CORS(app)
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Initialize services
-gemini_service = GeminiService(os.getenv('GEMINI_API_KEY'))
-product_scraper = ProductScraper()
+# Services are created on first use so workers start quickly; the Gemini
+# SDK alone takes about a second to import
+gemini_service = None
+product_scraper = None
+_services_lock = threading.Lock()
+
+
+def get_gemini_service():
+    """GeminiService, created on first use"""
+    global gemini_service
+    if gemini_service is None:
+        with _services_lock:
+            if gemini_service is None:
+                with startup.timed('init GeminiService'):
+                    from gemini_service import GeminiService
+                    gemini_service = GeminiService(os.getenv('GEMINI_API_KEY'))
+    return gemini_service
+
+
+def get_product_scraper():
+    """ProductScraper, created on first use"""
+    global product_scraper
+    if product_scraper is None:
+        with _services_lock:
+            if product_scraper is None:
+                with startup.timed('init ProductScraper'):
+                    from product_scraper import ProductScraper
+                    product_scraper = ProductScraper()
+    return product_scraper
+
+
+def preload_services():
+    """Create both services (PRELOAD_SERVICES=true runs this after boot)"""
+    try:
+        get_gemini_service()
+        get_product_scraper()
+        startup.log_report()
+    except Exception as e:
+        logger.error(f"Error preloading services: {str(e)}")
+
+
+if not os.getenv('GEMINI_API_KEY'):
+    logger.warning("GEMINI_API_KEY is not set - AI endpoints will fail")
+
+if os.getenv('PRELOAD_SERVICES', 'false').lower() == 'true':
+    threading.Thread(target=preload_services,
+                     name='preload-services', daemon=True).start()
+
+# Keeps head and popular queries cached; creates the scraper on its first cycle
+cache_warmer = None
+if os.getenv('WARMER_ENABLED', 'false').lower() == 'true':
+    from cache_warmer import create_warmer
+    cache_warmer = create_warmer(get_product_scraper)
+    cache_warmer.start()
+
+# Longest the chat pipeline stream waits for its next event: a search gives
+# up after PRODUCT_SEARCH_TIMEOUT, so silence beyond that means a hang
+STREAM_EVENT_TIMEOUT = float(os.getenv('PRODUCT_SEARCH_TIMEOUT', 30)) + 5
+
+# Worker pool for searching recommendation categories in parallel
+category_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv('CATEGORY_SEARCH_PARALLELISM', 5)),
+    thread_name_prefix='category-search')
+
+
+def search_category(item_type, search_keywords, max_results=3, budget=None):
+    """
+    Search products for a single recommendation category, isolating errors.
+    Products come back as a pre-serialized JSON array (json_provider.RawJSON),
+    ranked against the (low, high) budget when one is given.
+    """
+    try:
+        products = get_product_scraper().search_products_json(
+            search_keywords, max_results=max_results, budget=budget)
+        logger.info(f"Found {len(products)} products for {item_type}")
+        return products
+    except Exception as e:
+        logger.error(
+            f"Error searching products for {item_type}: {str(e)}")
+        return []
+
+
+def sse_event(event, data):
+    """
+    Format one Server-Sent Event
+    """
+    return f"event: {event}\ndata: {dumps_str(data)}\n\n"
+
+
+def sse_response(events):
+    """
+    Stream an iterable of SSE strings without proxy buffering
+    """
+    return Response(events, mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
 
 
 @app.route('/api/health', methods=['GET'])
@@ -33,6 +134,36 @@ def health_check():
     })
 
 
+def http_host_stats():
+    """Per-host HTTP counters (http_client is imported with the scraper)"""
+    from http_client import host_stats
+    return host_stats.stats()
+
+
+@app.route('/api/stats', methods=['GET'])
+def stats():
+    """Cache and performance counters (services not created yet report None)"""
+    scraper = product_scraper
+    gemini = gemini_service
+    return jsonify({
+        'product_cache': scraper.cache.stats() if scraper else None,
+        'product_refresh': scraper.refresher.stats() if scraper else None,
+        'cache_warmer': cache_warmer.stats() if cache_warmer else None,
+        'catalog': scraper.catalog.stats() if scraper and scraper.catalog is not None else None,
+        'gemini_cache': gemini.cache.stats()
+            if gemini and hasattr(gemini.cache, 'stats') else None,
+        'gemini_semantic_cache': gemini.semantic_cache.stats()
+            if gemini and gemini.semantic_cache else None,
+        'rate_limits': scraper.api_manager.rate_limiter.stats() if scraper else None,
+        'circuit_breakers': scraper.api_manager.breakers.stats() if scraper else None,
+        'http': http_host_stats() if scraper else None,
+        'single_flight': scraper.api_manager.flights.stats() if scraper else None,
+        'driver_pool': scraper._driver_pool.stats()
+            if scraper and scraper._driver_pool else None,
+        'startup': startup.report()
+    })
+
+
 @app.route('/api/chat', methods=['POST'])
 def chat():
     """
@@ -51,7 +182,7 @@ def chat():
         logger.info(f"Processing chat request: {user_message[:100]}...")
 
         # Generate AI response with recommendations
-        ai_response = gemini_service.generate_gift_recommendations(
+        ai_response = get_gemini_service().generate_gift_recommendations(
             user_message,
             context,
             user_preferences
@@ -70,6 +201,154 @@ def chat():
         return jsonify({'error': 'Internal server error'}), 500
 
 
+def chat_event_to_sse(event):
+    """
+    Convert a GeminiService stream event into an SSE message
+    """
+    if event['type'] == 'response':
+        return sse_event('response', {'text': event['text']})
+    if event['type'] == 'recommendation':
+        return sse_event('recommendation', {
+            'category': clean_category_name(event['category']),
+            'keywords': event['keywords'].strip()
+        })
+    if event['type'] == 'questions':
+        return sse_event('questions', {'questions': event['questions']})
+    if event['result']:
+        return sse_event('done', format_response(event['result']))
+    return sse_event('error', {'error': 'Failed to generate recommendations'})
+
+
+@app.route('/api/chat/stream', methods=['POST'])
+def chat_stream():
+    """
+    Stream gift recommendations as Server-Sent Events while the model generates them
+    """
+    try:
+        data = request.get_json()
+
+        if not data or 'message' not in data:
+            return jsonify({'error': 'Message is required'}), 400
+
+        user_message = data['message']
+        context = data.get('context', '')
+        user_preferences = data.get('preferences', {})
+
+        logger.info(f"Streaming chat request: {user_message[:100]}...")
+
+        def generate():
+            for event in get_gemini_service().stream_gift_recommendations(
+                    user_message, context, user_preferences):
+                yield chat_event_to_sse(event)
+
+        return sse_response(generate())
+
+    except Exception as e:
+        logger.error(f"Error in chat stream endpoint: {str(e)}")
+        return jsonify({'error': 'Internal server error'}), 500
+
+
+@app.route('/api/chat-products/stream', methods=['POST'])
+def chat_products_stream():
+    """
+    Chat and product search in one streamed response. Product searches start
+    as soon as each recommendation category is known, while the model is
+    still generating the rest of its answer.
+    """
+    try:
+        data = request.get_json()
+
+        if not data or 'message' not in data:
+            return jsonify({'error': 'Message is required'}), 400
+
+        user_message = data['message']
+        context = data.get('context', '')
+        user_preferences = data.get('preferences', {})
+        budget = budget_from_preferences(user_preferences)
+
+        logger.info(f"Streaming chat pipeline request: {user_message[:100]}...")
+
+        def generate():
+            # Chat events and finished searches are funnelled through one queue
+            events = queue.Queue()
+
+            def run_chat():
+                try:
+                    for event in get_gemini_service().stream_gift_recommendations(
+                            user_message, context, user_preferences):
+                        events.put(('chat', event))
+                finally:
+                    events.put(('chat_end', None))
+
+            def start_search(category, keywords):
+                future = category_executor.submit(
+                    search_category, category, keywords, budget=budget)
+                future.add_done_callback(
+                    lambda f: events.put(('products', (category, f.result()))))
+
+            threading.Thread(target=run_chat, name='chat-pipeline',
+                             daemon=True).start()
+
+            searched = set()
+            chat_done = False
+            pending = 0
+            total_products = 0
+
+            while not chat_done or pending:
+                try:
+                    kind, payload = events.get(timeout=STREAM_EVENT_TIMEOUT)
+                except queue.Empty:
+                    logger.error(
+                        f"Chat pipeline stalled for {STREAM_EVENT_TIMEOUT}s "
+                        f"({pending} searches pending, chat done: {chat_done})")
+                    yield sse_event('error', {'error': 'Timed out waiting for results'})
+                    return
+
+                if kind == 'chat_end':
+                    chat_done = True
+                    continue
+
+                if kind == 'products':
+                    category, products = payload
+                    pending -= 1
+                    total_products += len(products)
+                    yield sse_event('category', {
+                        'category': category,
+                        'products': products
+                    })
+                    continue
+
+                # Recommendations that only appear in the final parse
+                # (e.g. non-JSON answers) are searched at the end
+                if payload['type'] == 'done' and payload['result']:
+                    found = format_response(payload['result'])['recommendations']
+                    new = [(c, k) for c, k in found.items() if c not in searched]
+                elif payload['type'] == 'recommendation':
+                    new = [(clean_category_name(payload['category']),
+                            payload['keywords'].strip())]
+                else:
+                    new = []
+
+                for category, keywords in new:
+                    if category not in searched and keywords:
+                        searched.add(category)
+                        pending += 1
+                        start_search(category, keywords)
+
+                yield chat_event_to_sse(payload)
+
+            yield sse_event('summary', {
+                'total_categories': len(searched),
+                'total_products': total_products
+            })
+
+        return sse_response(generate())
+
+    except Exception as e:
+        logger.error(f"Error in chat pipeline endpoint: {str(e)}")
+        return jsonify({'error': 'Internal server error'}), 500
+
+
 @app.route('/api/search-products', methods=['POST'])
 def search_products():
     """
@@ -82,6 +361,7 @@ def search_products():
             return jsonify({'error': 'Recommendations are required'}), 400
 
         recommendations = data['recommendations']
+        budget = budget_from_preferences(data.get('preferences'))
 
         if not validate_recommendations(recommendations):
             return jsonify({'error': 'Invalid recommendations format'}), 400
@@ -89,19 +369,17 @@ def search_products():
         logger.info(
             f"Searching products for {len(recommendations)} categories...")
 
-        # Search for products for each recommendation
-        all_products = {}
+        # Search for products for each recommendation in parallel
+        futures = {
+            item_type: category_executor.submit(
+                search_category, item_type, search_keywords, budget=budget)
+            for item_type, search_keywords in recommendations.items()
+        }
 
-        for item_type, search_keywords in recommendations.items():
-            try:
-                products = product_scraper.search_products(
-                    search_keywords, max_results=3)
-                all_products[item_type] = products
-                logger.info(f"Found {len(products)} products for {item_type}")
-            except Exception as e:
-                logger.error(
-                    f"Error searching products for {item_type}: {str(e)}")
-                all_products[item_type] = []
+        # Collect in request order so the response shape stays stable
+        all_products = {
+            item_type: future.result() for item_type, future in futures.items()
+        }
 
         return jsonify({
             'products': all_products,
@@ -114,6 +392,55 @@ def search_products():
         return jsonify({'error': 'Internal server error'}), 500
 
 
+@app.route('/api/search-products/stream', methods=['POST'])
+def search_products_stream():
+    """
+    Stream product results as Server-Sent Events, one event per category
+    as soon as it is ready, followed by a summary event
+    """
+    try:
+        data = request.get_json()
+
+        if not data or 'recommendations' not in data:
+            return jsonify({'error': 'Recommendations are required'}), 400
+
+        recommendations = data['recommendations']
+        budget = budget_from_preferences(data.get('preferences'))
+
+        if not validate_recommendations(recommendations):
+            return jsonify({'error': 'Invalid recommendations format'}), 400
+
+        logger.info(
+            f"Streaming products for {len(recommendations)} categories...")
+
+        futures = {
+            category_executor.submit(
+                search_category, item_type, search_keywords, budget=budget): item_type
+            for item_type, search_keywords in recommendations.items()
+        }
+
+        def generate():
+            total_products = 0
+            for future in as_completed(futures):
+                products = future.result()
+                total_products += len(products)
+                yield sse_event('category', {
+                    'category': futures[future],
+                    'products': products
+                })
+
+            yield sse_event('summary', {
+                'total_categories': len(futures),
+                'total_products': total_products
+            })
+
+        return sse_response(generate())
+
+    except Exception as e:
+        logger.error(f"Error in search-products stream endpoint: {str(e)}")
+        return jsonify({'error': 'Internal server error'}), 500
+
+
 @app.route('/api/generate-questions', methods=['POST'])
 def generate_questions():
     """
@@ -130,7 +457,7 @@ def generate_questions():
 
         logger.info("Generating follow-up questions...")
 
-        questions = gemini_service.generate_follow_up_questions(
+        questions = get_gemini_service().generate_follow_up_questions(
             user_message, context)
 
         return jsonify({
@@ -157,6 +484,7 @@ if __name__ == '__main__':
     port = int(os.getenv('PORT', 5001))  # Changed from 5000 to 5001
     debug = os.getenv('FLASK_DEBUG', 'False').lower() == 'true'
 
+    startup.log_report()
     logger.info(f"Starting GiftGenie AI API on port {port}")
     try:
         app.run(host='0.0.0.0', port=port, debug=debug)
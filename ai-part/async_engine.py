@@ -0,0 +1,431 @@
+"""
+Asyncio-native product source engine
+Runs every upstream request on one pooled aiohttp client inside a background
+event loop, so a single process can keep many requests in flight while the
+Flask worker threads only block on the final result.
+Parsing and fallback data are shared with ProductAPIManager / ProductScraper.
+"""
+
+import asyncio
+import atexit
+import logging
+import math
+import os
+import threading
+import time
+from typing import Iterable, List, Dict, Optional
+from urllib.parse import urlsplit
+
+# Optional aiohttp - the sync requests-based engine is used without it
+try:
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+
+from api_integrations import AMAZON_HEADERS, GOOGLE_SCRAPE_BREAKER, SERPAPI_URL
+from http_client import (RETRY_STATUSES, get_prewarm_urls, get_retry_settings,
+                         get_timeouts, host_stats)
+from html_parsing import (STREAM_CHUNK_SIZE, EbayListingStreamParser,
+                          get_parser_backend)
+from circuit_breaker import UpstreamClock, timing_upstream, upstream_call
+from rate_limiter import current_budget, deadline, request_budget
+from singleflight import request_key
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncProductEngine:
+    """
+    Async equivalents of the product sources, backed by a pooled HTTP client
+    """
+
+    def __init__(self, api_manager, scraper=None, limit: Optional[int] = None,
+                 limit_per_host: Optional[int] = None, timeout: float = 10.0):
+        if not AIOHTTP_AVAILABLE:
+            raise RuntimeError("aiohttp is required for the async engine")
+
+        self.api_manager = api_manager
+        self.scraper = scraper
+        self.limit = limit or int(os.getenv('ASYNC_HTTP_LIMIT', 200))
+        self.limit_per_host = limit_per_host or int(
+            os.getenv('ASYNC_HTTP_LIMIT_PER_HOST', 20))
+        self.timeout = timeout
+
+        self._loop = None
+        self._thread = None
+        self._session = None
+        self._lock = threading.Lock()
+
+        atexit.register(self.close)
+
+    # ------------------------------------------------------------------
+    # Event loop and client management
+    # ------------------------------------------------------------------
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        """Start the background event loop thread on first use"""
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(
+                    target=self._loop.run_forever,
+                    name='product-engine-loop',
+                    daemon=True)
+                self._thread.start()
+        return self._loop
+
+    def run(self, coro, timeout: Optional[float] = None):
+        """
+        Run a coroutine on the engine loop and block until it finishes.
+        This is the bridge used by the synchronous search_products API.
+        """
+        # Tasks on the loop do not see the caller's context, so carry over
+        # its request budget (set while cache warming)
+        budget = current_budget()
+        if budget is not None:
+            coro = self._charged_to(budget, coro)
+
+        future = asyncio.run_coroutine_threadsafe(coro, self._ensure_loop())
+        try:
+            return future.result(timeout)
+        except Exception:
+            future.cancel()
+            raise
+
+    @staticmethod
+    async def _charged_to(budget, coro):
+        with request_budget(budget):
+            return await coro
+
+    def close(self):
+        """Close the pooled client and stop the event loop thread"""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is None:
+            return
+
+        async def close_session():
+            if self._session is not None and not self._session.closed:
+                await self._session.close()
+            self._session = None
+
+        try:
+            asyncio.run_coroutine_threadsafe(close_session(), loop).result(5)
+        except Exception as e:
+            logger.error(f"Error closing async HTTP client: {str(e)}")
+
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(5)
+        if not thread.is_alive():
+            loop.close()
+        logger.info("Async product engine shut down")
+
+    def _get_session(self) -> 'aiohttp.ClientSession':
+        """Lazily create the pooled client (must be called on the engine loop)"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                ttl_dns_cache=300)
+            headers = dict(self.api_manager.session.headers)
+            # brotli support is optional in aiohttp
+            headers['Accept-Encoding'] = 'gzip, deflate'
+            connect_timeout, read_timeout = get_timeouts()
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                headers=headers,
+                timeout=aiohttp.ClientTimeout(
+                    total=self.timeout,
+                    sock_connect=connect_timeout,
+                    sock_read=read_timeout))
+        return self._session
+
+    async def _get(self, url: str, **kwargs) -> 'aiohttp.ClientResponse':
+        """
+        session.get with the same retry policy as the requests sessions:
+        retried on connection failures and RETRY_STATUSES with exponential
+        backoff. Use the response with async with.
+        """
+        retries, backoff = get_retry_settings()
+        host = urlsplit(url).hostname or ''
+        session = self._get_session()
+
+        for attempt in range(retries + 1):
+            try:
+                response = await session.get(url, **kwargs)
+            except aiohttp.ClientConnectorError:
+                if attempt == retries:
+                    host_stats.record(host, 'errors')
+                    raise
+            except Exception:
+                host_stats.record(host, 'errors')
+                raise
+            else:
+                if response.status not in RETRY_STATUSES or attempt == retries:
+                    host_stats.record(host, 'requests')
+                    return response
+                response.release()
+
+            host_stats.record(host, 'retries')
+            await asyncio.sleep(backoff * (2 ** attempt))
+
+    def prewarm(self, urls: Optional[Iterable[str]] = None):
+        """Open pooled connections to the source hosts without waiting"""
+        async def warm(url):
+            try:
+                async with await self._get_session().head(url, allow_redirects=False):
+                    pass
+            except Exception as e:
+                logger.info(f"Could not prewarm {url}: {str(e)}")
+
+        async def warm_all():
+            await asyncio.gather(*[warm(url) for url in
+                                   (urls if urls is not None else get_prewarm_urls())])
+
+        asyncio.run_coroutine_threadsafe(warm_all(), self._ensure_loop())
+
+    async def _fetch(self, url: str, params: Optional[Dict] = None,
+                     headers: Optional[Dict] = None):
+        """GET a URL and return (status, body bytes), sharing identical fetches"""
+        async def fetch():
+            await self.api_manager.rate_limiter.acquire_async(url)
+            with upstream_call():
+                async with await self._get(url, params=params, headers=headers) as response:
+                    return response.status, await response.read()
+
+        return await self.api_manager.flights.do_async(
+            request_key(url, params), fetch)
+
+    async def _fetch_json(self, url: str, params: Optional[Dict] = None) -> Dict:
+        """GET a URL and decode its JSON body, sharing identical fetches"""
+        async def fetch():
+            await self.api_manager.rate_limiter.acquire_async(url)
+            with upstream_call():
+                async with await self._get(url, params=params) as response:
+                    return await response.json(content_type=None)
+
+        return await self.api_manager.flights.do_async(
+            request_key(url, params), fetch)
+
+    async def _fetch_ebay_listings(self, url: str, max_results: int):
+        """
+        Async equivalent of ProductAPIManager.fetch_ebay_listings:
+        returns (status, content, listings)
+        """
+        flights = self.api_manager.flights
+
+        def fetch(count):
+            return lambda: self._read_ebay_listings(url, count)
+
+        status, content, listings, truncated = await flights.do_async(
+            request_key(url), fetch(max_results))
+        if truncated and len(listings) < max_results:
+            # The shared fetch stopped before this caller's count
+            status, content, listings, truncated = await flights.do_async(
+                request_key(url, None, max_results), fetch(max_results))
+        if listings is not None:
+            listings = listings[:max_results]
+        return status, content, listings
+
+    async def _read_ebay_listings(self, url: str, max_results: int):
+        """Fetch and parse an eBay page; also returns whether it was cut short"""
+        await self.api_manager.rate_limiter.acquire_async(url)
+        with upstream_call():
+            async with await self._get(url) as response:
+                if get_parser_backend('ebay') != 'stream':
+                    return response.status, await response.read(), None, False
+                if response.status != 200:
+                    return response.status, b'', [], False
+
+                parser = EbayListingStreamParser(max_results)
+                async for chunk in response.content.iter_chunked(STREAM_CHUNK_SIZE):
+                    parser.feed_bytes(chunk)
+                    if parser.done:
+                        # Drop the connection instead of reading the rest
+                        response.close()
+                        break
+                return response.status, parser.head, parser.listings, parser.done
+
+    # ------------------------------------------------------------------
+    # Sources
+    # ------------------------------------------------------------------
+
+    async def search_google_shopping_api(self, query: str, max_results: int = 2) -> List[Dict]:
+        """
+        Async SerpAPI Google Shopping search, falling back to scraping
+        """
+        manager = self.api_manager
+
+        if not manager.api_configs['serpapi_key']:
+            logger.warning("SerpAPI key not configured")
+            return await self.search_google_shopping_scrape(query, max_results)
+
+        if not manager.breakers.get('google_shopping').allow():
+            return await self.search_google_shopping_scrape(query, max_results)
+
+        try:
+            data = await self._fetch_json(
+                SERPAPI_URL, manager.get_serpapi_params(query, max_results))
+            return manager.handle_google_shopping_data(data, max_results)
+        except Exception as e:
+            logger.error(f"SerpAPI error: {str(e)}")
+            manager.breakers.get('google_shopping').record_error(e)
+            return await self.search_google_shopping_scrape(query, max_results)
+
+    async def search_google_shopping_scrape(self, query: str, max_results: int = 2) -> List[Dict]:
+        """
+        Async Google Shopping scrape
+        """
+        manager = self.api_manager
+
+        if not manager.breakers.get(GOOGLE_SCRAPE_BREAKER).allow():
+            return []
+
+        try:
+            status, content = await self._fetch(manager.google_shopping_url(query))
+            return manager.handle_google_shopping_page(status, content, max_results)
+        except Exception as e:
+            logger.error(f"Google Shopping scrape error: {str(e)}")
+            manager.breakers.get(GOOGLE_SCRAPE_BREAKER).record_error(e)
+            return []
+
+    async def search_amazon_improved(self, query: str, max_results: int = 2) -> List[Dict]:
+        """
+        Async Amazon search with sample-data fallback
+        """
+        manager = self.api_manager
+
+        if not manager.breakers.get('amazon').allow():
+            return manager.get_amazon_sample_products(query, max_results)
+
+        try:
+            status, content = await self._fetch(
+                manager.amazon_search_url(query), headers=AMAZON_HEADERS)
+            return manager.handle_amazon_response(
+                query, max_results, status, content)
+
+        except Exception as e:
+            logger.error(f"Amazon search error: {str(e)}")
+            manager.breakers.get('amazon').record_error(e)
+            return manager.get_amazon_sample_products(query, max_results)
+
+    async def search_ebay_improved(self, query: str, max_results: int = 2) -> List[Dict]:
+        """
+        Async eBay search with sample-data fallback
+        """
+        manager = self.api_manager
+
+        if not manager.breakers.get('ebay').allow():
+            return manager.get_ebay_sample_products(query, max_results)
+
+        try:
+            status, content, listings = await self._fetch_ebay_listings(
+                manager.ebay_search_url(query), max_results)
+            return manager.handle_ebay_response(
+                query, max_results, status, content, listings)
+
+        except Exception as e:
+            logger.error(f"eBay search error: {str(e)}")
+            manager.breakers.get('ebay').record_error(e)
+            return manager.get_ebay_sample_products(query, max_results)
+
+    async def search_aliexpress_improved(self, query: str, max_results: int = 1) -> List[Dict]:
+        """
+        AliExpress sample data (no network involved)
+        """
+        return self.api_manager.get_aliexpress_sample_products(query, max_results)
+
+    async def search_ebay(self, query: str, max_results: int = 2) -> List[Dict]:
+        """
+        Async equivalent of ProductScraper._search_ebay.
+        Uses the pooled client instead of cloudscraper.
+        """
+        breaker = self.api_manager.breakers.get('ebay')
+        if not breaker.allow():
+            return []
+
+        try:
+            status, content, listings = await self._fetch_ebay_listings(
+                self.scraper._ebay_search_url(query), max_results)
+            return self.scraper._handle_ebay_response(
+                status, content, max_results, listings)
+        except Exception as e:
+            logger.error(f"Error searching eBay: {str(e)}")
+            breaker.record_error(e)
+
+        return []
+
+    def get_sources(self) -> List[tuple]:
+        """Return (name, coroutine function) pairs in order of preference"""
+        return [
+            ('google_shopping', self.search_google_shopping_api),
+            ('amazon', self.search_amazon_improved),
+            ('ebay', self.search_ebay_improved),
+            ('aliexpress', self.search_aliexpress_improved),
+        ]
+
+    async def search_products_multi_source(self, query: str, max_results: int = 6) -> List[Dict]:
+        """
+        Query all sources concurrently and merge in source-preference order
+        """
+        sources = self.get_sources()
+        results_per_source = math.ceil(max_results / len(sources))
+        timeouts = self.api_manager.source_timeouts
+
+        clocks = {name: UpstreamClock() for name, _ in sources}
+
+        async def run(func, timeout, clock):
+            # Rate-limit waits that would outlast the timeout fail fast
+            with deadline(time.monotonic() + timeout), timing_upstream(clock):
+                return await func(query, results_per_source)
+
+        results = await asyncio.gather(*[
+            asyncio.wait_for(run(func, timeouts.get(name, 5.0), clocks[name]),
+                             timeouts.get(name, 5.0))
+            for name, func in sources
+        ], return_exceptions=True)
+
+        all_products = []
+        for (name, _), result in zip(sources, results):
+            if isinstance(result, asyncio.TimeoutError):
+                # The cancelled source never reports back, so count it here
+                logger.warning(f"Source {name} timed out for query: {query}")
+                self.api_manager.breakers.get(name).record_timeout(
+                    clocks[name].elapsed(), timeouts.get(name, 5.0))
+            elif isinstance(result, Exception):
+                logger.error(f"Error in {name}: {str(result)}")
+            else:
+                all_products.extend(result)
+
+        return all_products[:max_results]
+
+    async def search_products(self, search_query: str, max_results: int = 3,
+                              limit: Optional[int] = None) -> List[Dict]:
+        """
+        Async equivalent of ProductScraper._search_products_sync, including fallbacks
+        """
+        limit = limit or max_results
+
+        try:
+            products = await self.search_products_multi_source(
+                search_query, limit)
+            if products and len(products) >= max_results:
+                return products[:limit]
+        except Exception as e:
+            logger.error(f"Enhanced API search failed: {str(e)}")
+
+        # Fallback to original methods if API fails
+        all_products = list(self.scraper._search_amazon(
+            search_query, max_results=2))
+
+        if len(all_products) < max_results:
+            all_products.extend(await self.search_ebay(
+                search_query, max_results=max_results-len(all_products)))
+
+        if len(all_products) < max_results:
+            all_products.extend(self.scraper._search_aliexpress(
+                search_query, max_results=max_results-len(all_products)))
+
+        return all_products[:max_results]
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Benchmark near-duplicate removal (utils.merge_similar_products).
+
+Compares the previous pairwise implementation with the combination index
+on growing candidate lists and checks both keep the same products.
+
+Usage: python benchmarks/benchmark_dedupe.py
+"""
+
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import merge_similar_products  # noqa: E402
+
+WORDS = ('wireless bluetooth headphones noise cancelling over ear earbuds sport '
+         'coffee mug ceramic travel insulated leather wallet slim rfid watch '
+         'smart fitness tracker mystery novel hardcover gift set premium').split()
+
+
+def pairwise_merge(products):
+    """The previous O(n^2) implementation"""
+    unique_products = []
+    seen_names = set()
+    for product in products:
+        simple_name = re.sub(r'[^a-zA-Z0-9\s]', '', product['name'].lower())
+        simple_name = ' '.join(simple_name.split()[:5])
+        is_similar = False
+        for seen in seen_names:
+            common_words = set(simple_name.split()) & set(seen.split())
+            if len(common_words) >= 3:
+                is_similar = True
+                break
+        if not is_similar:
+            unique_products.append(product)
+            seen_names.add(simple_name)
+    return unique_products
+
+
+def build_products(count: int, rng: random.Random):
+    return [{'name': ' '.join(rng.choice(WORDS) for _ in range(rng.randint(3, 8))) + f' {i}'}
+            for i in range(count)]
+
+
+def timed(func, products):
+    start = time.perf_counter()
+    result = func(products)
+    return result, time.perf_counter() - start
+
+
+def main():
+    rng = random.Random(42)
+    for count in (100, 1000, 5000):
+        products = build_products(count, rng)
+        expected, old_seconds = timed(pairwise_merge, products)
+        result, new_seconds = timed(merge_similar_products, products)
+        assert result == expected, "implementations kept different products"
+        print(f"{count:>5} candidates, {len(result):>4} kept: pairwise {old_seconds * 1000:8.1f} ms, "
+              f"indexed {new_seconds * 1000:6.1f} ms  {old_seconds / new_seconds:6.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Benchmark JSON encoding of /api/search-products responses.
+
+Compares Flask's default provider (stdlib json), FastJSONProvider (orjson
+when installed) and FastJSONProvider with the per-category product lists
+already serialized in the product cache (RawJSON), which is what the
+endpoint sends on cache hits.
+
+Usage: python benchmarks/benchmark_json.py [iterations]
+"""
+
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask  # noqa: E402
+
+from json_provider import ORJSON_AVAILABLE, FastJSONProvider, RawJSON, dumps_bytes  # noqa: E402
+from models import Product  # noqa: E402
+
+
+def build_payload(categories: int, per_category: int) -> dict:
+    """Response shaped like /api/search-products, as product dicts"""
+    products = {
+        f'Category {c}': [
+            Product.from_dict({
+                'name': f'Wireless Bluetooth Headphones Model {c}-{i} with Noise Cancelling',
+                'price': f'${20 + i}.99',
+                'image': f'https://images.unsplash.com/photo-{c}{i}?w=400&h=400&fit=crop&auto=format',
+                'url': f'https://www.amazon.com/s?k=wireless%20headphones%20{c}%20{i}',
+                'source': ('amazon', 'ebay', 'aliexpress')[i % 3],
+                'rating': 4.5,
+                'reviews': 1000 + i,
+            }).to_dict()
+            for i in range(per_category)]
+        for c in range(categories)
+    }
+    return {
+        'products': products,
+        'total_categories': categories,
+        'total_products': categories * per_category,
+    }
+
+
+def with_raw_categories(payload: dict) -> dict:
+    """Same response with each category pre-serialized, as cached"""
+    return dict(payload, products={
+        category: RawJSON(dumps_bytes(products), len(products))
+        for category, products in payload['products'].items()
+    })
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    print(f"orjson available: {ORJSON_AVAILABLE}, {iterations} iterations\n")
+
+    default_app = Flask('default')
+    fast_app = Flask('fast')
+    fast_app.json = FastJSONProvider(fast_app)
+
+    for categories, per_category in ((5, 3), (10, 6)):
+        payload = build_payload(categories, per_category)
+        raw_payload = with_raw_categories(payload)
+        print(f"{categories} categories x {per_category} products")
+
+        cases = [
+            ('flask default (json)', default_app, payload),
+            ('FastJSONProvider', fast_app, payload),
+            ('FastJSONProvider + cached RawJSON', fast_app, raw_payload),
+        ]
+        expected = json.loads(default_app.json.response(payload).get_data())
+
+        baseline = None
+        for label, flask_app, body in cases:
+            with flask_app.app_context():
+                assert json.loads(flask_app.json.response(body).get_data()) == expected
+                seconds = timeit.timeit(lambda: flask_app.json.response(body),
+                                        number=iterations) / iterations
+            baseline = baseline or seconds
+            print(f"  {label:<36} {seconds * 1e6:8.1f} us  {baseline / seconds:5.1f}x")
+        print()
+
+
+if __name__ == '__main__':
+    main()
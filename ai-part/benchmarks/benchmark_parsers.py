@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Benchmark HTML parsing of search result pages.
+
+Compares the original full-tree parse (BeautifulSoup + html.parser) with
+the container-only parse from html_parsing.py on each available backend and
+the streaming eBay parser, using a synthetic page shaped like an eBay results
+page.
+
+Usage: python benchmarks/benchmark_parsers.py [iterations]
+"""
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bs4 import BeautifulSoup  # noqa: E402
+
+from html_parsing import (LXML_AVAILABLE, STREAM_CHUNK_SIZE,  # noqa: E402
+                          parse_result_containers, stream_ebay_listings)
+
+
+def build_ebay_page(items: int = 60) -> str:
+    """About 280 KB of markup: page chrome, scripts and result items"""
+    noise = ''.join(
+        f'<div class="nav-{i}"><ul>' +
+        ''.join(f'<li><a href="/c/{i}/{j}">Category {i}.{j}</a></li>' for j in range(20)) +
+        '</ul></div>'
+        for i in range(80))
+    script = '<script>' + 'var x = {"k": "v"};' * 4000 + '</script>'
+    results = ''.join(
+        f'''<li class="s-item"><div class="s-item__wrapper clearfix">
+        <div class="s-item__image-section"><img class="s-item__image" src="https://i.ebayimg.com/images/g/{i}/s-l225.jpg"></div>
+        <div class="s-item__info"><a class="s-item__link" href="https://www.ebay.com/itm/{i}">
+        <h3 class="s-item__title">Wireless Bluetooth Headphones Model {i}</h3></a>
+        <span class="SECONDARY_INFO">New</span>
+        <div class="s-item__details"><span class="s-item__price">${20 + i}.99</span>
+        {'<span class="s-item__shipping">Free shipping</span>' * 3}</div></div></div></li>'''
+        for i in range(items))
+    return (f'<html><head>{script}<style>{".a{color:red}" * 2000}</style></head>'
+            f'<body>{noise}<ul class="srp-results">{results}</ul>{noise}</body></html>')
+
+
+def full_parse(content: bytes, max_results: int):
+    """The original approach: build the whole tree, then search it"""
+    soup = BeautifulSoup(content, 'html.parser')
+    return soup.find_all('div', class_='s-item__wrapper')[:max_results]
+
+
+def stream_parse(content: bytes, max_results: int):
+    """Feed the page in network-sized chunks, stopping after max_results"""
+    chunks = (content[i:i + STREAM_CHUNK_SIZE]
+              for i in range(0, len(content), STREAM_CHUNK_SIZE))
+    return stream_ebay_listings(chunks, max_results).listings
+
+
+def titles(items):
+    return [item['title'] if isinstance(item, dict) else
+            item.find('h3', class_='s-item__title').get_text(strip=True)
+            for item in items]
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    content = build_ebay_page().encode('utf-8')
+    max_results = 3
+    print(f"Page size: {len(content) / 1024:.0f} KB, {iterations} iterations, max_results={max_results}\n")
+
+    cases = [('full tree, html.parser (current)', lambda: full_parse(content, max_results)),
+             ('containers only, html.parser',
+              lambda: parse_result_containers(content, 'ebay', max_results, backend='html.parser'))]
+    if LXML_AVAILABLE:
+        cases.append(('containers only, lxml',
+                      lambda: parse_result_containers(content, 'ebay', max_results, backend='lxml')))
+    cases.append(('streaming, stop after max_results', lambda: stream_parse(content, max_results)))
+
+    expected = titles(full_parse(content, max_results))
+    baseline = None
+    for label, func in cases:
+        assert titles(func()) == expected, f"{label} extracted different items"
+        seconds = timeit.timeit(func, number=iterations) / iterations
+        baseline = baseline or seconds
+        print(f"{label:<36} {seconds * 1000:8.1f} ms/page  {baseline / seconds:5.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Benchmark product ranking (ranking.rank_products).
+
+Times ranking the candidate batches a search produces (max_results times
+PRODUCT_CANDIDATES_FACTOR, 9 by default) and larger ones, and checks that
+synthetic sample products never outrank real ones.
+
+Usage: python benchmarks/benchmark_ranking.py
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import ranking  # noqa: E402
+from models import Product  # noqa: E402
+
+SOURCES = ('google_shopping', 'amazon', 'ebay', 'aliexpress', 'sample')
+BUDGET = (20.0, 50.0)
+TOP_K = 3
+ROUNDS = 200
+
+
+def build_products(count: int, rng: random.Random):
+    return [Product(name=f'Product {i}', price=f'${rng.uniform(5, 300):.2f}',
+                    source=rng.choice(SOURCES),
+                    rating=round(rng.uniform(2.5, 5.0), 1) if rng.random() < 0.8 else None,
+                    reviews=rng.randint(0, 20000) if rng.random() < 0.8 else None,
+                    synthetic=rng.random() < 0.2)
+            for i in range(count)]
+
+
+def timed(products):
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        result = ranking.rank_products(products, TOP_K, BUDGET)
+    return result, (time.perf_counter() - start) / ROUNDS
+
+
+def main():
+    rng = random.Random(42)
+    for count in (9, 30, 100, 1000):
+        products = build_products(count, rng)
+        result, seconds = timed(products)
+        real = sum(not product.synthetic for product in products)
+        assert all(not product.synthetic for product in result[:real]), \
+            "a synthetic product outranked a real one"
+        print(f"{count:>5} candidates: {seconds * 1e6:9.1f} us")
+
+
+if __name__ == '__main__':
+    main()
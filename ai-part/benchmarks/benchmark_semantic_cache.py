@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Benchmark the Gemini similarity cache (semantic_cache.SemanticCache).
+
+Times lookups against a full cache and checks which request pairs share a
+response: paraphrases must hit, while requests for different recipients
+(e.g. a son and a daughter) must miss.
+
+Usage: python benchmarks/benchmark_semantic_cache.py
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import semantic_cache  # noqa: E402
+
+ROUNDS = 200
+
+# (stored request, later request, should the later one reuse the response)
+PAIRS = [
+    ("gift for my dad who likes coffee", "coffee gift for father", True),
+    ("present for my kids who love dinosaurs", "gift for my child who loves dinosaurs", True),
+    ("gift for my son who loves lego", "gift for my daughters who love lego", False),
+    ("gift for my mom who likes gardening", "gift for my dad who likes gardening", False),
+]
+
+RECIPIENTS = 'father mother son daughter wife husband friend colleague child'.split()
+INTERESTS = ('coffee lego gardening hiking cooking reading yoga chess music '
+             'photography painting fishing gaming running baking').split()
+
+
+def check_pairs():
+    for stored, later, should_hit in PAIRS:
+        cache = semantic_cache.SemanticCache(maxsize=8)
+        cache.set(stored, 'response')
+        hit = cache.get(later) is not None
+        assert hit == should_hit, f"{later!r} vs {stored!r}: expected hit={should_hit}"
+        print(f"{'hit ' if hit else 'miss'}  {later!r} vs {stored!r}")
+
+
+def main():
+    if not semantic_cache.NUMPY_AVAILABLE:
+        print("NumPy is not installed - the similarity cache is disabled")
+        return
+
+    check_pairs()
+    print()
+
+    rng = random.Random(42)
+    for size in (64, 256, 1024):
+        cache = semantic_cache.SemanticCache(maxsize=size)
+        for i in range(size):
+            cache.set(f"gift for my {rng.choice(RECIPIENTS)} who likes "
+                      f"{rng.choice(INTERESTS)} and {rng.choice(INTERESTS)} {i}", i)
+        queries = [f"present for my {rng.choice(RECIPIENTS)} into {rng.choice(INTERESTS)}"
+                   for _ in range(ROUNDS)]
+        start = time.perf_counter()
+        for query in queries:
+            cache.get(query)
+        seconds = (time.perf_counter() - start) / ROUNDS
+        print(f"{size:>5} stored requests: {seconds * 1e6:9.1f} us per lookup")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,203 @@
+"""
+In-process caches shared by the product and AI services
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class TTLCache:
+    """
+    Thread-safe LRU cache whose entries expire after a per-entry TTL.
+    When max_bytes is set, entries are also evicted to keep the total
+    size reported by sizeof under that budget. Expired entries are kept for
+    a further grace seconds, where only get_stale() still returns them.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 600.0,
+                 max_bytes: Optional[int] = None,
+                 sizeof: Optional[Callable[[Any], int]] = None,
+                 grace: float = 0.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.grace = grace
+        self._data = OrderedDict()  # key -> (expires_at, value, size)
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.stale_hits = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return a live entry and mark it most recently used"""
+        with self._lock:
+            entry = self._lookup(key)
+            if entry is None or entry[0] <= time.monotonic():
+                self.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def get_stale(self, key: Hashable) -> Optional[Tuple[Any, bool]]:
+        """
+        (value, stale) for a live entry or one expired within the grace
+        window, or None. Stale values should be refreshed by the caller.
+        """
+        with self._lock:
+            entry = self._lookup(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            stale = entry[0] <= time.monotonic()
+            self._data.move_to_end(key)
+            if stale:
+                self.stale_hits += 1
+            else:
+                self.hits += 1
+            return entry[1], stale
+
+    def expires_in(self, key: Hashable) -> Optional[float]:
+        """
+        Seconds until an entry expires (negative within the grace window),
+        or None when absent. Does not count as a lookup.
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            remaining = entry[0] - time.monotonic()
+            return remaining if remaining + self.grace > 0 else None
+
+    def _lookup(self, key: Hashable) -> Optional[tuple]:
+        """Entry for key, dropping it once past TTL + grace (caller holds the lock)"""
+        entry = self._data.get(key)
+        if entry is not None and entry[0] + self.grace <= time.monotonic():
+            self._remove(key)
+            self.expirations += 1
+            return None
+        return entry
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """Store an entry, evicting least recently used entries when full"""
+        ttl = self.ttl if ttl is None else ttl
+        size = self.sizeof(value) if self.sizeof else 0
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+
+        with self._lock:
+            self._remove(key)
+            self._data[key] = (time.monotonic() + ttl, value, size)
+            self.current_bytes += size
+            while len(self._data) > self.maxsize or (
+                    self.max_bytes is not None and self.current_bytes > self.max_bytes):
+                oldest = next(iter(self._data))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def _remove(self, key: Hashable):
+        """Drop an entry and its size accounting (caller holds the lock)"""
+        entry = self._data.pop(key, None)
+        if entry is not None:
+            self.current_bytes -= entry[2]
+
+    def delete(self, key: Hashable):
+        with self._lock:
+            self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.current_bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict:
+        """Snapshot of size and hit/miss counters"""
+        with self._lock:
+            # Stale hits were answered from the cache too
+            served = self.hits + self.stale_hits
+            lookups = served + self.misses
+            return {
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'bytes': self.current_bytes,
+                'hits': self.hits,
+                'stale_hits': self.stale_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'hit_rate': round(served / lookups, 3) if lookups else 0.0,
+            }
+
+
+class BackgroundRefresher:
+    """
+    Runs cache refreshes on a small thread pool, at most one per key at a
+    time, and counts how they turned out. A refresh function returns a
+    truthy value on success; falsy results count as empty.
+    """
+
+    def __init__(self, workers: int = 2, name: str = 'cache-refresh'):
+        self.workers = workers
+        self.name = name
+        self._executor = None
+        self._pending = set()
+        self._lock = threading.Lock()
+
+        self.scheduled = 0
+        self.coalesced = 0
+        self.succeeded = 0
+        self.empty = 0
+        self.failed = 0
+
+    def schedule(self, key: Hashable, fn: Callable[[], Any]) -> bool:
+        """Start fn() in the background unless key is already refreshing"""
+        with self._lock:
+            if key in self._pending:
+                self.coalesced += 1
+                return False
+            self._pending.add(key)
+            self.scheduled += 1
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix=self.name)
+
+        self._executor.submit(self._run, key, fn)
+        return True
+
+    def _run(self, key: Hashable, fn: Callable[[], Any]):
+        outcome = 'failed'
+        try:
+            outcome = 'succeeded' if fn() else 'empty'
+        except Exception as e:
+            logger.error(f"Background refresh of {key!r} failed: {str(e)}")
+        finally:
+            with self._lock:
+                self._pending.discard(key)
+                setattr(self, outcome, getattr(self, outcome) + 1)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'in_flight': len(self._pending),
+                'scheduled': self.scheduled,
+                'coalesced': self.coalesced,
+                'succeeded': self.succeeded,
+                'empty': self.empty,
+                'failed': self.failed,
+            }
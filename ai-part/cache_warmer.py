@@ -0,0 +1,225 @@
+"""
+Background product cache warmer
+Periodically searches a configured list of head queries plus the most
+requested queries seen so far, so first requests land on a warm cache.
+Each cycle has a per-host request budget: only the warmer's own upstream
+requests are charged, each one before it is sent, and the cycle stops once
+any host's budget is used up.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import Counter
+from typing import Callable, Dict, List, Optional, Tuple
+
+from rate_limiter import RequestBudget, request_budget
+from utils import normalize_search_query
+
+logger = logging.getLogger(__name__)
+
+# Gift searches we expect every season: the example categories in the
+# Gemini prompt and the keywords we keep sample images for
+DEFAULT_WARM_QUERIES = (
+    'wireless bluetooth headphones',
+    'smart watch',
+    'bluetooth speaker',
+    'coffee gift set',
+    'chocolate gift box',
+    'mystery novels',
+    'casual t-shirts',
+    'home decor',
+    'fitness equipment',
+    'art supplies',
+    'kitchen tools',
+    'board games',
+    'jewelry',
+    'outdoor gear',
+    'laptop accessories',
+    'phone accessories',
+)
+
+
+def parse_host_budgets(spec: str) -> Dict[str, int]:
+    """Parse "host=requests,host=requests" into a dict, skipping invalid entries"""
+    budgets = {}
+    for entry in filter(None, (part.strip() for part in spec.split(','))):
+        try:
+            host, requests = entry.split('=')
+            budgets[host.strip().lower()] = int(requests)
+        except ValueError:
+            logger.warning(f"Ignoring invalid warmer host budget '{entry}'")
+    return budgets
+
+
+class QueryCounter:
+    """Thread-safe, bounded count of requested (query, max_results) pairs"""
+
+    def __init__(self, maxsize: int = 10000):
+        self.maxsize = maxsize
+        self._counts = Counter()
+        self._queries = {}  # normalized key -> query as last requested
+        self._lock = threading.Lock()
+
+    def record(self, query: str, max_results: int):
+        key = (normalize_search_query(query), max_results)
+        with self._lock:
+            self._counts[key] += 1
+            self._queries[key] = query
+            if len(self._counts) > self.maxsize:
+                # Keep the more popular half
+                for old, _ in self._counts.most_common()[self.maxsize // 2:]:
+                    del self._counts[old]
+                    del self._queries[old]
+
+    def top(self, n: int) -> List[Tuple[str, int]]:
+        """The n most requested (query, max_results) pairs"""
+        with self._lock:
+            return [(self._queries[key], key[1])
+                    for key, _ in self._counts.most_common(n)]
+
+
+# Filled in by ProductScraper for every search
+query_stats = QueryCounter()
+
+
+class CacheWarmer:
+    """
+    Warms ProductScraper's cache every interval seconds. get_scraper is
+    called on each cycle so the scraper is only created once warming starts.
+    Queries whose cached results outlive the next cycle are skipped.
+    """
+
+    def __init__(self, get_scraper: Callable, queries: List[str],
+                 top_n: int = 20, max_results: int = 3, interval: float = 900,
+                 initial_delay: float = 30, delay: float = 1.0,
+                 host_budget: int = 20, host_budgets: Optional[Dict[str, int]] = None):
+        self.get_scraper = get_scraper
+        self.queries = list(queries)
+        self.top_n = top_n
+        self.max_results = max_results
+        self.interval = interval
+        self.initial_delay = initial_delay
+        self.delay = delay
+        self.host_budget = host_budget
+        self.host_budgets = host_budgets or {}
+
+        self._stop = threading.Event()
+        self._thread = None
+
+        self.cycles = 0
+        self.warmed = 0
+        self.empty = 0
+        self.skipped = 0
+        self.failed = 0
+        self.budget_stops = 0
+        self.last_run = None
+        self.last_duration = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name='cache-warmer',
+                                            daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _loop(self):
+        if self._stop.wait(self.initial_delay):
+            return
+        while True:
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.error(f"Cache warming cycle failed: {str(e)}")
+            if self._stop.wait(self.interval):
+                return
+
+    def plan(self) -> List[Tuple[str, int]]:
+        """Configured queries then the most requested ones, without duplicates"""
+        planned = {}
+        for query, max_results in ([(q, self.max_results) for q in self.queries] +
+                                   query_stats.top(self.top_n)):
+            planned.setdefault((normalize_search_query(query), max_results),
+                               (query, max_results))
+        return list(planned.values())
+
+    def run_once(self) -> int:
+        """One warming cycle; returns the number of queries searched"""
+        scraper = self.get_scraper()
+        started = time.monotonic()
+        budget = RequestBudget(self.host_budget, self.host_budgets)
+        searched = 0
+
+        for query, max_results in self.plan():
+            if self._stop.is_set():
+                break
+
+            exhausted = budget.exhausted()
+            if exhausted:
+                logger.info(f"Cache warming stopped: request budget for {exhausted} used")
+                self.budget_stops += 1
+                break
+
+            # Refresh entries that would expire before the next cycle
+            expires_in = scraper.cache.expires_in(
+                (normalize_search_query(query), max_results))
+            if expires_in is not None and expires_in > self.interval:
+                self.skipped += 1
+                continue
+
+            try:
+                # Requests over budget are refused, so a query cannot overrun it
+                with request_budget(budget):
+                    warmed = scraper.warm(query, max_results)
+                if warmed:
+                    self.warmed += 1
+                else:
+                    # Nothing real came back, so nothing was cached
+                    self.empty += 1
+            except Exception as e:
+                logger.error(f"Error warming '{query}': {str(e)}")
+                self.failed += 1
+            searched += 1
+
+            if self._stop.wait(self.delay):
+                break
+
+        self.cycles += 1
+        self.last_run = time.time()
+        self.last_duration = round(time.monotonic() - started, 2)
+        logger.info(f"Cache warming searched {searched} queries in {self.last_duration}s")
+        return searched
+
+    def stats(self) -> Dict:
+        return {
+            'queries': len(self.queries),
+            'top_n': self.top_n,
+            'interval': self.interval,
+            'cycles': self.cycles,
+            'warmed': self.warmed,
+            'empty': self.empty,
+            'skipped_fresh': self.skipped,
+            'failed': self.failed,
+            'budget_stops': self.budget_stops,
+            'last_run': self.last_run,
+            'last_duration_s': self.last_duration,
+        }
+
+
+def create_warmer(get_scraper: Callable) -> CacheWarmer:
+    """CacheWarmer configured from WARMER_* settings"""
+    configured = os.getenv('WARMER_QUERIES')
+    queries = (DEFAULT_WARM_QUERIES if configured is None else
+               [q.strip() for q in configured.split(',') if q.strip()])
+    return CacheWarmer(
+        get_scraper,
+        queries,
+        top_n=int(os.getenv('WARMER_TOP_N', 20)),
+        interval=float(os.getenv('WARMER_INTERVAL', 900)),
+        initial_delay=float(os.getenv('WARMER_INITIAL_DELAY', 30)),
+        delay=float(os.getenv('WARMER_DELAY', 1.0)),
+        host_budget=int(os.getenv('WARMER_HOST_BUDGET', 20)),
+        host_budgets=parse_host_budgets(os.getenv('WARMER_HOST_BUDGETS', '')))
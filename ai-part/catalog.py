@@ -0,0 +1,222 @@
+"""
+Persistent local product catalog
+Every real product a search returns is kept in SQLite with the time it was
+last seen, indexed for full-text search on its name (FTS5). Searches are
+answered from the catalog when it has enough recently seen matches, so
+repeat categories skip the upstream sources entirely.
+"""
+
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+from models import Product
+from utils import remove_duplicate_products
+
+logger = logging.getLogger(__name__)
+
+# Words that narrow nothing in a product name
+_STOPWORDS = frozenset(
+    'a an and for gift gifts in of on or the to with'.split())
+
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS products (
+    id INTEGER PRIMARY KEY,
+    url TEXT NOT NULL UNIQUE,
+    name TEXT NOT NULL,
+    price TEXT NOT NULL,
+    price_value REAL NOT NULL,
+    image TEXT,
+    source TEXT,
+    rating REAL,
+    reviews INTEGER,
+    shipping TEXT,
+    condition TEXT,
+    merchant TEXT,
+    last_seen REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS products_last_seen ON products(last_seen);
+CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5(
+    name, content='products', content_rowid='id');
+CREATE TRIGGER IF NOT EXISTS products_ai AFTER INSERT ON products BEGIN
+    INSERT INTO products_fts(rowid, name) VALUES (new.id, new.name);
+END;
+CREATE TRIGGER IF NOT EXISTS products_ad AFTER DELETE ON products BEGIN
+    INSERT INTO products_fts(products_fts, rowid, name) VALUES ('delete', old.id, old.name);
+END;
+CREATE TRIGGER IF NOT EXISTS products_au AFTER UPDATE OF name ON products BEGIN
+    INSERT INTO products_fts(products_fts, rowid, name) VALUES ('delete', old.id, old.name);
+    INSERT INTO products_fts(rowid, name) VALUES (new.id, new.name);
+END;
+"""
+
+_UPSERT = """
+INSERT INTO products (url, name, price, price_value, image, source, rating,
+                      reviews, shipping, condition, merchant, last_seen)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(url) DO UPDATE SET
+    name = excluded.name, price = excluded.price,
+    price_value = excluded.price_value, image = excluded.image,
+    source = excluded.source, rating = excluded.rating,
+    reviews = excluded.reviews, shipping = excluded.shipping,
+    condition = excluded.condition, merchant = excluded.merchant,
+    last_seen = excluded.last_seen
+"""
+
+_SEARCH = """
+SELECT p.name, p.price, p.price_value, p.image, p.url, p.source, p.rating,
+       p.reviews, p.shipping, p.condition, p.merchant
+FROM products_fts JOIN products p ON p.id = products_fts.rowid
+WHERE products_fts MATCH ? AND p.last_seen >= ?
+ORDER BY bm25(products_fts)
+LIMIT ?
+"""
+
+
+def match_expression(query: str) -> Optional[str]:
+    """
+    FTS5 query requiring every meaningful word of a search query, or None
+    when nothing is left to match on
+    """
+    words = [word for word in _TOKEN_RE.findall(query.lower())
+             if word not in _STOPWORDS and len(word) > 1]
+    if not words:
+        return None
+    # Quoted so words like "and"/"near" are not read as operators
+    return ' '.join(f'"{word}"' for word in dict.fromkeys(words))
+
+
+class ProductCatalog:
+    """
+    SQLite-backed catalog shared by all threads through one connection.
+    Products count as fresh for fresh_for seconds after they were last seen
+    and are deleted once older than retention.
+    """
+
+    def __init__(self, path: str, fresh_for: float = 86400,
+                 retention: float = 30 * 86400):
+        self.path = path
+        self.fresh_for = fresh_for
+        self.retention = retention
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(_SCHEMA)
+        self._migrate()
+        self.prune()
+
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+
+    def _migrate(self):
+        """Add columns introduced after a catalog file was created"""
+        columns = {row[1] for row in self._conn.execute('PRAGMA table_info(products)')}
+        if 'merchant' not in columns:
+            self._conn.execute('ALTER TABLE products ADD COLUMN merchant TEXT')
+
+    def search(self, query: str, limit: int) -> List[Product]:
+        """Up to limit fresh products whose names match every word of query"""
+        expression = match_expression(query)
+        if expression is None:
+            return []
+
+        with self._lock:
+            rows = self._conn.execute(
+                _SEARCH, (expression, time.time() - self.fresh_for, limit)).fetchall()
+        return [Product(name=name, price=price, price_value=price_value,
+                        image=image or '', url=url, source=source or '',
+                        rating=rating, reviews=reviews, shipping=shipping,
+                        condition=condition, merchant=merchant)
+                for (name, price, price_value, image, url, source, rating,
+                     reviews, shipping, condition, merchant) in rows]
+
+    def lookup(self, query: str, limit: int) -> Optional[List[Product]]:
+        """
+        De-duplicated search(), or None unless all limit products are found:
+        a partial set would leave a budget re-rank fewer candidates than
+        upstream gives
+        """
+        products = remove_duplicate_products(self.search(query, limit))
+        hit = len(products) >= limit
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return products if hit else None
+
+    def add(self, products: Iterable[Product]) -> int:
+        """Insert or refresh real (non-synthetic) products; returns rows written"""
+        now = time.time()
+        rows = [(p.url, p.name, p.price, p.price_value, p.image, p.source,
+                 p.rating, p.reviews, p.shipping, p.condition, p.merchant, now)
+                for p in products if not p.synthetic and p.url]
+        if not rows:
+            return 0
+
+        with self._lock, self._conn:
+            self._conn.executemany(_UPSERT, rows)
+            self.writes += len(rows)
+        return len(rows)
+
+    def prune(self) -> int:
+        """Delete products not seen within the retention window"""
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                'DELETE FROM products WHERE last_seen < ?',
+                (time.time() - self.retention,))
+        return cursor.rowcount
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM products').fetchone()[0]
+
+    def stats(self) -> Dict:
+        products = len(self)
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'path': self.path,
+                'products': products,
+                'fresh_for': self.fresh_for,
+                'hits': self.hits,
+                'misses': self.misses,
+                'writes': self.writes,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+            }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def create_catalog() -> Optional[ProductCatalog]:
+    """
+    Catalog configured from CATALOG_* settings, or None when disabled or
+    when SQLite cannot open it (e.g. built without FTS5)
+    """
+    if os.getenv('CATALOG_ENABLED', 'true').lower() != 'true':
+        return None
+
+    path = os.getenv('CATALOG_PATH', os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), 'product_catalog.db'))
+    try:
+        return ProductCatalog(
+            path,
+            fresh_for=float(os.getenv('CATALOG_FRESH_FOR', 86400)),
+            retention=float(os.getenv('CATALOG_RETENTION', 30 * 86400)))
+    except sqlite3.Error as e:
+        logger.error(f"Product catalog unavailable ({path}): {str(e)}")
+        return None
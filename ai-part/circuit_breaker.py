@@ -0,0 +1,239 @@
+"""
+Per-source circuit breakers for the product scrapers
+"""
+
+import contextvars
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict
+
+logger = logging.getLogger(__name__)
+
+SUCCESS = 'success'
+FAILURE = 'failure'
+EMPTY = 'empty'
+
+
+# Share of a source's timeout that must have gone to upstream requests
+# before the timeout is held against the source
+UPSTREAM_TIMEOUT_SHARE = 0.5
+
+
+class UpstreamClock:
+    """
+    Time one source search has spent waiting on upstream hosts, as opposed
+    to queueing in our own rate limiter or worker pool
+    """
+
+    __slots__ = ('spent', 'started')
+
+    def __init__(self):
+        self.spent = 0.0
+        self.started = None
+
+    def elapsed(self) -> float:
+        """Upstream time so far, including a request still in flight"""
+        started = self.started
+        return self.spent + (time.monotonic() - started if started is not None else 0.0)
+
+
+_upstream_clock = contextvars.ContextVar('upstream_clock', default=None)
+
+
+@contextmanager
+def timing_upstream(clock: UpstreamClock):
+    """Charge upstream_call() blocks inside (this thread or task) to clock"""
+    token = _upstream_clock.set(clock)
+    try:
+        yield clock
+    finally:
+        _upstream_clock.reset(token)
+
+
+@contextmanager
+def upstream_call():
+    """Mark code that waits on an upstream host"""
+    clock = _upstream_clock.get()
+    if clock is None or clock.started is not None:
+        yield
+        return
+    clock.started = time.monotonic()
+    try:
+        yield
+    finally:
+        clock.spent += time.monotonic() - clock.started
+        clock.started = None
+
+
+class LocalFailure(Exception):
+    """
+    A request that failed on our side (e.g. refused by the rate limiter)
+    and says nothing about the source's health
+    """
+
+
+class CircuitBreaker:
+    """
+    Tracks rolling failure and empty-result rates for one source.
+    Once a rate crosses its threshold the breaker opens and the source is
+    skipped for a cool-down period, after which single half-open probes
+    decide whether to close it again.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, name: str, window: int = 20, min_calls: int = 5,
+                 failure_threshold: float = 0.5, empty_threshold: float = 0.8,
+                 cooldown: float = 60.0):
+        self.name = name
+        self.min_calls = min_calls
+        self.failure_threshold = failure_threshold
+        self.empty_threshold = empty_threshold
+        self.cooldown = cooldown
+
+        self.state = self.CLOSED
+        self.outcomes = deque(maxlen=window)
+        self.opened_at = 0.0
+        self.probe_started = None
+        self.skipped = 0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Whether a request to this source should be attempted now"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+
+            now = time.monotonic()
+            if self.state == self.OPEN and now - self.opened_at >= self.cooldown:
+                self.state = self.HALF_OPEN
+                self.probe_started = None
+
+            if self.state == self.HALF_OPEN:
+                # One probe at a time; a probe that never reported back expires
+                if self.probe_started is None or now - self.probe_started >= self.cooldown:
+                    self.probe_started = now
+                    return True
+
+            self.skipped += 1
+            return False
+
+    def record_success(self):
+        self._record(SUCCESS)
+
+    def record_failure(self):
+        self._record(FAILURE)
+
+    def record_error(self, error: Exception):
+        """record_failure, unless the error was our own (LocalFailure)"""
+        if not isinstance(error, LocalFailure):
+            self._record(FAILURE)
+
+    def record_timeout(self, upstream_seconds: float, timeout: float):
+        """
+        A search that missed its timeout counts as a failure only when the
+        upstream requests themselves took most of it
+        """
+        if upstream_seconds >= timeout * UPSTREAM_TIMEOUT_SHARE:
+            self._record(FAILURE)
+
+    def record_empty(self):
+        self._record(EMPTY)
+
+    def _record(self, outcome: str):
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                if outcome == SUCCESS:
+                    logger.info(f"Circuit for {self.name} closed after probe")
+                    self.state = self.CLOSED
+                    self.outcomes.clear()
+                else:
+                    self._open()
+                return
+
+            if self.state == self.OPEN:
+                return
+
+            self.outcomes.append(outcome)
+            calls = len(self.outcomes)
+            if calls < self.min_calls:
+                return
+
+            failure_rate = self.outcomes.count(FAILURE) / calls
+            empty_rate = self.outcomes.count(EMPTY) / calls
+            if failure_rate >= self.failure_threshold or empty_rate >= self.empty_threshold:
+                logger.warning(
+                    f"Circuit for {self.name} opened "
+                    f"(failure rate {failure_rate:.2f}, empty rate {empty_rate:.2f})")
+                self._open()
+
+    def _open(self):
+        """Open the breaker (caller holds the lock)"""
+        self.state = self.OPEN
+        self.opened_at = time.monotonic()
+        self.probe_started = None
+        self.outcomes.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            calls = len(self.outcomes)
+            return {
+                'state': self.state,
+                'calls': calls,
+                'failure_rate': round(self.outcomes.count(FAILURE) / calls, 3) if calls else 0.0,
+                'empty_rate': round(self.outcomes.count(EMPTY) / calls, 3) if calls else 0.0,
+                'skipped': self.skipped,
+            }
+
+
+class BreakerRegistry:
+    """
+    Lazily creates one breaker per source name with shared settings
+    """
+
+    def __init__(self, **settings):
+        self.settings = settings
+        self._breakers = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str) -> CircuitBreaker:
+        breaker = self._breakers.get(name)
+        if breaker is None:
+            with self._lock:
+                breaker = self._breakers.get(name)
+                if breaker is None:
+                    breaker = CircuitBreaker(name, **self.settings)
+                    self._breakers[name] = breaker
+        return breaker
+
+    def stats(self) -> Dict:
+        return {name: breaker.stats() for name, breaker in list(self._breakers.items())}
+
+
+_breakers = None
+_breakers_lock = threading.Lock()
+
+
+def get_breakers() -> BreakerRegistry:
+    """
+    Process-wide breaker registry, configured from CIRCUIT_BREAKER_* settings
+    """
+    global _breakers
+    if _breakers is None:
+        with _breakers_lock:
+            if _breakers is None:
+                _breakers = BreakerRegistry(
+                    window=int(os.getenv('CIRCUIT_BREAKER_WINDOW', 20)),
+                    min_calls=int(os.getenv('CIRCUIT_BREAKER_MIN_CALLS', 5)),
+                    failure_threshold=float(
+                        os.getenv('CIRCUIT_BREAKER_FAILURE_RATE', 0.5)),
+                    empty_threshold=float(
+                        os.getenv('CIRCUIT_BREAKER_EMPTY_RATE', 0.8)),
+                    cooldown=float(os.getenv('CIRCUIT_BREAKER_COOLDOWN', 60)))
+    return _breakers
@@ -0,0 +1,213 @@
+"""
+Pool of warm Selenium drivers
+Starting headless Chrome takes seconds, so drivers are created once, handed
+out with checkout/checkin, health-checked before reuse and recycled after a
+number of pages, after a maximum age or when they crash.
+"""
+
+import atexit
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class _PooledDriver:
+    __slots__ = ('driver', 'pages', 'created_at')
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.pages = 0
+        self.created_at = time.monotonic()
+
+
+class DriverPool:
+    """
+    Fixed-size pool of drivers built by factory (which returns None on failure)
+    """
+
+    def __init__(self, factory: Callable, size: int = 2, max_pages: int = 50,
+                 max_age: float = 1800.0, checkout_timeout: float = 10.0):
+        self.factory = factory
+        self.size = size
+        self.max_pages = max_pages
+        self.max_age = max_age
+        self.checkout_timeout = checkout_timeout
+
+        self._idle = deque()
+        self._in_use = {}
+        self._live = 0  # idle + checked out + being created
+        self._closed = False
+        self._cond = threading.Condition()
+
+        self.created = 0
+        self.recycled = 0
+        self.checkouts = 0
+        self.timeouts = 0
+
+        atexit.register(self.shutdown)
+
+    def checkout(self, timeout: Optional[float] = None):
+        """
+        Take a healthy driver, creating one if the pool is not full.
+        Returns None if none became available within timeout.
+        """
+        timeout = self.checkout_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+
+        while True:
+            entry = None
+            create = False
+
+            with self._cond:
+                while True:
+                    if self._closed:
+                        return None
+                    if self._idle:
+                        entry = self._idle.pop()
+                        break
+                    if self._live < self.size:
+                        self._live += 1
+                        create = True
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.timeouts += 1
+                        return None
+                    self._cond.wait(remaining)
+
+            if create:
+                entry = self._create()
+                if entry is None:
+                    return None
+            elif not self._is_usable(entry):
+                self._retire(entry)
+                continue
+
+            with self._cond:
+                self._in_use[id(entry.driver)] = entry
+                self.checkouts += 1
+            return entry.driver
+
+    def checkin(self, driver, failed: bool = False):
+        """
+        Return a driver after use. Failed, worn-out or old drivers are quit
+        instead of going back to the pool.
+        """
+        with self._cond:
+            entry = self._in_use.pop(id(driver), None)
+            if entry is None:
+                return
+            entry.pages += 1
+            if not (failed or self._closed or self._worn_out(entry)):
+                self._idle.append(entry)
+                self._cond.notify()
+                return
+
+        self._retire(entry)
+
+    @contextmanager
+    def driver(self, timeout: Optional[float] = None):
+        """
+        Context manager around checkout/checkin; yields None when the pool
+        has no driver to give. An exception marks the driver as failed.
+        """
+        driver = self.checkout(timeout)
+        failed = False
+        try:
+            yield driver
+        except Exception:
+            failed = True
+            raise
+        finally:
+            if driver is not None:
+                self.checkin(driver, failed=failed)
+
+    def prewarm(self, count: Optional[int] = None):
+        """Start drivers ahead of the first request"""
+        for _ in range(min(count or self.size, self.size)):
+            with self._cond:
+                if self._closed or self._live >= self.size:
+                    return
+                self._live += 1
+
+            entry = self._create()
+            if entry is None:
+                return
+            with self._cond:
+                self._idle.append(entry)
+                self._cond.notify()
+
+    def shutdown(self):
+        """Quit idle drivers; checked-out ones are quit when returned"""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._cond.notify_all()
+
+        for entry in idle:
+            self._retire(entry)
+        logger.info("Selenium driver pool shut down")
+
+    def stats(self) -> Dict:
+        with self._cond:
+            return {
+                'size': self.size,
+                'live': self._live,
+                'idle': len(self._idle),
+                'in_use': len(self._in_use),
+                'created': self.created,
+                'recycled': self.recycled,
+                'checkouts': self.checkouts,
+                'timeouts': self.timeouts,
+            }
+
+    def _create(self) -> Optional[_PooledDriver]:
+        """Build a driver for a slot already reserved in _live"""
+        driver = None
+        try:
+            driver = self.factory()
+        except Exception as e:
+            logger.error(f"Error creating pooled driver: {str(e)}")
+
+        with self._cond:
+            if driver is None:
+                self._live -= 1
+                self._cond.notify()
+                return None
+            self.created += 1
+        return _PooledDriver(driver)
+
+    def _worn_out(self, entry: _PooledDriver) -> bool:
+        return (entry.pages >= self.max_pages or
+                time.monotonic() - entry.created_at >= self.max_age)
+
+    def _is_usable(self, entry: _PooledDriver) -> bool:
+        """Health check before handing out an idle driver"""
+        if self._worn_out(entry):
+            return False
+        try:
+            entry.driver.execute_script('return 1')
+            return True
+        except Exception as e:
+            logger.warning(f"Pooled driver failed health check: {str(e)}")
+            return False
+
+    def _retire(self, entry: _PooledDriver):
+        """Quit a driver and free its slot"""
+        try:
+            entry.driver.quit()
+        except Exception as e:
+            logger.warning(f"Error quitting driver: {str(e)}")
+
+        with self._cond:
+            self._live -= 1
+            self.recycled += 1
+            self._cond.notify()
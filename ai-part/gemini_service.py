@@ -1,18 +1,52 @@
-import google.generativeai as genai
+import copy
+import hashlib
 import json
 import logging
-from typing import Dict, List, Optional
+import os
+from typing import Dict, Iterator, List, Optional
+
+from cache import TTLCache
+from json_stream import IncrementalJSONParser
+from semantic_cache import create_semantic_cache
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_MODEL_NAME = 'gemini-2.0-flash-lite'
+
+
+def _json_size(value) -> int:
+    """Approximate memory footprint of a cached response"""
+    return len(json.dumps(value))
+
 
 class GeminiService:
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, model_name: str = DEFAULT_MODEL_NAME, cache=None,
+                 semantic_cache=None):
+        """
+        cache can be any object with get(key) and set(key, value);
+        by default a TTL + LRU cache bounded by GEMINI_CACHE_MAX_BYTES is used.
+        semantic_cache (see semantic_cache.py) answers paraphrased requests
+        the exact cache misses; by default it is configured from the environment.
+        """
         if not api_key:
             raise ValueError("Gemini API key is required")
 
+        # Imported here: the SDK takes about a second to load
+        import google.generativeai as genai
+
         genai.configure(api_key=api_key)
-        self.model = genai.GenerativeModel('gemini-2.0-flash-lite')
+        self.model_name = model_name
+        self.model = genai.GenerativeModel(model_name)
+
+        if cache is None:
+            cache = TTLCache(
+                maxsize=int(os.getenv('GEMINI_CACHE_SIZE', 512)),
+                ttl=float(os.getenv('GEMINI_CACHE_TTL', 900)),
+                max_bytes=int(os.getenv('GEMINI_CACHE_MAX_BYTES', 8 * 1024 * 1024)),
+                sizeof=_json_size)
+        self.cache = cache
+        self.semantic_cache = (create_semantic_cache() if semantic_cache is None
+                               else semantic_cache)
 
     def generate_gift_recommendations(self, user_message: str, context: str = "", preferences: Dict = None) -> Optional[Dict]:
         """
@@ -23,6 +57,17 @@ class GeminiService:
             prompt = self._build_recommendation_prompt(
                 user_message, context, preferences)
 
+            # Identical prompts reuse the already-parsed response
+            cache_key = self._cache_key(prompt)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                logger.info("Gemini cache hit for recommendations")
+                return copy.deepcopy(cached)
+
+            similar = self._similar_response(user_message, context, preferences)
+            if similar is not None:
+                return copy.deepcopy(similar)
+
             # Generate response from Gemini
             response = self.model.generate_content(prompt)
 
@@ -33,12 +78,106 @@ class GeminiService:
             # Parse the response
             parsed_response = self._parse_gemini_response(response.text)
 
+            self.cache.set(cache_key, copy.deepcopy(parsed_response))
+            self._remember_response(user_message, context, preferences, parsed_response)
             return parsed_response
 
         except Exception as e:
             logger.error(f"Error generating recommendations: {str(e)}")
             return None
 
+    def stream_gift_recommendations(self, user_message: str, context: str = "",
+                                    preferences: Dict = None) -> Iterator[Dict]:
+        """
+        Stream gift recommendations as the model generates them.
+
+        Yields event dicts:
+          {'type': 'response', 'text': ...}                 response text as it arrives
+          {'type': 'recommendation', 'category': ..., 'keywords': ...}
+          {'type': 'questions', 'questions': [...]}
+          {'type': 'done', 'result': {...} or None}        final parsed response
+        """
+        try:
+            prompt = self._build_recommendation_prompt(
+                user_message, context, preferences)
+
+            cache_key = self._cache_key(prompt)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                logger.info("Gemini cache hit for streamed recommendations")
+                yield from self._replay_events(copy.deepcopy(cached))
+                return
+
+            similar = self._similar_response(user_message, context, preferences)
+            if similar is not None:
+                yield from self._replay_events(copy.deepcopy(similar))
+                return
+
+            parser = IncrementalJSONParser()
+            chunks = []
+
+            for chunk in self.model.generate_content(prompt, stream=True):
+                try:
+                    text = chunk.text
+                except ValueError:
+                    # Chunks without text parts (e.g. safety metadata)
+                    continue
+                if not text:
+                    continue
+
+                chunks.append(text)
+                if parser is None:
+                    continue
+                try:
+                    events = parser.feed(text)
+                except Exception as e:
+                    # Keep buffering; the full-text parse below still answers
+                    logger.warning(f"Incremental parse failed, waiting for the full response: {str(e)}")
+                    parser = None
+                    continue
+                for event in events:
+                    yield from self._stream_event(event)
+
+            full_text = ''.join(chunks)
+            if not full_text:
+                logger.error("Empty response from Gemini")
+                yield {'type': 'done', 'result': None}
+                return
+
+            # The complete text is authoritative (and covers non-JSON answers)
+            parsed_response = self._parse_gemini_response(full_text)
+            self.cache.set(cache_key, copy.deepcopy(parsed_response))
+            self._remember_response(user_message, context, preferences, parsed_response)
+            yield {'type': 'done', 'result': parsed_response}
+
+        except Exception as e:
+            logger.error(f"Error streaming recommendations: {str(e)}")
+            yield {'type': 'done', 'result': None}
+
+    def _stream_event(self, event) -> Iterator[Dict]:
+        """
+        Translate incremental parser events into stream events
+        """
+        kind = event[0]
+        if kind == 'response_delta':
+            yield {'type': 'response', 'text': event[1]}
+        elif kind == 'recommendation':
+            _, category, keywords = event
+            if isinstance(keywords, str) and keywords.strip():
+                yield {'type': 'recommendation', 'category': category, 'keywords': keywords}
+        elif kind == 'field' and event[1] == 'questions' and isinstance(event[2], list):
+            yield {'type': 'questions', 'questions': event[2]}
+
+    def _replay_events(self, parsed_response: Dict) -> Iterator[Dict]:
+        """
+        Emit a cached response in the same shape as a live stream
+        """
+        yield {'type': 'response', 'text': parsed_response.get('response', '')}
+        for category, keywords in parsed_response.get('recommendations', {}).items():
+            yield {'type': 'recommendation', 'category': category, 'keywords': keywords}
+        yield {'type': 'questions', 'questions': parsed_response.get('questions', [])}
+        yield {'type': 'done', 'result': parsed_response}
+
     def generate_follow_up_questions(self, user_message: str, context: str = "") -> List[str]:
         """
         Generate follow-up questions to better understand user preferences
@@ -62,34 +201,83 @@ Return only a JSON array of questions, like:
 ["What's your budget range?", "What are their main hobbies?"]
 """
 
+            cache_key = self._cache_key(prompt)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                logger.info("Gemini cache hit for follow-up questions")
+                return list(cached)
+
             response = self.model.generate_content(prompt)
 
             if not response or not response.text:
                 return []
 
-            # Try to parse JSON response
-            try:
-                questions = json.loads(response.text.strip())
-                if isinstance(questions, list):
-                    return questions[:4]  # Limit to 4 questions
-            except json.JSONDecodeError:
-                # If JSON parsing fails, extract questions manually
-                lines = response.text.strip().split('\n')
-                questions = []
-                for line in lines:
-                    line = line.strip()
-                    if line.startswith('"') and line.endswith('"'):
-                        questions.append(line[1:-1])
-                    elif line.startswith('- '):
-                        questions.append(line[2:])
-                return questions[:4]
-
-            return []
+            questions = self._parse_questions(response.text)
+            if questions:
+                self.cache.set(cache_key, list(questions))
+            return questions
 
         except Exception as e:
             logger.error(f"Error generating questions: {str(e)}")
             return []
 
+    def _parse_questions(self, response_text: str) -> List[str]:
+        """
+        Parse a follow-up questions response into a list
+        """
+        # Try to parse JSON response
+        try:
+            questions = json.loads(response_text.strip())
+            if isinstance(questions, list):
+                return questions[:4]  # Limit to 4 questions
+        except json.JSONDecodeError:
+            # If JSON parsing fails, extract questions manually
+            lines = response_text.strip().split('\n')
+            questions = []
+            for line in lines:
+                line = line.strip()
+                if line.startswith('"') and line.endswith('"'):
+                    questions.append(line[1:-1])
+                elif line.startswith('- '):
+                    questions.append(line[2:])
+            return questions[:4]
+
+        return []
+
+    def _similar_response(self, user_message: str, context: str,
+                          preferences: Dict) -> Optional[Dict]:
+        """
+        Cached response to a near-paraphrase of this request in the same
+        conversation context, if the similarity cache has one
+        """
+        if self.semantic_cache is None:
+            return None
+        try:
+            return self.semantic_cache.get(
+                user_message, f"{self.model_name}\x00{context}", preferences)
+        except Exception as e:
+            logger.error(f"Semantic cache lookup failed: {str(e)}")
+            return None
+
+    def _remember_response(self, user_message: str, context: str,
+                           preferences: Dict, parsed_response: Dict):
+        """Add a response with recommendations to the similarity cache"""
+        if self.semantic_cache is None or not parsed_response.get('recommendations'):
+            return
+        try:
+            self.semantic_cache.set(user_message, copy.deepcopy(parsed_response),
+                                    f"{self.model_name}\x00{context}", preferences)
+        except Exception as e:
+            logger.error(f"Semantic cache update failed: {str(e)}")
+
+    def _cache_key(self, prompt: str) -> str:
+        """
+        Cache key for a final prompt: hash of model name plus prompt text
+        """
+        digest = hashlib.sha256(
+            f"{self.model_name}\x00{prompt}".encode('utf-8'))
+        return digest.hexdigest()
+
     def _build_recommendation_prompt(self, user_message: str, context: str, preferences: Dict) -> str:
         """
         Build a comprehensive prompt for gift recommendations
@@ -110,14 +298,14 @@ For gift recommendations, provide them as key-value pairs where:
 - Key: category/type of gift (e.g., "tech_gadgets", "books", "clothing")
 - Value: specific search keywords that would find good products (e.g., "wireless bluetooth headphones", "mystery novels", "casual t-shirts")
 
-Return your response in this JSON format:
+Return your response in this JSON format (keep the fields in this order):
 {{
-    "questions": ["question1", "question2"],
     "recommendations": {{
         "category1": "search keywords",
         "category2": "search keywords"
     }},
-    "response": "Your friendly explanation of the suggestions"
+    "response": "Your friendly explanation of the suggestions",
+    "questions": ["question1", "question2"]
 }}
 
 Guidelines:
@@ -0,0 +1,266 @@
+"""
+HTML parsing backends for the marketplace scrapers.
+Only the result containers of a search page are turned into a tree
+(SoupStrainer filtering), and the underlying parser is selectable per source.
+eBay can also be parsed incrementally while the page downloads, stopping as
+soon as enough listings have been read.
+"""
+
+import codecs
+import logging
+import os
+import re
+from html.parser import HTMLParser
+from typing import Dict, List
+
+logger = logging.getLogger(__name__)
+
+try:
+    import lxml  # noqa: F401
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+PARSER_BACKENDS = ('lxml', 'html.parser', 'stream')
+
+# Sources with an event-driven parser, and their default backend
+STREAMING_SOURCES = {'ebay'}
+DEFAULT_BACKENDS = {'ebay': 'stream'}
+
+# Chunk size used when reading a response body incrementally
+STREAM_CHUNK_SIZE = 16 * 1024
+
+EBAY_CONDITION_RE = re.compile(r'(New|Used|Refurbished)')
+
+
+def has_class(name: str):
+    """
+    Pattern matching one class in a class attribute; strainers see the raw
+    attribute string, so a plain class name would miss "a b" values
+    """
+    return re.compile(rf'(^|\s){re.escape(name)}(\s|$)')
+
+
+# Result container (tag name, attributes) for each scraped source
+RESULT_CONTAINERS = {
+    'google_shopping': ('div', {'data-docid': True}),
+    'amazon': ('div', {'data-component-type': 's-search-result'}),
+    'ebay': ('div', {'class': has_class('s-item__wrapper')}),
+}
+
+_strainers = {}
+
+
+def _strainer(source: str):
+    """SoupStrainer for a source's result containers (bs4 is imported on first use)"""
+    strainer = _strainers.get(source)
+    if strainer is None:
+        from bs4 import SoupStrainer
+
+        name, attrs = RESULT_CONTAINERS[source]
+        strainer = _strainers[source] = SoupStrainer(name, attrs)
+    return strainer
+
+
+def _tree_backend() -> str:
+    """Default tree builder: HTML_PARSER, then lxml when installed"""
+    backend = os.getenv('HTML_PARSER') or (
+        'lxml' if LXML_AVAILABLE else 'html.parser')
+    return backend if backend != 'stream' else 'html.parser'
+
+
+def get_parser_backend(source: str) -> str:
+    """
+    Parser backend for a source: HTML_PARSER_<SOURCE>, then the source's
+    default ('stream' for eBay), then HTML_PARSER, then lxml when installed,
+    otherwise Python's html.parser
+    """
+    backend = (os.getenv(f'HTML_PARSER_{source.upper()}') or
+               DEFAULT_BACKENDS.get(source) or
+               _tree_backend())
+
+    if backend == 'stream' and source not in STREAMING_SOURCES:
+        logger.warning(f"No streaming parser for {source} - using a tree parser")
+        backend = _tree_backend()
+    if backend == 'lxml' and not LXML_AVAILABLE:
+        logger.warning("lxml not available - falling back to html.parser")
+        return 'html.parser'
+    if backend not in PARSER_BACKENDS:
+        logger.warning(f"Unknown HTML parser '{backend}' - using html.parser")
+        return 'html.parser'
+    return backend
+
+
+def parse_result_containers(content, source: str, max_results: int,
+                            backend: str = None) -> List:
+    """
+    Parse only the result containers of a search page and return the
+    first max_results of them as BeautifulSoup tags
+    """
+    backend = backend or get_parser_backend(source)
+    if backend == 'stream':
+        backend = _tree_backend()
+        if backend == 'lxml' and not LXML_AVAILABLE:
+            backend = 'html.parser'
+
+    from bs4 import BeautifulSoup
+
+    name, attrs = RESULT_CONTAINERS[source]
+    soup = BeautifulSoup(content, backend, parse_only=_strainer(source))
+    return soup.find_all(name, attrs, limit=max_results)
+
+
+def extract_ebay_listings(content, max_results: int, backend: str = None) -> List[Dict]:
+    """
+    Read eBay listings from a complete page into plain dicts:
+    title, price, image (img attributes), url and condition
+    """
+    listings = []
+
+    for item in parse_result_containers(content, 'ebay', max_results, backend):
+        title_elem = item.find('h3', class_='s-item__title')
+        price_elem = item.find('span', class_='s-item__price')
+        img_elem = item.find('img', class_='s-item__image')
+        link_elem = item.find('a', class_='s-item__link')
+        condition_elem = item.find('span', string=EBAY_CONDITION_RE)
+
+        listings.append({
+            'title': title_elem.get_text(strip=True) if title_elem else '',
+            'price': price_elem.get_text(strip=True) if price_elem else '',
+            'image': dict(img_elem.attrs) if img_elem else None,
+            'url': link_elem.get('href', '') if link_elem else '',
+            'condition': condition_elem.get_text().strip() if condition_elem else None,
+        })
+
+    return listings
+
+
+class EbayListingStreamParser(HTMLParser):
+    """
+    Event-driven eBay results parser. Feed it response chunks; once
+    max_results complete listings (title and price) have been read,
+    done is True and the rest of the page can be skipped.
+    Listings have the same shape as extract_ebay_listings().
+    """
+
+    HEAD_BYTES = 20000
+
+    def __init__(self, max_results: int):
+        super().__init__(convert_charrefs=True)
+        self.max_results = max_results
+        self.listings = []
+        self.head = b''  # start of the body, for block-page detection
+        self._decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+
+        self._item = None
+        self._div_depth = 0
+        self._capture = None       # field being read: title / price / span
+        self._capture_tag = None
+        self._capture_depth = 0
+        self._text = []            # text nodes of the field being read
+        self._text_open = False    # last event was data (node split across feeds)
+
+    @property
+    def done(self) -> bool:
+        return len(self.listings) >= self.max_results
+
+    def feed_bytes(self, chunk: bytes):
+        if len(self.head) < self.HEAD_BYTES:
+            self.head += chunk[:self.HEAD_BYTES - len(self.head)]
+        self.feed(self._decoder.decode(chunk))
+
+    def handle_starttag(self, tag, attrs):
+        self._text_open = False
+        if self.done:
+            return
+
+        attrs = dict(attrs)
+        classes = (attrs.get('class') or '').split()
+
+        if self._item is None:
+            if tag == 'div' and 's-item__wrapper' in classes:
+                self._item = {'title': '', 'price': '', 'image': None,
+                              'url': '', 'condition': None}
+                self._div_depth = 1
+            return
+
+        if tag == 'div':
+            self._div_depth += 1
+
+        if self._capture is not None:
+            if tag == self._capture_tag:
+                self._capture_depth += 1
+            return
+
+        if tag == 'h3' and 's-item__title' in classes and not self._item['title']:
+            self._start_capture('title', tag)
+        elif tag == 'span' and 's-item__price' in classes and not self._item['price']:
+            self._start_capture('price', tag)
+        elif tag == 'span':
+            self._start_capture('span', tag)
+        elif tag == 'img' and 's-item__image' in classes and self._item['image'] is None:
+            self._item['image'] = attrs
+        elif tag == 'a' and 's-item__link' in classes and not self._item['url']:
+            self._item['url'] = attrs.get('href') or ''
+
+    def handle_data(self, data):
+        if self._capture is None:
+            return
+        if self._text_open:
+            self._text[-1] += data
+        else:
+            self._text.append(data)
+            self._text_open = True
+
+    def handle_endtag(self, tag):
+        self._text_open = False
+        if self._item is None:
+            return
+
+        if self._capture is not None and tag == self._capture_tag:
+            self._capture_depth -= 1
+            if self._capture_depth == 0:
+                self._finish_capture()
+
+        if tag == 'div':
+            self._div_depth -= 1
+            if self._div_depth == 0:
+                self._finish_item()
+
+    def _start_capture(self, field: str, tag: str):
+        self._capture = field
+        self._capture_tag = tag
+        self._capture_depth = 1
+        self._text = []
+
+    def _finish_capture(self):
+        if self._capture == 'span':
+            text = ''.join(self._text).strip()
+            if self._item['condition'] is None and EBAY_CONDITION_RE.search(text):
+                self._item['condition'] = text
+        else:
+            # Same as get_text(strip=True)
+            self._item[self._capture] = ''.join(
+                piece.strip() for piece in self._text)
+        self._capture = None
+        self._text = []
+
+    def _finish_item(self):
+        item, self._item = self._item, None
+        self._capture = None
+        if item['title'] and item['price']:
+            self.listings.append(item)
+
+
+def stream_ebay_listings(chunks, max_results: int) -> EbayListingStreamParser:
+    """
+    Parse an iterable of body chunks, stopping once enough listings are read.
+    The caller should close the response afterwards to abort the download.
+    """
+    parser = EbayListingStreamParser(max_results)
+    for chunk in chunks:
+        if chunk:
+            parser.feed_bytes(chunk)
+        if parser.done:
+            break
+    return parser
@@ -0,0 +1,168 @@
+"""
+Shared HTTP client settings for every upstream source
+Sessions get sized per-host connection pools, default connect/read
+timeouts and retries with exponential backoff. Connections to known hosts
+can be opened ahead of the first search, and request counts are kept per host.
+"""
+
+import logging
+import os
+import threading
+from collections import defaultdict
+from typing import Dict, Iterable, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+# Status codes worth retrying; 429 is left to the rate limiter and breakers
+RETRY_STATUSES = (500, 502, 503, 504)
+
+# Hosts whose TLS connections are opened at startup
+DEFAULT_PREWARM_URLS = (
+    'https://serpapi.com/',
+    'https://www.google.com/',
+    'https://www.amazon.com/',
+    'https://www.ebay.com/',
+)
+
+
+def get_timeouts() -> Tuple[float, float]:
+    """(connect, read) timeouts from HTTP_CONNECT_TIMEOUT / HTTP_READ_TIMEOUT"""
+    return (float(os.getenv('HTTP_CONNECT_TIMEOUT', 3.05)),
+            float(os.getenv('HTTP_READ_TIMEOUT', 10)))
+
+
+def get_retry_settings() -> Tuple[int, float]:
+    """(retries, backoff factor) from HTTP_RETRIES / HTTP_RETRY_BACKOFF"""
+    return (int(os.getenv('HTTP_RETRIES', 2)),
+            float(os.getenv('HTTP_RETRY_BACKOFF', 0.3)))
+
+
+def parse_pool_sizes(spec: str) -> Dict[str, int]:
+    """Parse "host=size,host=size" into a dict, skipping invalid entries"""
+    sizes = {}
+    for entry in filter(None, (part.strip() for part in spec.split(','))):
+        try:
+            host, size = entry.split('=')
+            sizes[host.strip().lower()] = int(size)
+        except ValueError:
+            logger.warning(f"Ignoring invalid pool size '{entry}'")
+    return sizes
+
+
+class HostStats:
+    """Thread-safe per-host request, retry and error counters"""
+
+    def __init__(self):
+        self._counts = defaultdict(lambda: defaultdict(int))
+        self._lock = threading.Lock()
+
+    def record(self, host: str, field: str):
+        with self._lock:
+            self._counts[host][field] += 1
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {host: dict(counts) for host, counts in self._counts.items()}
+
+
+host_stats = HostStats()
+
+
+class CountingRetry(Retry):
+    """Retry that records each retry against the host"""
+
+    def increment(self, method=None, url=None, response=None, error=None,
+                  _pool=None, _stacktrace=None):
+        # Raises once retries are exhausted, so only real retries are counted
+        retry = super().increment(method, url, response, error, _pool, _stacktrace)
+        if _pool is not None:
+            host_stats.record(_pool.host, 'retries')
+        return retry
+
+
+class HTTPSession(requests.Session):
+    """requests.Session that applies default timeouts and counts requests"""
+
+    def __init__(self, timeout: Optional[Tuple[float, float]] = None):
+        super().__init__()
+        self.timeout = timeout or get_timeouts()
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+        host = urlsplit(url).hostname or ''
+        try:
+            response = super().request(method, url, **kwargs)
+        except requests.RequestException:
+            host_stats.record(host, 'errors')
+            raise
+        host_stats.record(host, 'requests')
+        return response
+
+
+def make_adapter(pool_maxsize: int) -> HTTPAdapter:
+    """HTTPAdapter with retries and a connection pool of pool_maxsize"""
+    retries, backoff = get_retry_settings()
+    retry = CountingRetry(
+        total=retries,
+        connect=retries,
+        read=0,  # a read timeout is not retried: it would double the wait
+        status=retries,
+        backoff_factor=backoff,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset(['GET', 'HEAD']),
+        raise_on_status=False)
+    return HTTPAdapter(
+        pool_connections=int(os.getenv('HTTP_POOL_CONNECTIONS', 10)),
+        pool_maxsize=pool_maxsize,
+        max_retries=retry)
+
+
+def configure_session(session: requests.Session) -> requests.Session:
+    """
+    Mount pooled, retrying adapters on a session: HTTP_POOL_MAXSIZE
+    connections per host by default, overridden per host by HTTP_POOL_SIZES
+    """
+    default_size = int(os.getenv('HTTP_POOL_MAXSIZE', 20))
+    session.mount('https://', make_adapter(default_size))
+    session.mount('http://', make_adapter(default_size))
+
+    for host, size in parse_pool_sizes(os.getenv('HTTP_POOL_SIZES', '')).items():
+        session.mount(f'https://{host}/', make_adapter(size))
+    return session
+
+
+def create_session(headers: Optional[Dict] = None) -> HTTPSession:
+    """New pooled session with timeouts and retries"""
+    session = configure_session(HTTPSession())
+    if headers:
+        session.headers.update(headers)
+    return session
+
+
+def get_prewarm_urls() -> Iterable[str]:
+    """Hosts to warm from HTTP_PREWARM_URLS, or the known source hosts"""
+    configured = os.getenv('HTTP_PREWARM_URLS')
+    if configured is None:
+        return DEFAULT_PREWARM_URLS
+    return [url.strip() for url in configured.split(',') if url.strip()]
+
+
+def prewarm(session: requests.Session, urls: Optional[Iterable[str]] = None):
+    """
+    Open keep-alive connections to known hosts in background threads,
+    so the first search does not pay for DNS and the TLS handshake
+    """
+    def warm(url):
+        try:
+            session.head(url, timeout=get_timeouts(), allow_redirects=False)
+        except Exception as e:
+            logger.info(f"Could not prewarm {url}: {str(e)}")
+
+    for url in urls if urls is not None else get_prewarm_urls():
+        threading.Thread(target=warm, args=(url,),
+                         name='http-prewarm', daemon=True).start()
@@ -0,0 +1,118 @@
+"""
+Fast JSON encoding for API responses
+FastJSONProvider uses orjson when it is installed and Flask's standard
+encoder otherwise. RawJSON wraps bytes that are already serialized (e.g.
+cached product lists) so they are written out without being encoded again.
+"""
+
+import json
+import logging
+
+from flask.json.provider import DefaultJSONProvider
+
+logger = logging.getLogger(__name__)
+
+# Optional orjson - the standard library encoder is used without it
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+    # Fragment (orjson 3.9+) embeds raw JSON inside a larger document
+    ORJSON_FRAGMENT = hasattr(orjson, 'Fragment')
+except ImportError:
+    ORJSON_AVAILABLE = False
+    ORJSON_FRAGMENT = False
+
+
+class RawJSON:
+    """
+    Pre-serialized JSON value. length is the item count when the value is
+    an array, so callers can still use len() on it.
+    """
+
+    __slots__ = ('data', 'length')
+
+    def __init__(self, data: bytes, length: int = None):
+        self.data = data
+        self.length = length
+
+    def __len__(self) -> int:
+        if self.length is None:
+            raise TypeError("RawJSON has no length")
+        return self.length
+
+
+def _default(o):
+    """Encoder fallback: unwrap RawJSON, then Flask's default conversions"""
+    if isinstance(o, RawJSON):
+        return json.loads(o.data)
+    return DefaultJSONProvider.default(o)
+
+
+def _orjson_default(o):
+    if isinstance(o, RawJSON):
+        return orjson.Fragment(o.data) if ORJSON_FRAGMENT else orjson.loads(o.data)
+    return DefaultJSONProvider.default(o)
+
+
+if ORJSON_AVAILABLE:
+    # Dates and dataclasses go through Flask's conversions so output matches
+    _ORJSON_OPTIONS = (orjson.OPT_NON_STR_KEYS |
+                       orjson.OPT_PASSTHROUGH_DATETIME |
+                       orjson.OPT_PASSTHROUGH_DATACLASS)
+
+
+def dumps_bytes(obj, sort_keys: bool = False, indent: bool = False) -> bytes:
+    """Serialize obj to UTF-8 JSON bytes with the fastest encoder available"""
+    if isinstance(obj, RawJSON):
+        return obj.data
+
+    if ORJSON_AVAILABLE:
+        option = _ORJSON_OPTIONS
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        try:
+            return orjson.dumps(obj, default=_orjson_default, option=option)
+        except orjson.JSONEncodeError as e:
+            # e.g. integers beyond 64 bits; the standard encoder handles them
+            logger.debug(f"orjson could not encode response: {str(e)}")
+
+    return json.dumps(obj, default=_default, sort_keys=sort_keys,
+                      indent=2 if indent else None,
+                      ensure_ascii=False).encode('utf-8')
+
+
+def dumps_str(obj) -> str:
+    """dumps_bytes as text, e.g. for Server-Sent Events"""
+    return dumps_bytes(obj).decode('utf-8')
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider backed by dumps_bytes; responses are built from
+    bytes directly instead of going through an intermediate str
+    """
+
+    # Keys keep insertion order: cached RawJSON fragments can't be re-sorted
+    sort_keys = False
+
+    def dumps(self, obj, **kwargs) -> str:
+        if kwargs.keys() - {'sort_keys', 'indent'}:
+            # Options only the standard encoder understands
+            kwargs.setdefault('default', _default)
+            return json.dumps(obj, **kwargs)
+        return dumps_bytes(obj, sort_keys=kwargs.get('sort_keys', self.sort_keys),
+                           indent=bool(kwargs.get('indent'))).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if ORJSON_AVAILABLE and not kwargs:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = self.compact is False or (self.compact is None and self._app.debug)
+        return self._app.response_class(
+            dumps_bytes(obj, sort_keys=self.sort_keys, indent=indent),
+            mimetype=self.mimetype)
@@ -0,0 +1,234 @@
+"""
+Incremental parser for the JSON object Gemini returns for recommendations.
+Text is fed chunk by chunk as the model streams it; events are produced as
+soon as they can be decided instead of after the whole answer has arrived.
+"""
+
+import json
+from typing import List, Tuple
+
+# Simple escapes inside JSON strings
+_ESCAPES = {
+    '"': '"', '\\': '\\', '/': '/',
+    'b': '\b', 'f': '\f', 'n': '\n', 'r': '\r', 't': '\t',
+}
+
+_WHITESPACE = ' \t\r\n'
+
+# Parser states
+START = 'start'
+TOP_KEY = 'top_key'
+KEY = 'key'
+COLON = 'colon'
+TOP_VALUE = 'top_value'
+RESPONSE_STRING = 'response_string'
+REC_KEY = 'rec_key'
+REC_VALUE = 'rec_value'
+RAW_VALUE = 'raw_value'
+DONE = 'done'
+
+
+class IncrementalJSONParser:
+    """
+    Streams the top-level object {"response": ..., "recommendations": {...}, ...}.
+
+    feed() returns a list of events:
+      ('response_delta', text)          decoded text of the "response" string
+      ('recommendation', key, value)    each recommendations pair once it closes
+      ('field', key, value)             any other top-level field once it closes
+
+    Leading markdown fences are skipped. Anything that is not a JSON object
+    simply produces no events; callers should still run the full parser on
+    the complete text at the end.
+    """
+
+    def __init__(self):
+        self.state = START
+        self.events = []
+
+        self._key = ''           # raw text of the key being read
+        self._key_escape = False
+        self._top_key = None     # current top-level key
+        self._in_recommendations = False
+        self._rec_key = None     # current recommendations key
+
+        self._raw = ''           # raw text of a value being captured
+        self._raw_depth = 0
+        self._raw_in_string = False
+        self._raw_escape = False
+
+        self._escape = None      # pending escape sequence in the response string
+        self._high_surrogate = None
+        self._delta = []
+
+    def feed(self, text: str) -> List[Tuple]:
+        """Consume the next chunk of model output and return new events"""
+        for ch in text:
+            # A character may be handed back to the enclosing state once a
+            # scalar value has ended, hence the loop
+            while self._step(ch):
+                pass
+
+        self._flush_delta()
+        events, self.events = self.events, []
+        return events
+
+    @property
+    def done(self) -> bool:
+        return self.state == DONE
+
+    # ------------------------------------------------------------------
+
+    def _step(self, ch: str) -> bool:
+        """Process one character; returns True if it must be processed again"""
+        state = self.state
+
+        if state == START:
+            if ch == '{':
+                self.state = TOP_KEY
+
+        elif state == TOP_KEY or state == REC_KEY:
+            if ch == '"':
+                self._key = ''
+                self._key_escape = False
+                self._in_recommendations = state == REC_KEY
+                self.state = KEY
+            elif ch == '}':
+                if state == REC_KEY:
+                    self._in_recommendations = False
+                    self.state = TOP_KEY
+                else:
+                    self.state = DONE
+
+        elif state == KEY:
+            if self._key_escape:
+                self._key += ch
+                self._key_escape = False
+            elif ch == '\\':
+                self._key += ch
+                self._key_escape = True
+            elif ch == '"':
+                key = json.loads(f'"{self._key}"')
+                if self._in_recommendations:
+                    self._rec_key = key
+                else:
+                    self._top_key = key
+                self.state = COLON
+            else:
+                self._key += ch
+
+        elif state == COLON:
+            if ch == ':':
+                self.state = REC_VALUE if self._in_recommendations else TOP_VALUE
+
+        elif state == TOP_VALUE:
+            if ch in _WHITESPACE:
+                return False
+            if self._top_key == 'response' and ch == '"':
+                self.state = RESPONSE_STRING
+            elif self._top_key == 'recommendations' and ch == '{':
+                self.state = REC_KEY
+            else:
+                self._start_raw(ch)
+
+        elif state == REC_VALUE:
+            if ch in _WHITESPACE:
+                return False
+            self._start_raw(ch)
+
+        elif state == RESPONSE_STRING:
+            self._response_char(ch)
+
+        elif state == RAW_VALUE:
+            return self._raw_char(ch)
+
+        return False
+
+    def _start_raw(self, ch: str):
+        self._raw = ch
+        self._raw_depth = 1 if ch in '{[' else 0
+        self._raw_in_string = ch == '"'
+        self._raw_escape = False
+        self.state = RAW_VALUE
+
+    def _raw_char(self, ch: str) -> bool:
+        """Capture a value; returns True when ch terminated a bare scalar"""
+        if self._raw_in_string:
+            self._raw += ch
+            if self._raw_escape:
+                self._raw_escape = False
+            elif ch == '\\':
+                self._raw_escape = True
+            elif ch == '"':
+                self._raw_in_string = False
+                if self._raw_depth == 0:
+                    self._finish_raw()
+            return False
+
+        if self._raw_depth == 0 and (ch in ',}]' or ch in _WHITESPACE):
+            # End of a number / true / false / null
+            self._finish_raw()
+            return True
+
+        self._raw += ch
+        if ch == '"':
+            self._raw_in_string = True
+        elif ch in '{[':
+            self._raw_depth += 1
+        elif ch in '}]':
+            self._raw_depth -= 1
+            if self._raw_depth == 0:
+                self._finish_raw()
+        return False
+
+    def _finish_raw(self):
+        try:
+            value = json.loads(self._raw)
+        except json.JSONDecodeError:
+            value = self._raw
+
+        if self._in_recommendations:
+            self.events.append(('recommendation', self._rec_key, value))
+            self.state = REC_KEY
+        else:
+            self.events.append(('field', self._top_key, value))
+            self.state = TOP_KEY
+
+    def _response_char(self, ch: str):
+        if self._escape is not None:
+            self._escape += ch
+            if self._escape[0] == 'u':
+                if len(self._escape) == 5:
+                    try:
+                        self._append_code_point(int(self._escape[1:], 16))
+                    except ValueError:
+                        # Not hex: keep the text as the model wrote it
+                        self._append('\\' + self._escape)
+                    self._escape = None
+            else:
+                self._append(_ESCAPES.get(ch, ch))
+                self._escape = None
+        elif ch == '\\':
+            self._escape = ''
+        elif ch == '"':
+            self._flush_delta()
+            self.state = TOP_KEY
+        else:
+            self._append(ch)
+
+    def _append_code_point(self, code: int):
+        if 0xD800 <= code <= 0xDBFF:
+            self._high_surrogate = code
+            return
+        if 0xDC00 <= code <= 0xDFFF and self._high_surrogate is not None:
+            code = 0x10000 + ((self._high_surrogate - 0xD800) << 10) + (code - 0xDC00)
+        self._high_surrogate = None
+        self._append(chr(code))
+
+    def _append(self, text: str):
+        self._delta.append(text)
+
+    def _flush_delta(self):
+        if self._delta:
+            self.events.append(('response_delta', ''.join(self._delta)))
+            self._delta = []
@@ -0,0 +1,96 @@
+"""
+Product record shared by every source
+Sources still build plain dicts; ProductScraper turns them into Product
+records once, and to_dict() produces the JSON shape the frontend expects.
+"""
+
+from typing import Dict, Optional
+
+from utils import extract_price_value
+
+
+def _to_float(value) -> Optional[float]:
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_int(value) -> Optional[int]:
+    if isinstance(value, str):
+        value = value.replace(',', '').strip()
+    try:
+        return int(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+class Product:
+    """
+    One product from any source. price is the display string and
+    price_value its numeric value, parsed once when the record is made.
+    synthetic marks generated sample data, which is never persisted.
+    """
+
+    __slots__ = ('name', 'price', 'price_value', 'image', 'url', 'source',
+                 'rating', 'reviews', 'shipping', 'condition', 'merchant',
+                 'synthetic')
+
+    # Left out of the JSON when not set
+    OPTIONAL_FIELDS = ('rating', 'reviews', 'shipping', 'condition', 'merchant')
+
+    def __init__(self, name: str, price: str, image: str = '', url: str = '',
+                 source: str = '', rating: Optional[float] = None,
+                 reviews: Optional[int] = None, shipping: Optional[str] = None,
+                 condition: Optional[str] = None, merchant: Optional[str] = None,
+                 price_value: Optional[float] = None, synthetic: bool = False):
+        self.name = name
+        self.price = price
+        self.price_value = extract_price_value(price) if price_value is None else price_value
+        self.image = image
+        self.url = url
+        self.source = source
+        self.rating = rating
+        self.reviews = reviews
+        self.shipping = shipping
+        self.condition = condition
+        self.merchant = merchant
+        self.synthetic = synthetic
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'Product':
+        """
+        Normalize a source's product dict; a price_value already parsed by
+        utils.process_products is reused
+        """
+        return cls(
+            name=str(data.get('name') or ''),
+            price=str(data.get('price') or ''),
+            image=data.get('image') or '',
+            url=data.get('url') or '',
+            source=data.get('source') or '',
+            rating=_to_float(data.get('rating')),
+            reviews=_to_int(data.get('reviews')),
+            shipping=data.get('shipping') or None,
+            condition=data.get('condition') or None,
+            merchant=data.get('merchant') or None,
+            price_value=data.get('price_value'),
+            synthetic=bool(data.get('synthetic')))
+
+    def to_dict(self) -> Dict:
+        """JSON shape of a product for the API (see Product in giftService.ts)"""
+        data = {
+            'name': self.name,
+            'price': self.price,
+            'image': self.image,
+            'url': self.url,
+            'source': self.source,
+        }
+        for field in self.OPTIONAL_FIELDS:
+            value = getattr(self, field)
+            if value is not None:
+                data[field] = value
+        return data
+
+    def __repr__(self) -> str:
+        return f"Product({self.name!r}, {self.price!r}, source={self.source!r})"
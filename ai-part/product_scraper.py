@@ -1,48 +1,52 @@
-import requests
-from bs4 import BeautifulSoup
-import time
 import random
 import logging
-from typing import List, Dict, Optional
+from importlib.util import find_spec
+from typing import List, Dict, Optional, Tuple
 
+import os
 import re
+import threading
 from urllib.parse import quote
 
 # Import the new API integrations
-from api_integrations import ProductAPIManager
-import cloudscraper  # Optional for eBay scraping
-from bs4 import BeautifulSoup
-import time
-import random
-import logging
-from typing import List, Dict, Optional
-from fake_useragent import UserAgent  # Optional for random user agents
-import re
-from urllib.parse import quote
+from api_integrations import ProductAPIManager, is_captcha_page
+from async_engine import AsyncProductEngine, AIOHTTP_AVAILABLE
+from cache import BackgroundRefresher, TTLCache
+from cache_warmer import query_stats
+from catalog import create_catalog
+from driver_pool import DriverPool
+from http_client import create_session, get_timeouts, prewarm
+from html_parsing import extract_ebay_listings
+from json_provider import RawJSON, dumps_bytes
+from models import Product
+from ranking import rank_products
+from utils import normalize_search_query, process_products, remove_duplicate_products
+
+logger = logging.getLogger(__name__)
 
-# Optional Selenium imports - will work without Chrome driver
-try:
-    from selenium import webdriver
-    from selenium.webdriver.chrome.options import Options
-    from selenium.webdriver.common.by import By
-    from selenium.webdriver.support.ui import WebDriverWait
-    from selenium.webdriver.support import expected_conditions as EC
-    from webdriver_manager.chrome import ChromeDriverManager
-    from selenium.webdriver.chrome.service import Service
-    SELENIUM_AVAILABLE = True
-except ImportError:
-    SELENIUM_AVAILABLE = False
-    print("⚠️  Selenium not available - using basic scraping only")
+# Optional Selenium - only checked here, imported when a driver is created
+SELENIUM_AVAILABLE = bool(find_spec('selenium') and find_spec('webdriver_manager'))
+if not SELENIUM_AVAILABLE:
+    logger.warning("Selenium not available - using basic scraping only")
 
 # Optional undetected Chrome driver - fallback if not available
-try:
-    import undetected_chromedriver as uc
-    UC_AVAILABLE = True
-except ImportError:
-    UC_AVAILABLE = False
-    print("⚠️  Undetected Chrome driver not available - using basic scraping only")
+UC_AVAILABLE = find_spec('undetected_chromedriver') is not None
+if not UC_AVAILABLE:
+    logger.warning("Undetected Chrome driver not available - using basic scraping only")
 
-logger = logging.getLogger(__name__)
+# How long (seconds) results from each source stay cached
+PRODUCT_CACHE_TTLS = {
+    'google_shopping': 3600,
+    'google_shopping_scrape': 1800,
+    'amazon': 1800,
+    'ebay': 900,
+    'aliexpress': 900,
+}
+
+
+def count_real(products) -> int:
+    """Number of products that are not generated samples"""
+    return sum(not product.synthetic for product in products)
 
 
 class ProductScraper:
@@ -54,17 +58,72 @@ class ProductScraper:
         except ImportError:
             self.ua = None
 
-        try:
-            import cloudscraper
-            self.scraper = cloudscraper.create_scraper()
-        except ImportError:
-            self.scraper = None
-        self.session = requests.Session()
+        # cloudscraper session, created on the first eBay request
+        self._scraper = None
+        self._scraper_checked = False
+        self.session = create_session()
         self._setup_session()
 
         # Initialize the enhanced API manager
         self.api_manager = ProductAPIManager()
 
+        # Cache of search results keyed by (normalized query, max_results).
+        # Expired results are still served for PRODUCT_CACHE_GRACE seconds
+        # while one background refresh per key fetches new ones.
+        self.cache = TTLCache(
+            maxsize=int(os.getenv('PRODUCT_CACHE_SIZE', 1024)),
+            ttl=float(os.getenv('PRODUCT_CACHE_TTL', 600)),
+            grace=float(os.getenv('PRODUCT_CACHE_GRACE', 1800)))
+        self.refresher = BackgroundRefresher(
+            workers=int(os.getenv('PRODUCT_REFRESH_WORKERS', 2)),
+            name='product-refresh')
+        self.cache_ttls = {
+            source: float(os.getenv(f'PRODUCT_CACHE_TTL_{source.upper()}', ttl))
+            for source, ttl in PRODUCT_CACHE_TTLS.items()
+        }
+
+        # Candidates fetched per result wanted; ranking keeps the best
+        self.candidates_factor = max(1, int(os.getenv('PRODUCT_CANDIDATES_FACTOR', 3)))
+
+        # On-disk catalog of every real product seen, consulted before upstream
+        self.catalog = create_catalog()
+
+        # Async engine does the network work when available
+        self.async_engine = None
+        self.search_timeout = float(os.getenv('PRODUCT_SEARCH_TIMEOUT', 30))
+        engine = os.getenv('PRODUCT_ENGINE', 'async').lower()
+        if engine == 'async' and AIOHTTP_AVAILABLE:
+            self.async_engine = AsyncProductEngine(self.api_manager, self)
+        elif engine == 'async':
+            logger.warning(
+                "aiohttp not available - using requests-based product engine")
+
+        # Open connections to the source hosts before the first search
+        if os.getenv('HTTP_PREWARM', 'true').lower() == 'true':
+            if self.async_engine:
+                self.async_engine.prewarm()
+            else:
+                prewarm(self.api_manager.session)
+
+        # Warm Chrome drivers for JS-rendered pages, created on first use
+        self._driver_pool = None
+        self._driver_pool_lock = threading.Lock()
+        if SELENIUM_AVAILABLE and os.getenv('SELENIUM_POOL_PREWARM', 'false').lower() == 'true':
+            threading.Thread(target=lambda: self.get_driver_pool().prewarm(),
+                             name='driver-pool-prewarm', daemon=True).start()
+
+    @property
+    def scraper(self):
+        """cloudscraper session for eBay (None when not installed)"""
+        if not self._scraper_checked:
+            try:
+                import cloudscraper
+                self._scraper = cloudscraper.create_scraper()
+            except ImportError:
+                self._scraper = None
+            self._scraper_checked = True
+        return self._scraper
+
     def _setup_session(self):
         """Setup requests session with headers"""
         self.session.headers.update({
@@ -76,16 +135,139 @@ class ProductScraper:
             'Upgrade-Insecure-Requests': '1'
         })
 
-    def search_products(self, search_query: str, max_results: int = 3) -> List[Dict]:
+    def search_products(self, search_query: str, max_results: int = 3,
+                        budget: Optional[Tuple[float, float]] = None) -> List[Dict]:
         """
         Search for products across multiple platforms using enhanced API integrations
         """
+        return [product.to_dict() for product in
+                self.search_product_models(search_query, max_results, budget)]
+
+    def search_product_models(self, search_query: str, max_results: int = 3,
+                              budget: Optional[Tuple[float, float]] = None) -> List[Product]:
+        """
+        search_products returning Product records (shared with the cache,
+        so callers must not modify them)
+        """
+        candidates, top, _ = self._search_cached(search_query, max_results)
+        if budget is None:
+            return list(top)
+        return rank_products(candidates, max_results, budget)
+
+    def search_products_json(self, search_query: str, max_results: int = 3,
+                             budget: Optional[Tuple[float, float]] = None) -> RawJSON:
+        """
+        search_products as a pre-serialized JSON array, encoded once per
+        cache entry and written out as-is by the JSON provider
+        """
+        if budget is not None:
+            products = self.search_product_models(search_query, max_results, budget)
+            return RawJSON(dumps_bytes([product.to_dict() for product in products]),
+                           len(products))
+        return self._search_cached(search_query, max_results)[2]
+
+    def _search_cached(self, search_query: str, max_results: int) -> tuple:
+        """
+        (candidate Products, top max_results of them, RawJSON of the top) for
+        a query, from the cache when possible, then from the local catalog.
+        Candidates are over-fetched so a budget can re-rank them without
+        another upstream search. An expired entry within the grace window is
+        returned as-is and refreshed in the background.
+        """
+        cache_key = (normalize_search_query(search_query), max_results)
+        query_stats.record(search_query, max_results)
+        cached = self.cache.get_stale(cache_key)
+        if cached is not None:
+            entry, stale = cached
+            if stale:
+                self.refresher.schedule(cache_key, lambda: count_real(
+                    self._load(cache_key, search_query, max_results)[0]))
+            return entry
+
+        return self._load(cache_key, search_query, max_results)
+
+    def warm(self, search_query: str, max_results: int = 3) -> int:
+        """
+        Search and cache a query ahead of demand (see cache_warmer);
+        returns the number of real candidates cached, 0 for sample-only results
+        """
+        cache_key = (normalize_search_query(search_query), max_results)
+        return count_real(self._load(cache_key, search_query, max_results)[0])
+
+    def _load(self, cache_key: tuple, search_query: str, max_results: int) -> tuple:
+        """Search, rank and cache the entry for a query (see _search_cached)"""
+        candidates = tuple(self._search_candidates(
+            search_query, max_results, max_results * self.candidates_factor))
+        top = tuple(rank_products(candidates, max_results))
+        entry = (candidates, top, RawJSON(
+            dumps_bytes([product.to_dict() for product in top]), len(top)))
+
+        # Empty or sample-only results are not cached, so the next request
+        # retries upstream and a stale real entry keeps being served
+        if count_real(candidates):
+            self.cache.set(cache_key, entry, ttl=self._cache_ttl(candidates))
+
+        return entry
+
+    def _search_candidates(self, search_query: str, max_results: int,
+                           limit: int) -> List[Product]:
+        """
+        Up to limit cleaned, de-duplicated candidates: from the catalog when
+        it has limit fresh matches, otherwise from upstream (and then recorded
+        in the catalog)
+        """
+        if self.catalog is not None:
+            try:
+                products = self.catalog.lookup(search_query, limit)
+                if products:
+                    return products
+            except Exception as e:
+                logger.error(f"Catalog lookup failed: {str(e)}")
+
+        products = [Product.from_dict(product) for product in remove_duplicate_products(
+            process_products(self._search_uncached(search_query, max_results, limit)))]
+
+        if self.catalog is not None:
+            try:
+                self.catalog.add(products)
+            except Exception as e:
+                logger.error(f"Catalog update failed: {str(e)}")
+
+        return products
+
+    def _search_uncached(self, search_query: str, max_results: int,
+                         limit: Optional[int] = None) -> List[Dict]:
+        """
+        Run a search against the upstream sources for up to limit products
+        (default max_results); the fallbacks only run with fewer than max_results
+        """
+        if self.async_engine is not None:
+            return self.async_engine.run(
+                self.async_engine.search_products(search_query, max_results, limit),
+                timeout=self.search_timeout)
+
+        return self._search_products_sync(search_query, max_results, limit)
+
+    def _cache_ttl(self, products: List[Product]) -> float:
+        """
+        Cache lifetime for a result set: the shortest TTL of its sources
+        """
+        return min(self.cache_ttls.get(product.source, self.cache.ttl)
+                   for product in products)
+
+    def _search_products_sync(self, search_query: str, max_results: int = 3,
+                              limit: Optional[int] = None) -> List[Dict]:
+        """
+        Requests-based search used when the async engine is disabled
+        """
+        limit = limit or max_results
+
         # First try the enhanced API manager with multiple sources
         try:
             products = self.api_manager.search_products_multi_source(
-                search_query, max_results)
+                search_query, limit)
             if products and len(products) >= max_results:
-                return products[:max_results]
+                return products[:limit]
         except Exception as e:
             logger.error(f"Enhanced API search failed: {str(e)}")
 
@@ -139,7 +321,8 @@ class ProductScraper:
                     "url": f"https://amazon.com/s?k={quote(query)}",
                     "source": "amazon",
                     "rating": round(random.uniform(3.5, 5.0), 1),
-                    "reviews": random.randint(50, 5000)
+                    "reviews": random.randint(50, 5000),
+                    "synthetic": True
                 },
                 {
                     "name": f"{query.title()} - Best Seller on Amazon",
@@ -148,7 +331,8 @@ class ProductScraper:
                     "url": f"https://amazon.com/s?k={quote(query)}",
                     "source": "amazon",
                     "rating": round(random.uniform(4.0, 5.0), 1),
-                    "reviews": random.randint(100, 8000)
+                    "reviews": random.randint(100, 8000),
+                    "synthetic": True
                 }
             ]
 
@@ -165,63 +349,102 @@ class ProductScraper:
         """
         products = []
 
+        breaker = self.api_manager.breakers.get('ebay')
+        if not breaker.allow():
+            return products
+
         try:
             # eBay search URL
-            search_url = f"https://www.ebay.com/sch/i.html?_nkw={quote(query)}&_sacat=0"
-
-            response = self.scraper.get(
-                search_url, timeout=10) if self.scraper else self.session.get(search_url, timeout=10)
-
-            if response.status_code == 200:
-                soup = BeautifulSoup(response.content, 'html.parser')
-
-                # Find product listings
-                items = soup.find_all(
-                    'div', class_='s-item__wrapper')[:max_results]
-
-                for item in items:
-                    try:
-                        # Extract product information
-                        title_elem = item.find('h3', class_='s-item__title')
-                        price_elem = item.find('span', class_='s-item__price')
-                        image_elem = item.find('img', class_='s-item__image')
-                        link_elem = item.find('a', class_='s-item__link')
-
-                        if title_elem and price_elem:
-                            title = title_elem.get_text(strip=True)
-                            price = price_elem.get_text(strip=True)
-
-                            # Try multiple image attributes and fix URL issues
-                            image = ''
-                            if image_elem:
-                                image = (image_elem.get('src') or
-                                         image_elem.get('data-src') or
-                                         image_elem.get('data-original') or '')
-                                # Fix image URL if it's relative or has issues
-                                image = self._fix_image_url(image)
-
-                            url = link_elem.get(
-                                'href', '') if link_elem else ''
-
-                            # Clean up title (remove "New Listing" etc.)
-                            title = re.sub(
-                                r'^(New Listing:|SPONSORED)', '', title).strip()
-
-                            if title and price and 'to' not in price.lower():
-                                products.append({
-                                    "name": title[:100],  # Limit title length
-                                    "price": price,
-                                    "image": image,
-                                    "url": url,
-                                    "source": "ebay"
-                                })
-
-                    except Exception as e:
-                        logger.warning(f"Error parsing eBay item: {str(e)}")
-                        continue
+            search_url = self._ebay_search_url(query)
+
+            status, content, listings = self.api_manager.fetch_ebay_listings(
+                search_url, max_results,
+                session=self.scraper or self.session, timeout=get_timeouts())
+
+            products = self._handle_ebay_response(
+                status, content, max_results, listings)
 
         except Exception as e:
             logger.error(f"Error searching eBay: {str(e)}")
+            breaker.record_error(e)
+
+        return products
+
+    def _handle_ebay_response(self, status: int, content, max_results: int,
+                              listings: Optional[List[Dict]] = None) -> List[Dict]:
+        """
+        Parse an eBay response and record the outcome on the eBay breaker.
+        listings is set when the page was already parsed while streaming.
+        """
+        breaker = self.api_manager.breakers.get('ebay')
+
+        if status != 200 or is_captcha_page(content):
+            breaker.record_failure()
+            return []
+
+        if listings is None:
+            products = self._parse_ebay_listings(content, max_results)
+        else:
+            products = self._build_ebay_products(listings)
+        if products:
+            breaker.record_success()
+        else:
+            breaker.record_empty()
+        return products
+
+    def _ebay_search_url(self, query: str) -> str:
+        """
+        Build the eBay search page URL for a query
+        """
+        return f"https://www.ebay.com/sch/i.html?_nkw={quote(query)}&_sacat=0"
+
+    def _parse_ebay_listings(self, content, max_results: int) -> List[Dict]:
+        """
+        Extract product listings from an eBay search results page
+        """
+        return self._build_ebay_products(
+            extract_ebay_listings(content, max_results))
+
+    def _build_ebay_products(self, listings: List[Dict]) -> List[Dict]:
+        """
+        Turn parsed eBay listings into products
+        """
+        products = []
+
+        for listing in listings:
+            try:
+                title = listing['title']
+                price = listing['price']
+                image_elem = listing['image']
+
+                if title and price:
+                    # Try multiple image attributes and fix URL issues
+                    image = ''
+                    if image_elem:
+                        image = (image_elem.get('src') or
+                                 image_elem.get('data-src') or
+                                 image_elem.get('data-original') or '')
+                        # Fix image URL if it's relative or has issues
+                        image = self._fix_image_url(image)
+
+                    url = listing['url']
+
+                    # Clean up title (remove "New Listing" etc.)
+                    title = re.sub(
+                        r'^(New Listing:|SPONSORED)', '', title).strip()
+
+                    if title and price and 'to' not in price.lower():
+                        products.append({
+                            "name": title[:100],  # Limit title length
+                            "price": price,
+                            "image": image,
+                            "url": url,
+                            "source": "ebay"
+                        })
+
+            except Exception as e:
+                logger.warning(f"Error parsing eBay item: {str(e)}")
+                continue
 
         return products
 
@@ -242,7 +465,8 @@ class ProductScraper:
                 "image": sample_images[2] if len(sample_images) > 2 else sample_images[0],
                 "url": f"https://www.aliexpress.com/wholesale?SearchText={quote(query)}",
                 "source": "aliexpress",
-                "shipping": "Free shipping"
+                "shipping": "Free shipping",
+                "synthetic": True
             }
 
             products.append(sample_product)
@@ -263,6 +487,8 @@ class ProductScraper:
 
         try:
             if UC_AVAILABLE:
+                import undetected_chromedriver as uc
+
                 # Use undetected Chrome driver if available
                 options = uc.ChromeOptions()
                 options.add_argument('--headless')
@@ -280,6 +506,11 @@ class ProductScraper:
                     "Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
                 return driver
             else:
+                from selenium import webdriver
+                from selenium.webdriver.chrome.options import Options
+                from selenium.webdriver.chrome.service import Service
+                from webdriver_manager.chrome import ChromeDriverManager
+
                 # Fallback to regular Chrome driver
                 options = Options()
                 options.add_argument('--headless')
@@ -294,6 +525,54 @@ class ProductScraper:
             logger.error(f"Error creating Chrome driver: {str(e)}")
             return None
 
+    def get_driver_pool(self) -> Optional[DriverPool]:
+        """
+        Shared pool of Selenium drivers (None without Selenium)
+        """
+        if not SELENIUM_AVAILABLE:
+            return None
+
+        with self._driver_pool_lock:
+            if self._driver_pool is None:
+                self._driver_pool = DriverPool(
+                    self._create_selenium_driver,
+                    size=int(os.getenv('SELENIUM_POOL_SIZE', 2)),
+                    max_pages=int(os.getenv('SELENIUM_POOL_MAX_PAGES', 50)),
+                    max_age=float(os.getenv('SELENIUM_POOL_MAX_AGE', 1800)),
+                    checkout_timeout=float(
+                        os.getenv('SELENIUM_POOL_CHECKOUT_TIMEOUT', 10)))
+        return self._driver_pool
+
+    def _render_page(self, url: str, wait_selector: Optional[str] = None,
+                     timeout: float = 10) -> Optional[str]:
+        """
+        Load a JS-rendered page on a pooled driver and return its HTML
+        """
+        pool = self.get_driver_pool()
+        if pool is None:
+            return None
+
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support import expected_conditions as EC
+        from selenium.webdriver.support.ui import WebDriverWait
+
+        try:
+            with pool.driver() as driver:
+                if driver is None:
+                    logger.warning("No Chrome driver available for rendering")
+                    return None
+
+                driver.set_page_load_timeout(timeout)
+                driver.get(url)
+                if wait_selector:
+                    WebDriverWait(driver, timeout).until(
+                        EC.presence_of_element_located((By.CSS_SELECTOR, wait_selector)))
+                return driver.page_source
+
+        except Exception as e:
+            logger.error(f"Error rendering {url}: {str(e)}")
+            return None
+
     def _extract_price(self, price_text: str) -> str:
         """
         Extract and normalize price from text
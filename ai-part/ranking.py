@@ -0,0 +1,141 @@
+"""
+Product ranking
+Scores candidates from price, rating, review count, source and distance
+from the user's budget, then keeps the top k with a partial sort.
+Generated sample products always rank below real ones.
+"""
+
+import heapq
+import logging
+import math
+import os
+import re
+from typing import Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# How much each signal contributes to a product's score
+DEFAULT_WEIGHTS = {
+    'rating': 0.35,
+    'reviews': 0.2,
+    'source': 0.15,
+    'budget': 0.3,
+}
+
+# Trust in each source's data; sample/unknown sources rank lowest
+SOURCE_WEIGHTS = {
+    'google_shopping': 1.0,
+    'amazon': 0.9,
+    'ebay': 0.8,
+    'aliexpress': 0.6,
+}
+DEFAULT_SOURCE_WEIGHT = 0.5
+
+# Rating assumed for products whose source reports none
+NEUTRAL_RATING = 3.5
+
+# Review count at which the reviews signal saturates
+REVIEWS_SATURATION = 5000
+
+_AMOUNT_RE = re.compile(r'\d[\d,]*(?:\.\d+)?')
+
+
+def parse_budget(budget) -> Optional[Tuple[float, float]]:
+    """
+    Parse a budget into a (low, high) price range.
+    Accepts "$20-50", "20 to 50", "under $30", "$100+", "around 40", 40,
+    or {"min": 20, "max": 50}. Returns None when nothing usable is given.
+    """
+    if budget is None or budget == '':
+        return None
+
+    if isinstance(budget, dict):
+        low = _to_amount(budget.get('min'))
+        high = _to_amount(budget.get('max'))
+        if low is None and high is None:
+            return None
+        return (low or 0.0, high if high is not None else math.inf)
+
+    if isinstance(budget, (int, float)):
+        # A single amount means "about this much"
+        return (budget * 0.8, budget * 1.2) if budget > 0 else None
+
+    text = str(budget).lower()
+    amounts = [float(a.replace(',', '')) for a in _AMOUNT_RE.findall(text)]
+    if not amounts:
+        return None
+
+    if len(amounts) >= 2:
+        return (min(amounts[:2]), max(amounts[:2]))
+
+    amount = amounts[0]
+    if any(word in text for word in ('under', 'below', 'less', 'max', 'up to', '<')):
+        return (0.0, amount)
+    if '+' in text or any(word in text for word in ('over', 'above', 'more', 'min', '>')):
+        return (amount, math.inf)
+    return (amount * 0.8, amount * 1.2)
+
+
+def budget_from_preferences(preferences: Optional[Dict]) -> Optional[Tuple[float, float]]:
+    """Budget range from a request's preferences dict, if it has one"""
+    if not isinstance(preferences, dict):
+        return None
+    try:
+        return parse_budget(preferences.get('budget'))
+    except Exception as e:
+        logger.warning(f"Could not parse budget {preferences.get('budget')!r}: {str(e)}")
+        return None
+
+
+def _to_amount(value) -> Optional[float]:
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = _AMOUNT_RE.search(str(value))
+    return float(match.group(0).replace(',', '')) if match else None
+
+
+def get_weights() -> Dict[str, float]:
+    """DEFAULT_WEIGHTS with RANKING_WEIGHT_<SIGNAL> overrides"""
+    return {
+        signal: float(os.getenv(f'RANKING_WEIGHT_{signal.upper()}', weight))
+        for signal, weight in DEFAULT_WEIGHTS.items()
+    }
+
+
+def rank_products(products: Sequence, k: int,
+                  budget: Optional[Tuple[float, float]] = None,
+                  weights: Optional[Dict[str, float]] = None) -> List:
+    """
+    Best k of a batch of models.Product records, highest score first with
+    synthetic products after all real ones. Equal scores keep their order.
+    """
+    if not products or k <= 0:
+        return []
+
+    weights = weights or get_weights()
+    scores = [_score(product, budget, weights) for product in products]
+    top = heapq.nsmallest(k, range(len(products)),
+                          key=lambda i: (products[i].synthetic, -scores[i], i))
+    return [products[i] for i in top]
+
+
+def _score(product, budget, weights: Dict[str, float]) -> float:
+    rating = NEUTRAL_RATING if product.rating is None else product.rating
+    score = (weights['rating'] * min(max(rating / 5.0, 0.0), 1.0) +
+             weights['reviews'] * min(
+                 math.log1p(product.reviews or 0) / math.log1p(REVIEWS_SATURATION), 1.0) +
+             weights['source'] * SOURCE_WEIGHTS.get(product.source, DEFAULT_SOURCE_WEIGHT))
+
+    if budget is not None:
+        low, high = budget
+        price = product.price_value
+        distance = 0.0
+        if price < low:
+            distance = (low - price) / max(low, 1.0)
+        elif price > high:
+            distance = (price - high) / max(high, 1.0)
+        score += weights['budget'] * max(0.0, 1.0 - distance)
+
+    return score
@@ -0,0 +1,288 @@
+"""
+Per-host token-bucket rate limiting for upstream product requests
+Callers wait for their turn, but never longer than max_wait or past the
+deadline set for the current source search; such requests are refused.
+Work with a request budget (e.g. cache warming) is also charged per request.
+"""
+
+import asyncio
+import contextvars
+import logging
+import os
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+from circuit_breaker import LocalFailure
+
+logger = logging.getLogger(__name__)
+
+# Requests per second and burst size for known hosts
+DEFAULT_HOST_LIMITS = {
+    'serpapi.com': (5.0, 5),
+    'www.google.com': (1.0, 2),
+    'www.amazon.com': (1.0, 2),
+    'www.ebay.com': (2.0, 4),
+}
+DEFAULT_LIMIT = (2.0, 4)
+
+# Longest a request may queue for its host
+DEFAULT_MAX_WAIT = 5.0
+
+# Monotonic time by which the current source search must be finished
+_deadline = contextvars.ContextVar('rate_limit_deadline', default=None)
+
+
+# Request budget of the work in progress, if it has one
+_budget = contextvars.ContextVar('request_budget', default=None)
+
+
+class RateLimitExceeded(LocalFailure):
+    """The host's queue is longer than the caller can wait"""
+
+
+class RequestBudgetExceeded(LocalFailure):
+    """The current work has sent all the requests it may to the host"""
+
+
+class RequestBudget:
+    """
+    Per-host cap on the upstream requests one piece of work may send.
+    Requests made inside request_budget() are checked and charged before
+    they are sent.
+    """
+
+    def __init__(self, default: int, per_host: Optional[Dict[str, int]] = None):
+        self.default = default
+        self.per_host = dict(per_host or {})
+        self.used = Counter()
+        self._lock = threading.Lock()
+
+    def limit(self, host: str) -> int:
+        return self.per_host.get(host, self.default)
+
+    def spend(self, host: str):
+        """Charge one request to host, raising RequestBudgetExceeded when used up"""
+        with self._lock:
+            if self.used[host] >= self.limit(host):
+                raise RequestBudgetExceeded(f"Request budget for {host} used up")
+            self.used[host] += 1
+
+    def exhausted(self) -> Optional[str]:
+        """A host whose budget is used up, if any"""
+        with self._lock:
+            for host, used in self.used.items():
+                if used >= self.limit(host):
+                    return host
+        return None
+
+
+@contextmanager
+def deadline(at: float):
+    """
+    Requests made inside (in this thread or task) must not wait past the
+    monotonic time at
+    """
+    token = _deadline.set(at)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+@contextmanager
+def request_budget(budget: RequestBudget):
+    """Charge requests made inside (in this thread or task) to budget"""
+    token = _budget.set(budget)
+    try:
+        yield
+    finally:
+        _budget.reset(token)
+
+
+def current_budget() -> Optional[RequestBudget]:
+    """Budget set by the innermost request_budget(), if any"""
+    return _budget.get()
+
+
+class TokenBucket:
+    """
+    Token bucket that hands out reservations instead of blocking.
+    Tokens may go negative so concurrent callers queue up fairly, but only
+    as far as the longest wait a caller accepts.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity,
+                          self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, max_wait: float = float('inf')) -> Optional[float]:
+        """
+        Take one token and return how long the caller must wait for it, or
+        None (taking nothing) when that would be longer than max_wait
+        """
+        with self._lock:
+            self._refill(time.monotonic())
+            wait = max(0.0, (1 - self.tokens) / self.rate)
+            if wait > max_wait:
+                self.rejected += 1
+                return None
+            self.tokens -= 1
+            return wait
+
+    def refund(self):
+        """Return a reserved token whose request was never sent"""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens = min(self.capacity, self.tokens + 1)
+
+    def wait_time(self) -> float:
+        """How long a new request would currently have to wait"""
+        with self._lock:
+            self._refill(time.monotonic())
+            return max(0.0, (1 - self.tokens) / self.rate)
+
+
+def parse_limits(spec: str) -> Dict[str, Tuple[float, float]]:
+    """
+    Parse "host=rate:burst,host2=rate:burst" into a limits dict
+    """
+    limits = {}
+    for item in spec.split(','):
+        item = item.strip()
+        if not item:
+            continue
+        try:
+            host, limit = item.split('=', 1)
+            rate, _, burst = limit.partition(':')
+            limits[host.strip().lower()] = (float(rate), float(burst or rate))
+        except ValueError:
+            logger.warning(f"Ignoring invalid rate limit: {item}")
+    return limits
+
+
+class HostRateLimiter:
+    """
+    Shared rate limiter keyed by host name
+    """
+
+    def __init__(self, limits: Optional[Dict[str, Tuple[float, float]]] = None,
+                 default: Tuple[float, float] = DEFAULT_LIMIT,
+                 max_wait: float = DEFAULT_MAX_WAIT):
+        self.limits = dict(DEFAULT_HOST_LIMITS)
+        if limits:
+            self.limits.update(limits)
+        self.default = default
+        self.max_wait = max_wait
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def host_of(url_or_host: str) -> str:
+        if '://' in url_or_host:
+            return urlparse(url_or_host).hostname or ''
+        return url_or_host.lower()
+
+    def _bucket(self, host: str) -> TokenBucket:
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            with self._lock:
+                bucket = self._buckets.get(host)
+                if bucket is None:
+                    rate, capacity = self.limits.get(host, self.default)
+                    bucket = TokenBucket(rate, capacity)
+                    self._buckets[host] = bucket
+        return bucket
+
+    def _reserve(self, url_or_host: str) -> Tuple[TokenBucket, float]:
+        """Reserve a token, raising RateLimitExceeded if the wait is too long"""
+        host = self.host_of(url_or_host)
+        max_wait = self.max_wait
+        at = _deadline.get()
+        if at is not None:
+            max_wait = min(max_wait, max(0.0, at - time.monotonic()))
+
+        bucket = self._bucket(host)
+        wait = bucket.reserve(max_wait)
+        if wait is None:
+            raise RateLimitExceeded(
+                f"Rate limit for {host} needs a wait over {max_wait:.1f}s")
+
+        budget = _budget.get()
+        if budget is not None:
+            try:
+                budget.spend(host)
+            except RequestBudgetExceeded:
+                bucket.refund()
+                raise
+        return bucket, wait
+
+    def acquire(self, url_or_host: str) -> float:
+        """Block until the host has budget; returns the time waited"""
+        _, wait = self._reserve(url_or_host)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self, url_or_host: str) -> float:
+        """Async variant of acquire; a cancelled wait gives its token back"""
+        bucket, wait = self._reserve(url_or_host)
+        if wait > 0:
+            try:
+                await asyncio.sleep(wait)
+            except asyncio.CancelledError:
+                bucket.refund()
+                raise
+        return wait
+
+    def wait_time(self, url_or_host: str) -> float:
+        """Current wait before a request to this host would be sent"""
+        return self._bucket(self.host_of(url_or_host)).wait_time()
+
+    def stats(self) -> Dict:
+        """Limits and current wait time per host seen so far"""
+        return {
+            host: {
+                'rate': bucket.rate,
+                'burst': bucket.capacity,
+                'wait_time': round(bucket.wait_time(), 3),
+                'rejected': bucket.rejected,
+            }
+            for host, bucket in list(self._buckets.items())
+        }
+
+
+_rate_limiter = None
+_rate_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> HostRateLimiter:
+    """
+    Process-wide limiter, configured from RATE_LIMITS / RATE_LIMIT_DEFAULT /
+    RATE_LIMIT_MAX_WAIT
+    """
+    global _rate_limiter
+    if _rate_limiter is None:
+        with _rate_limiter_lock:
+            if _rate_limiter is None:
+                default = None
+                if os.getenv('RATE_LIMIT_DEFAULT'):
+                    default = parse_limits(
+                        f"default={os.getenv('RATE_LIMIT_DEFAULT')}").get('default')
+                _rate_limiter = HostRateLimiter(
+                    parse_limits(os.getenv('RATE_LIMITS', '')),
+                    default or DEFAULT_LIMIT,
+                    max_wait=float(os.getenv('RATE_LIMIT_MAX_WAIT', DEFAULT_MAX_WAIT)))
+    return _rate_limiter
@@ -0,0 +1,215 @@
+"""
+Similarity cache for Gemini recommendations
+Near-paraphrased requests ("gift for my dad who likes coffee" / "coffee gift
+for father") reuse an earlier parsed response. Requests are turned into
+hashed TF-IDF vectors locally; a lookup scores every stored request at once
+with cosine similarity and hits above a threshold. Requires NumPy.
+"""
+
+import hashlib
+import logging
+import os
+import re
+import threading
+import time
+import zlib
+from typing import Dict, List, Optional
+
+# Optional NumPy - without it only the exact-match cache is used
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Hashed feature space; collisions are rare for chat-sized messages
+HASH_DIMS = 1 << 12
+
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+# Words that say nothing about which gift fits
+_STOPWORDS = frozenset("""
+a about am an and any are as at be buy buying can could do does enjoy enjoys
+fan for from get gift gifts good great give giving has have he her him his i
+idea ideas im in into is it like likes looking love loves me my need of on or
+please present presents really some something she someone suggest that the
+their them they this to want was what who whose with would you your
+""".split())
+
+# Different words for the same recipient or interest
+_SYNONYMS = {
+    'dad': 'father', 'daddy': 'father', 'papa': 'father', 'pops': 'father',
+    'mom': 'mother', 'mum': 'mother', 'mommy': 'mother', 'mama': 'mother',
+    'grandpa': 'grandfather', 'granddad': 'grandfather',
+    'grandma': 'grandmother', 'granny': 'grandmother', 'nana': 'grandmother',
+    'bf': 'boyfriend', 'gf': 'girlfriend', 'hubby': 'husband', 'wifey': 'wife',
+    'bro': 'brother', 'sis': 'sister', 'kid': 'child', 'kids': 'child',
+    'children': 'child', 'coworker': 'colleague',
+}
+# Only true synonyms: recipients such as son and daughter stay distinct so
+# one never gets the other's recommendations
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-cased content words with synonyms merged and plurals folded"""
+    tokens = []
+    for word in _TOKEN_RE.findall(text.lower()):
+        if word in _STOPWORDS:
+            continue
+        word = _SYNONYMS.get(word, word)
+        if len(word) > 4 and word.endswith('ies'):
+            word = word[:-3] + 'y'
+        elif len(word) > 3 and word.endswith('s') and not word.endswith('ss'):
+            word = word[:-1]
+        tokens.append(_SYNONYMS.get(word, word))
+    return tokens
+
+
+def request_tokens(user_message: str, preferences: Optional[Dict] = None) -> List[str]:
+    """Tokens of a message plus its preferences (prefixed with their key)"""
+    tokens = tokenize(user_message)
+    for key, value in sorted((preferences or {}).items()):
+        tokens.extend(f'{key}:{token}' for token in tokenize(str(value)))
+    return tokens
+
+
+def _feature(token: str) -> int:
+    # crc32 is stable across processes, unlike hash()
+    return zlib.crc32(token.encode('utf-8')) % HASH_DIMS
+
+
+class SemanticCache:
+    """
+    Fixed-capacity store of (request vector, response) rows. Rows only match
+    requests with the same partition (model and conversation context).
+    Entries expire after ttl; when full, expired then oldest rows are reused.
+    """
+
+    def __init__(self, maxsize: int = 256, ttl: float = 900.0, threshold: float = 0.85):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.threshold = threshold
+
+        self._tf = np.zeros((maxsize, HASH_DIMS), dtype=np.float32)
+        self._df = np.zeros(HASH_DIMS, dtype=np.float32)
+        self._expires = np.zeros(maxsize)  # 0 marks a free row
+        self._inserted = np.zeros(maxsize)
+        self._partitions = np.zeros(maxsize, dtype=np.uint64)
+        self._values = [None] * maxsize
+        self._texts = [None] * maxsize
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    def _vector(self, tokens: List[str]) -> 'np.ndarray':
+        """Sublinear term frequencies in the hashed feature space"""
+        vector = np.zeros(HASH_DIMS, dtype=np.float32)
+        np.add.at(vector, [_feature(token) for token in tokens], 1.0)
+        nonzero = vector > 0
+        vector[nonzero] = 1.0 + np.log(vector[nonzero])
+        return vector
+
+    @staticmethod
+    def _partition(partition: str) -> int:
+        return int.from_bytes(
+            hashlib.blake2b(partition.encode('utf-8'), digest_size=8).digest(), 'big')
+
+    def get(self, user_message: str, partition: str = '',
+            preferences: Optional[Dict] = None):
+        """Response of the most similar live request above the threshold, or None"""
+        tokens = request_tokens(user_message, preferences)
+        if not tokens:
+            return None
+        query = self._vector(tokens)
+
+        with self._lock:
+            now = time.monotonic()
+            live = (self._expires > now) & (self._partitions == self._partition(partition))
+            if not live.any():
+                self.misses += 1
+                return None
+
+            # IDF over the stored rows, so terms every request shares weigh less
+            rows = np.flatnonzero(live)
+            stored = np.count_nonzero(self._inserted)
+            idf = np.log((1.0 + stored) / (1.0 + self._df)) + 1.0
+            query = query * idf
+            query_norm = np.linalg.norm(query)
+
+            # Only features some stored request has can contribute
+            used = np.flatnonzero(self._df)
+            weighted = self._tf[np.ix_(rows, used)] * idf[used]
+
+            norms = np.linalg.norm(weighted, axis=1) * query_norm
+            scores = weighted @ query[used] / np.where(norms > 0, norms, 1.0)
+            best = int(np.argmax(scores))
+            score = float(scores[best])
+            row = int(rows[best])
+
+            if score < self.threshold:
+                self.misses += 1
+                logger.debug(f"Semantic cache miss (best {score:.3f}): "
+                             f"{user_message[:60]!r} vs {self._texts[row][:60]!r}")
+                return None
+
+            self.hits += 1
+            logger.info(f"Semantic cache hit (score {score:.3f}): "
+                        f"{user_message[:60]!r} matched {self._texts[row][:60]!r}")
+            return self._values[row]
+
+    def set(self, user_message: str, value, partition: str = '',
+            preferences: Optional[Dict] = None):
+        """Store a response for a request"""
+        tokens = request_tokens(user_message, preferences)
+        if not tokens:
+            return
+        vector = self._vector(tokens)
+
+        with self._lock:
+            now = time.monotonic()
+            expired = np.flatnonzero(self._expires <= now)
+            row = int(expired[0]) if len(expired) else int(np.argmin(self._inserted))
+
+            # Keep document frequencies in step with the stored rows
+            if self._values[row] is not None:
+                self._df -= self._tf[row] > 0
+            self._df += vector > 0
+
+            self._tf[row] = vector
+            self._expires[row] = now + self.ttl
+            self._inserted[row] = now
+            self._partitions[row] = self._partition(partition)
+            self._values[row] = value
+            self._texts[row] = user_message
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': int((self._expires > time.monotonic()).sum()),
+                'maxsize': self.maxsize,
+                'threshold': self.threshold,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+            }
+
+
+def create_semantic_cache() -> Optional[SemanticCache]:
+    """
+    SemanticCache configured from GEMINI_SEMANTIC_* settings, or None when
+    disabled or NumPy is not installed
+    """
+    if os.getenv('GEMINI_SEMANTIC_CACHE', 'true').lower() != 'true':
+        return None
+    if not NUMPY_AVAILABLE:
+        logger.warning("NumPy not available - Gemini similarity cache disabled")
+        return None
+    return SemanticCache(
+        maxsize=int(os.getenv('GEMINI_SEMANTIC_CACHE_SIZE', 256)),
+        ttl=float(os.getenv('GEMINI_SEMANTIC_CACHE_TTL',
+                            os.getenv('GEMINI_CACHE_TTL', 900))),
+        threshold=float(os.getenv('GEMINI_SEMANTIC_THRESHOLD', 0.85)))
@@ -0,0 +1,185 @@
+"""
+Single-flight coalescing of identical upstream requests
+Concurrent callers asking for the same normalized request wait for the one
+fetch already in flight and share its result. A finished result is kept for
+a short linger window so back-to-back callers (e.g. the eBay fallback that
+runs right after the multi-source search) reuse it as well.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+logger = logging.getLogger(__name__)
+
+
+def request_key(url: str, params: Optional[Dict] = None, *extra) -> tuple:
+    """
+    Normalized identity of a GET request: lower-cased scheme and host,
+    query string merged with params and sorted, fragment dropped
+    """
+    parts = urlsplit(url)
+    query = parse_qsl(parts.query, keep_blank_values=True)
+    if params:
+        query.extend((str(k), str(v)) for k, v in params.items())
+    normalized = urlunsplit((parts.scheme.lower(), parts.netloc.lower(),
+                             parts.path or '/', urlencode(sorted(query)), ''))
+    return (normalized,) + extra
+
+
+class _Call:
+    __slots__ = ('event', 'result', 'error', 'done_at')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+        self.done_at = None
+
+
+class _AsyncCall:
+    __slots__ = ('future', 'done_at', 'waiters')
+
+    def __init__(self, future):
+        self.future = future
+        self.done_at = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Coalesces calls by key. do() is for threads, do_async() for coroutines
+    on one event loop; the two keep separate tables.
+    """
+
+    def __init__(self, linger: float = 2.0, enabled: bool = True):
+        self.linger = linger
+        self.enabled = enabled
+
+        self._calls = {}
+        self._async_calls = {}  # only touched from the event loop thread
+        self._lock = threading.Lock()
+
+        self.leaders = 0
+        self.shared = 0
+
+    def do(self, key, fn: Callable):
+        """Run fn() for key, or wait for and share the result of the call in flight"""
+        if not self.enabled:
+            return fn()
+
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None and self._expired(call):
+                del self._calls[key]
+                call = None
+
+            if call is None:
+                call = self._calls[key] = _Call()
+                self.leaders += 1
+                leader = True
+            else:
+                self.shared += 1
+                leader = False
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            call.done_at = time.monotonic()
+            with self._lock:
+                # Errors are only shared with callers already waiting
+                if call.error is not None or self.linger <= 0:
+                    self._calls.pop(key, None)
+                self._purge()
+            call.event.set()
+
+        return call.result
+
+    async def do_async(self, key, factory: Callable):
+        """Await factory() for key, or share the awaitable already in flight"""
+        if not self.enabled:
+            return await factory()
+
+        call = self._async_calls.get(key)
+        if call is not None and (call.done_at is None or
+                                 time.monotonic() - call.done_at < self.linger):
+            self.shared += 1
+        else:
+            call = self._async_calls[key] = _AsyncCall(asyncio.ensure_future(factory()))
+            self.leaders += 1
+            call.future.add_done_callback(lambda f: self._async_done(key, call))
+
+        call.waiters += 1
+        try:
+            # shield: one caller timing out must not cancel the others
+            return await asyncio.shield(call.future)
+        except asyncio.CancelledError:
+            # ...but once every caller has given up, stop the fetch itself so
+            # it can release what it holds (e.g. a reserved rate-limit token)
+            if call.waiters == 1 and not call.future.done():
+                call.future.cancel()
+            raise
+        finally:
+            call.waiters -= 1
+
+    def _async_done(self, key, call: _AsyncCall):
+        if self._async_calls.get(key) is not call:
+            return
+        future = call.future
+        if future.cancelled() or future.exception() is not None or self.linger <= 0:
+            del self._async_calls[key]
+        else:
+            call.done_at = time.monotonic()
+
+        now = time.monotonic()
+        for k, c in list(self._async_calls.items()):
+            if c.done_at is not None and now - c.done_at >= self.linger:
+                del self._async_calls[k]
+
+    def _expired(self, call: _Call) -> bool:
+        return call.done_at is not None and time.monotonic() - call.done_at >= self.linger
+
+    def _purge(self):
+        """Drop lingering results past their window (caller holds the lock)"""
+        for key in [k for k, c in self._calls.items() if self._expired(c)]:
+            del self._calls[key]
+
+    def stats(self) -> Dict:
+        return {
+            'enabled': self.enabled,
+            'linger': self.linger,
+            'fetches': self.leaders,
+            'shared': self.shared,
+            'tracked': len(self._calls) + len(self._async_calls),
+        }
+
+
+_flights = None
+_flights_lock = threading.Lock()
+
+
+def get_single_flight() -> SingleFlight:
+    """
+    Process-wide single-flight table, configured from SINGLE_FLIGHT_* settings
+    """
+    global _flights
+    if _flights is None:
+        with _flights_lock:
+            if _flights is None:
+                _flights = SingleFlight(
+                    linger=float(os.getenv('SINGLE_FLIGHT_LINGER', 2.0)),
+                    enabled=os.getenv('SINGLE_FLIGHT_ENABLED', 'true').lower() == 'true')
+    return _flights
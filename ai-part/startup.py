@@ -0,0 +1,43 @@
+"""
+Startup timing for the API process
+Boot steps (imports, service creation) are wrapped in timed() and reported
+once the app is ready and on /api/stats. For a per-module breakdown run
+python -X importtime app.py.
+"""
+
+import logging
+import time
+from contextlib import contextmanager
+from typing import Dict
+
+logger = logging.getLogger(__name__)
+
+PROCESS_START = time.perf_counter()
+
+_timings = []  # (label, seconds) in the order they finished
+
+
+@contextmanager
+def timed(label: str):
+    """Record how long the enclosed step takes"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _timings.append((label, time.perf_counter() - start))
+
+
+def report() -> Dict:
+    """Step timings in milliseconds"""
+    return {
+        'steps_ms': {label: round(seconds * 1000, 1) for label, seconds in _timings},
+        'uptime_s': round(time.perf_counter() - PROCESS_START, 1),
+    }
+
+
+def log_report():
+    """Log every step recorded so far and the time since boot started"""
+    for label, seconds in _timings:
+        logger.info(f"Startup: {label:<28} {seconds * 1000:8.1f} ms")
+    logger.info(
+        f"Startup: ready after {(time.perf_counter() - PROCESS_START) * 1000:.1f} ms")
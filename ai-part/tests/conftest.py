@@ -0,0 +1,14 @@
+"""
+Shared test setup: modules are imported from ai-part like the app does,
+and nothing touches the network or the on-disk catalog.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault('GEMINI_API_KEY', 'test')
+os.environ['CATALOG_ENABLED'] = 'false'
+os.environ['HTTP_PREWARM'] = 'false'
+os.environ['PRODUCT_ENGINE'] = 'sync'
@@ -0,0 +1,31 @@
+import asyncio
+
+import pytest
+
+from api_integrations import ProductAPIManager
+from async_engine import AIOHTTP_AVAILABLE, AsyncProductEngine
+
+pytestmark = pytest.mark.skipif(not AIOHTTP_AVAILABLE, reason='aiohttp not installed')
+
+
+def test_close_closes_the_client_and_stops_the_loop():
+    engine = AsyncProductEngine(ProductAPIManager())
+
+    async def open_session():
+        return engine._get_session()
+
+    session = engine.run(open_session(), timeout=5)
+    thread = engine._thread
+    engine.close()
+
+    assert session.closed
+    assert not thread.is_alive()
+    engine.close()  # closing twice is harmless
+
+
+def test_engine_can_be_used_again_after_close():
+    engine = AsyncProductEngine(ProductAPIManager())
+    engine.run(asyncio.sleep(0), timeout=5)
+    engine.close()
+    assert engine.run(asyncio.sleep(0, result='ok'), timeout=5) == 'ok'
+    engine.close()
@@ -0,0 +1,78 @@
+import time
+
+from cache import BackgroundRefresher, TTLCache
+
+
+def test_expired_entries_are_served_stale_within_grace():
+    cache = TTLCache(ttl=0.05, grace=10)
+    cache.set('key', 'value')
+    assert cache.get_stale('key') == ('value', False)
+
+    time.sleep(0.06)
+    assert cache.get('key') is None
+    assert cache.get_stale('key') == ('value', True)
+    assert cache.stats()['stale_hits'] == 1
+
+
+def test_entries_are_dropped_after_grace():
+    cache = TTLCache(ttl=0.02, grace=0.03)
+    cache.set('key', 'value')
+    time.sleep(0.06)
+    assert cache.get_stale('key') is None
+    assert cache.expires_in('key') is None
+    assert len(cache) == 0
+
+
+def test_expires_in_is_negative_within_grace():
+    cache = TTLCache(ttl=0.01, grace=10)
+    cache.set('key', 'value')
+    time.sleep(0.02)
+    assert cache.expires_in('key') < 0
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = TTLCache(maxsize=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')
+    cache.set('c', 3)
+    assert cache.get('b') is None
+    assert (cache.get('a'), cache.get('c')) == (1, 3)
+
+
+def test_byte_budget_evicts_and_skips_oversized_values():
+    cache = TTLCache(max_bytes=10, sizeof=len)
+    cache.set('a', 'xxxxxx')
+    cache.set('b', 'yyyyyy')
+    assert cache.get('a') is None and cache.get('b') == 'yyyyyy'
+    cache.set('big', 'z' * 11)
+    assert cache.get('big') is None
+
+
+def wait_idle(refresher):
+    for _ in range(100):
+        if not refresher.stats()['in_flight']:
+            return
+        time.sleep(0.01)
+
+
+def test_refresher_coalesces_and_counts_outcomes():
+    refresher = BackgroundRefresher(workers=1)
+    started = []
+
+    def slow():
+        started.append(1)
+        time.sleep(0.05)
+        return ['product']
+
+    assert refresher.schedule('key', slow)
+    assert not refresher.schedule('key', slow)
+    wait_idle(refresher)
+    refresher.schedule('empty', lambda: [])
+    wait_idle(refresher)
+    refresher.schedule('failing', lambda: 1 / 0)
+    wait_idle(refresher)
+
+    stats = refresher.stats()
+    assert len(started) == 1
+    assert (stats['coalesced'], stats['succeeded'], stats['empty'], stats['failed']) == (1, 1, 1, 1)
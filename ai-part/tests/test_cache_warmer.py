@@ -0,0 +1,101 @@
+import asyncio
+import logging
+
+import pytest
+
+from api_integrations import ProductAPIManager
+from async_engine import AIOHTTP_AVAILABLE, AsyncProductEngine
+from cache import TTLCache
+from cache_warmer import CacheWarmer, parse_host_budgets
+from rate_limiter import HostRateLimiter, RequestBudget, RequestBudgetExceeded, request_budget
+
+HOST = 'www.ebay.com'
+
+
+def test_only_requests_inside_the_budget_are_charged():
+    limiter = HostRateLimiter({HOST: (1000.0, 1000)})
+    budget = RequestBudget(2)
+
+    limiter.acquire(HOST)  # user traffic
+    with request_budget(budget):
+        limiter.acquire(HOST)
+        limiter.acquire(HOST)
+        with pytest.raises(RequestBudgetExceeded):
+            limiter.acquire(HOST)
+    limiter.acquire(HOST)
+
+    assert budget.used[HOST] == 2
+    assert budget.exhausted() == HOST
+
+
+class FakeScraper:
+    """Sends requests_per_query requests per warmed query, like the sources do"""
+
+    def __init__(self, limiter, requests_per_query):
+        self.limiter = limiter
+        self.requests_per_query = requests_per_query
+        self.cache = TTLCache()
+        self.sent = 0
+
+    def warm(self, query, max_results):
+        for _ in range(self.requests_per_query):
+            try:
+                self.limiter.acquire(HOST)
+            except RequestBudgetExceeded:
+                return 0
+            self.sent += 1
+        return 1
+
+
+def test_warming_stops_at_its_own_budget():
+    limiter = HostRateLimiter({HOST: (1000.0, 1000)})
+    scraper = FakeScraper(limiter, requests_per_query=3)
+    warmer = CacheWarmer(lambda: scraper, ['lego', 'chess', 'yoga'], top_n=0,
+                         delay=0, host_budget=4)
+
+    for _ in range(50):
+        limiter.acquire(HOST)  # heavy user traffic does not use the budget
+    warmer.run_once()
+
+    assert scraper.sent == 4
+    assert (warmer.warmed, warmer.empty, warmer.budget_stops) == (1, 1, 1)
+
+
+def test_budget_follows_source_searches_into_worker_threads(monkeypatch):
+    manager = ProductAPIManager(concurrent=True)
+    manager.rate_limiter = HostRateLimiter({HOST: (1000.0, 1000)})
+
+    def source(query, max_results):
+        manager.rate_limiter.acquire(HOST)
+        return []
+    monkeypatch.setattr(manager, 'get_sources', lambda: [('ebay', source), ('amazon', source)])
+
+    budget = RequestBudget(10)
+    with request_budget(budget):
+        manager.search_products_multi_source('lego', 4)
+    assert budget.used[HOST] == 2
+    manager.shutdown()
+
+
+@pytest.mark.skipif(not AIOHTTP_AVAILABLE, reason='aiohttp not installed')
+def test_budget_follows_searches_onto_the_engine_loop():
+    manager = ProductAPIManager()
+    manager.rate_limiter = HostRateLimiter({HOST: (1000.0, 1000)})
+    engine = AsyncProductEngine(manager)
+
+    async def fetch():
+        await asyncio.sleep(0)
+        await manager.rate_limiter.acquire_async(HOST)
+
+    budget = RequestBudget(10)
+    with request_budget(budget):
+        engine.run(fetch(), timeout=5)
+    engine.run(fetch(), timeout=5)
+    assert budget.used[HOST] == 1
+    engine.close()
+
+
+def test_parse_host_budgets_skips_invalid_entries(caplog):
+    with caplog.at_level(logging.WARNING):
+        assert parse_host_budgets('serpapi.com=10, www.ebay.com=lots,') == {'serpapi.com': 10}
+    assert 'invalid warmer host budget' in caplog.text
@@ -0,0 +1,32 @@
+from catalog import ProductCatalog
+from models import Product
+
+
+def make_catalog(tmp_path, names):
+    catalog = ProductCatalog(str(tmp_path / 'catalog.db'))
+    catalog.add([Product(name=name, price='$20.00', url=f'https://www.amazon.com/dp/{i}')
+                 for i, name in enumerate(names)])
+    return catalog
+
+
+def test_lookup_needs_the_full_candidate_set(tmp_path):
+    catalog = make_catalog(tmp_path, [f'Lego castle set {i}' for i in range(3)])
+
+    assert catalog.lookup('lego castle', 4) is None
+    assert len(catalog.lookup('lego castle', 3)) == 3
+    assert (catalog.hits, catalog.misses) == (1, 1)
+
+
+def test_lookup_counts_distinct_products(tmp_path):
+    # The same listing seen under two URLs only counts once
+    catalog = make_catalog(tmp_path, ['Lego castle set', 'LEGO Castle Set!', 'Lego castle kit'])
+
+    assert catalog.lookup('lego castle', 3) is None
+    assert catalog.misses == 1
+
+
+def test_synthetic_products_are_not_stored(tmp_path):
+    catalog = ProductCatalog(str(tmp_path / 'catalog.db'))
+    assert catalog.add([Product(name='Sample lego castle', price='$9.99',
+                                url='https://www.amazon.com/s?k=lego', synthetic=True)]) == 0
+    assert len(catalog) == 0
@@ -0,0 +1,75 @@
+import time
+
+from api_integrations import GOOGLE_SCRAPE_BREAKER, ProductAPIManager
+from circuit_breaker import FAILURE, BreakerRegistry, CircuitBreaker
+from rate_limiter import RateLimitExceeded
+
+
+def test_serpapi_error_and_scrape_fallback_record_one_outcome_each(monkeypatch):
+    manager = ProductAPIManager(concurrent=False)
+    manager.breakers = BreakerRegistry()
+    manager.api_configs['serpapi_key'] = 'test'
+
+    def fail(*args, **kwargs):
+        raise ConnectionError('SerpAPI down')
+    monkeypatch.setattr(manager.session, 'get', fail)
+    monkeypatch.setattr(manager, '_fetch', lambda url, **kwargs: (503, b''))
+
+    assert manager.search_google_shopping_api('lego') == []
+    assert list(manager.breakers.get('google_shopping').outcomes) == [FAILURE]
+    assert list(manager.breakers.get(GOOGLE_SCRAPE_BREAKER).outcomes) == [FAILURE]
+
+
+def make_breaker(**settings):
+    settings = dict(dict(window=10, min_calls=4, failure_threshold=0.5,
+                         empty_threshold=0.8, cooldown=0.05), **settings)
+    return CircuitBreaker('test', **settings)
+
+
+def test_opens_once_the_failure_rate_reaches_the_threshold():
+    breaker = make_breaker()
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+    assert breaker.stats()['skipped'] == 1
+
+
+def test_opens_when_most_calls_come_back_empty():
+    breaker = make_breaker()
+    for _ in range(4):
+        breaker.record_empty()
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def test_half_open_probe_closes_or_reopens():
+    breaker = make_breaker()
+    for _ in range(4):
+        breaker.record_failure()
+    time.sleep(0.06)
+
+    assert breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert not breaker.allow()  # one probe at a time
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow()
+
+
+def test_local_failures_and_short_upstream_timeouts_are_not_counted():
+    breaker = make_breaker(min_calls=1)
+    breaker.record_error(RateLimitExceeded('queue too long'))
+    breaker.record_timeout(upstream_seconds=1.0, timeout=6.0)
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert not breaker.outcomes
+
+    breaker.record_timeout(upstream_seconds=4.0, timeout=6.0)
+    assert breaker.state == CircuitBreaker.OPEN
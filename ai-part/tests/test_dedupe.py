@@ -0,0 +1,26 @@
+from product_scraper import ProductScraper
+from utils import remove_duplicate_products
+
+SONY = {'name': 'Sony WH-1000XM4 Wireless Bluetooth Headphones', 'price': '$278.00',
+        'url': 'https://www.amazon.com/dp/B0863TXGM3', 'source': 'amazon'}
+BOSE = {'name': 'Bose QuietComfort Wireless Bluetooth Headphones', 'price': '$249.00',
+        'url': 'https://www.ebay.com/itm/1234', 'source': 'ebay'}
+
+
+def test_different_brands_matching_the_query_are_kept():
+    assert remove_duplicate_products([SONY, BOSE]) == [SONY, BOSE]
+
+
+def test_same_url_or_same_name_is_dropped():
+    relisted = dict(SONY, url='https://www.ebay.com/itm/999')
+    same_url = dict(BOSE, name='Bose QC Headphones')
+    renamed = dict(SONY, name='sony wh1000xm4 wireless, bluetooth headphones!',
+                   url='https://www.ebay.com/itm/555')
+    assert remove_duplicate_products([SONY, BOSE, relisted, same_url, renamed]) == [SONY, BOSE]
+
+
+def test_search_keeps_both_brands(monkeypatch):
+    scraper = ProductScraper()
+    monkeypatch.setattr(scraper, '_search_uncached', lambda *args: [SONY, BOSE])
+    products = scraper.search_products('wireless bluetooth headphones', 3)
+    assert {product['name'] for product in products} == {SONY['name'], BOSE['name']}
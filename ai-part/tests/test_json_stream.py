@@ -0,0 +1,47 @@
+import json_stream
+from json_stream import IncrementalJSONParser
+
+
+def feed_all(chunks):
+    parser = IncrementalJSONParser()
+    events = []
+    for chunk in chunks:
+        events.extend(parser.feed(chunk))
+    return events
+
+
+def response_text(events):
+    return ''.join(event[1] for event in events if event[0] == 'response_delta')
+
+
+def test_unicode_escape_split_across_chunks():
+    events = feed_all(['{"response": "caf\\u00', 'e9 gifts", "recommendations": {}}'])
+    assert response_text(events) == 'café gifts'
+
+
+def test_malformed_unicode_escape_is_kept_as_text():
+    events = feed_all(['{"response": "a \\uZZ12 b", "recommendations": {"Mugs": "coffee mug"}}'])
+    assert response_text(events) == 'a \\uZZ12 b'
+    assert ('recommendation', 'Mugs', 'coffee mug') in events
+
+
+class FakeChunk:
+    def __init__(self, text):
+        self.text = text
+
+
+def test_stream_falls_back_to_the_full_parse(monkeypatch):
+    from gemini_service import GeminiService
+
+    service = GeminiService('test', semantic_cache=False)
+    answer = '{"response": "Try these", "recommendations": {"Mugs": "coffee mug"}, "questions": []}'
+    monkeypatch.setattr(service.model, 'generate_content',
+                        lambda prompt, stream: iter([FakeChunk(answer[:20]), FakeChunk(answer[20:])]))
+
+    def broken_feed(self, text):
+        raise ValueError('parser bug')
+    monkeypatch.setattr(json_stream.IncrementalJSONParser, 'feed', broken_feed)
+
+    events = list(service.stream_gift_recommendations('gift for my dad'))
+    assert events[-1]['type'] == 'done'
+    assert events[-1]['result']['recommendations'] == {'Mugs': 'coffee mug'}
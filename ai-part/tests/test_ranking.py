@@ -0,0 +1,65 @@
+import math
+
+import pytest
+
+from models import Product
+from ranking import budget_from_preferences, parse_budget, rank_products
+
+
+@pytest.mark.parametrize('budget, expected', [
+    ('$20-50', (20.0, 50.0)),
+    ('20 to 50', (20.0, 50.0)),
+    ('under $30', (0.0, 30.0)),
+    ('$100+', (100.0, math.inf)),
+    ('around 40', (32.0, 48.0)),
+    (40, (32.0, 48.0)),
+    ({'min': 20, 'max': 50}, (20.0, 50.0)),
+    ({'max': '$1,000'}, (0.0, 1000.0)),
+    ('', None),
+    ('whatever you think', None),
+    (0, None),
+])
+def test_parse_budget(budget, expected):
+    result = parse_budget(budget)
+    if expected is None:
+        assert result is None
+    else:
+        assert result == pytest.approx(expected)
+
+
+def test_budget_from_preferences_ignores_missing_or_bad_values():
+    assert budget_from_preferences({'budget': 'under $25'}) == (0.0, 25.0)
+    assert budget_from_preferences({'interests': 'lego'}) is None
+    assert budget_from_preferences(None) is None
+
+
+def product(name, price, rating=None, reviews=None, source='amazon', synthetic=False):
+    return Product(name=name, price=price, source=source, rating=rating,
+                   reviews=reviews, synthetic=synthetic)
+
+
+def test_rank_prefers_well_reviewed_products():
+    poor = product('Poor', '$30', rating=2.5, reviews=3)
+    good = product('Good', '$30', rating=4.8, reviews=4000)
+    okay = product('Okay', '$30', rating=4.0, reviews=200)
+    assert rank_products([poor, good, okay], 2) == [good, okay]
+
+
+def test_rank_prefers_products_inside_the_budget():
+    cheap = product('Cheap', '$25', rating=4.0, reviews=100)
+    pricey = product('Pricey', '$250', rating=4.0, reviews=100)
+    assert rank_products([pricey, cheap], 1, budget=(20.0, 50.0)) == [cheap]
+
+
+def test_synthetic_products_rank_after_real_ones():
+    sample = product('Sample', '$30', rating=5.0, reviews=5000, source='google_shopping',
+                     synthetic=True)
+    real = product('Real', '$30', rating=3.0, reviews=1, source='aliexpress')
+    assert rank_products([sample, real], 2) == [real, sample]
+
+
+def test_equal_scores_keep_their_order():
+    products = [product(f'P{i}', '$30', rating=4.0, reviews=10) for i in range(5)]
+    assert rank_products(products, 3) == products[:3]
+    assert rank_products(products, 0) == []
+    assert rank_products([], 3) == []
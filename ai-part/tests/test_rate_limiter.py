@@ -0,0 +1,76 @@
+import asyncio
+import time
+
+import pytest
+
+from rate_limiter import HostRateLimiter, RateLimitExceeded, TokenBucket, deadline
+from singleflight import SingleFlight
+
+HOST = 'www.ebay.com'
+
+
+def test_reserve_refuses_waits_over_max_wait_without_taking_a_token():
+    bucket = TokenBucket(rate=1.0, capacity=1)
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve(max_wait=0.5) is None
+    assert bucket.rejected == 1
+    assert bucket.tokens == pytest.approx(0.0, abs=0.01)
+
+
+def test_refund_returns_a_token_up_to_capacity():
+    bucket = TokenBucket(rate=0.001, capacity=2)
+    bucket.reserve()
+    bucket.reserve()
+    bucket.refund()
+    assert bucket.tokens == pytest.approx(1.0, abs=0.01)
+    bucket.refund()
+    bucket.refund()
+    assert bucket.tokens == 2
+
+
+def test_deadline_rejects_waits_that_would_outlast_it():
+    limiter = HostRateLimiter({HOST: (1.0, 1)}, max_wait=10)
+    limiter.acquire(HOST)
+    with deadline(time.monotonic() + 0.2):
+        with pytest.raises(RateLimitExceeded):
+            limiter.acquire(HOST)
+
+
+def fetch_after_acquire(limiter):
+    async def fetch():
+        await limiter.acquire_async(HOST)
+        return 'page'
+    return fetch
+
+
+def test_timed_out_single_flight_caller_refunds_its_token():
+    limiter = HostRateLimiter({HOST: (1.0, 1)}, max_wait=10)
+    flights = SingleFlight()
+    bucket = limiter._bucket(HOST)
+
+    async def main():
+        limiter.acquire(HOST)  # the next request has to wait about 1s
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(
+                flights.do_async('key', fetch_after_acquire(limiter)), 0.1)
+        await asyncio.sleep(0)  # let the cancelled fetch run its handler
+        # Without the refund the reservation would leave the bucket near -1
+        return bucket.tokens
+
+    assert asyncio.run(main()) > -0.5
+
+
+def test_fetch_keeps_running_while_another_caller_waits():
+    limiter = HostRateLimiter({HOST: (5.0, 1)}, max_wait=10)
+    flights = SingleFlight()
+
+    async def main():
+        limiter.acquire(HOST)  # the shared fetch waits about 0.2s
+        fetch = fetch_after_acquire(limiter)
+        patient = asyncio.ensure_future(flights.do_async('key', fetch))
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(flights.do_async('key', fetch), 0.05)
+        return await patient
+
+    assert asyncio.run(main()) == 'page'
+    assert flights.leaders == 1
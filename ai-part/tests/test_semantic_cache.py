@@ -0,0 +1,28 @@
+import pytest
+
+from semantic_cache import NUMPY_AVAILABLE, SemanticCache, tokenize
+
+pytestmark = pytest.mark.skipif(not NUMPY_AVAILABLE, reason='NumPy not installed')
+
+
+def cached(stored, later, **kwargs):
+    cache = SemanticCache(maxsize=8)
+    cache.set(stored, 'response', **kwargs.pop('stored_kwargs', {}))
+    return cache.get(later, **kwargs)
+
+
+def test_paraphrases_share_a_response():
+    assert cached('gift for my dad who likes coffee', 'coffee gift for father') == 'response'
+    assert cached('present for my kids who love dinosaurs',
+                  'gift for my child who loves dinosaurs') == 'response'
+
+
+def test_different_recipients_do_not_share_a_response():
+    assert tokenize('son') != tokenize('daughters')
+    assert cached('gift for my son who loves lego', 'gift for my daughters who love lego') is None
+    assert cached('gift for my mom who likes gardening', 'gift for my dad who likes gardening') is None
+
+
+def test_partitions_are_kept_apart():
+    assert cached('gift for my dad who likes coffee', 'coffee gift for father',
+                  partition='other-context') is None
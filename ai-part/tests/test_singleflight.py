@@ -0,0 +1,46 @@
+import threading
+import time
+
+from singleflight import SingleFlight, request_key
+
+
+def test_request_key_normalizes_host_and_query_order():
+    assert (request_key('HTTPS://www.eBay.com/sch?b=2&a=1#top') ==
+            request_key('https://www.ebay.com/sch', {'a': 1, 'b': 2}))
+
+
+def test_concurrent_callers_share_one_call():
+    flights = SingleFlight(linger=0)
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        time.sleep(0.05)
+        return 'page'
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flights.do('key', fetch)))
+               for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == ['page'] * 5
+    assert len(calls) == 1
+    assert flights.shared == 4
+
+
+def test_errors_are_not_kept_for_later_callers():
+    flights = SingleFlight(linger=10)
+
+    def fail():
+        raise ConnectionError('down')
+
+    for _ in range(2):
+        try:
+            flights.do('key', fail)
+        except ConnectionError:
+            pass
+    assert flights.leaders == 2
+    assert flights.do('key', lambda: 'page') == 'page'
@@ -0,0 +1,48 @@
+import time
+
+from api_integrations import ProductAPIManager
+from circuit_breaker import FAILURE
+
+
+def sleeping_source(name, seconds, calls):
+    def search(query, max_results):
+        calls.append(name)
+        time.sleep(seconds)
+        return [{'name': f'{name} product', 'source': name}]
+    return search
+
+
+def make_manager(monkeypatch, sources, timeouts):
+    manager = ProductAPIManager(concurrent=True, max_workers=1, source_timeouts=timeouts)
+    monkeypatch.setattr(manager, 'get_sources', lambda: sources)
+    return manager
+
+
+def test_timeout_starts_when_a_worker_picks_the_source_up(monkeypatch):
+    calls = []
+    manager = make_manager(
+        monkeypatch,
+        [('amazon', sleeping_source('amazon', 0.3, calls)),
+         ('ebay', sleeping_source('ebay', 0.3, calls))],
+        {'amazon': 0.5, 'ebay': 0.5})
+
+    # ebay waits 0.3s for the only worker, then runs 0.3s: within its 0.5s
+    products = manager.search_products_multi_source('lego', 4)
+    assert [product['source'] for product in products] == ['amazon', 'ebay']
+    manager.shutdown()
+
+
+def test_source_still_queued_after_its_timeout_is_cancelled(monkeypatch):
+    calls = []
+    manager = make_manager(
+        monkeypatch,
+        [('amazon', sleeping_source('amazon', 0.5, calls)),
+         ('ebay', sleeping_source('ebay', 0.0, calls))],
+        {'amazon': 0.3, 'ebay': 0.2})
+
+    assert manager.search_products_multi_source('lego', 4) == []
+    time.sleep(0.4)
+    assert calls == ['amazon']
+    # Only the source that actually ran too long is held against its breaker
+    assert FAILURE not in manager.breakers.get('ebay').outcomes
+    manager.shutdown()
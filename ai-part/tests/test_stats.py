@@ -0,0 +1,12 @@
+import app
+from catalog import ProductCatalog
+from product_scraper import ProductScraper
+
+
+def test_stats_reports_an_empty_catalog(tmp_path, monkeypatch):
+    scraper = ProductScraper()
+    scraper.catalog = ProductCatalog(str(tmp_path / 'catalog.db'))
+    monkeypatch.setattr(app, 'product_scraper', scraper)
+
+    stats = app.app.test_client().get('/api/stats').get_json()
+    assert stats['catalog']['products'] == 0
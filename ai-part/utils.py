@@ -1,9 +1,42 @@
 import re
 import logging
-from typing import Dict, List, Any
+from functools import lru_cache
+from itertools import combinations
+from typing import Dict, Iterable, List, Any
 
 logger = logging.getLogger(__name__)
 
+# Patterns are compiled once at import
+_NON_ALNUM_RE = re.compile(r'[^a-zA-Z0-9\s]')
+_WHITESPACE_RE = re.compile(r'\s+')
+_UNDERSCORES_RE = re.compile(r'_+')
+_PRICE_RE = re.compile(r'[\d,]+\.?\d*')
+
+# Unwanted name prefixes/suffixes, in the order they used to be stripped
+_UNWANTED_NAME_RE = re.compile(
+    r'^(?:New Listing:?\s*)?(?:SPONSORED:?\s*)?(?:Ad\b\s*)?'
+    r'|(?:\s*\(Ad\))?(?:\s*- Sponsored)?$',
+    re.IGNORECASE)
+
+_URL_RE = re.compile(
+    r'^https?://'  # http:// or https://
+    # domain...
+    r'(?:(?:[A-Z0-9](?:[A-Z0-9-]{0,61}[A-Z0-9])?\.)+[A-Z]{2,6}\.?|'
+    r'localhost|'  # localhost...
+    r'\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})'  # ...or ip
+    r'(?::\d+)?'  # optional port
+    r'(?:/?|[/?]\S+)$', re.IGNORECASE)
+
+# Quality bounds used by process_products
+MIN_NAME_LENGTH = 5
+MAX_NAME_LENGTH = 200
+MAX_PRICE = 10000
+
+# merge_similar_products: names are compared on their first NAME_WORDS words
+# and count as similar when they share MIN_COMMON_WORDS of them
+DEDUPE_NAME_WORDS = 5
+DEDUPE_MIN_COMMON_WORDS = 3
+
 
 def validate_recommendations(recommendations: Dict) -> bool:
     """
@@ -62,12 +95,18 @@ def clean_category_name(category: str) -> str:
     if not isinstance(category, str):
         return str(category)
 
+    return _clean_category_name(category)
+
+
+@lru_cache(maxsize=1024)
+def _clean_category_name(category: str) -> str:
+    """Memoized body of clean_category_name (Gemini repeats categories a lot)"""
     # Convert to lowercase and replace spaces/special chars with underscores
-    cleaned = re.sub(r'[^a-zA-Z0-9\s]', '', category.lower())
-    cleaned = re.sub(r'\s+', '_', cleaned.strip())
+    cleaned = _NON_ALNUM_RE.sub('', category.lower())
+    cleaned = _WHITESPACE_RE.sub('_', cleaned.strip())
 
     # Remove multiple underscores
-    cleaned = re.sub(r'_+', '_', cleaned)
+    cleaned = _UNDERSCORES_RE.sub('_', cleaned)
 
     # Remove leading/trailing underscores
     cleaned = cleaned.strip('_')
@@ -75,6 +114,17 @@ def clean_category_name(category: str) -> str:
     return cleaned or 'unknown_category'
 
 
+def normalize_search_query(query: str) -> str:
+    """
+    Normalize search keywords for use as a cache key
+    """
+    if not isinstance(query, str):
+        query = str(query)
+
+    # Lowercase and collapse whitespace
+    return ' '.join(query.lower().split())
+
+
 def extract_price_value(price_string: str) -> float:
     """
     Extract numeric price value from price string
@@ -83,7 +133,7 @@ def extract_price_value(price_string: str) -> float:
         return 0.0
 
     # Remove currency symbols and extract numbers
-    price_match = re.search(r'[\d,]+\.?\d*', str(price_string))
+    price_match = _PRICE_RE.search(str(price_string))
 
     if price_match:
         try:
@@ -129,16 +179,7 @@ def sanitize_product_name(name: str) -> str:
     name = ' '.join(name.split())
 
     # Remove common unwanted prefixes/suffixes
-    unwanted_patterns = [
-        r'^(New Listing:?\s*)',
-        r'^(SPONSORED:?\s*)',
-        r'^(Ad\s*)',
-        r'\s*\(Ad\)$',
-        r'\s*- Sponsored$'
-    ]
-
-    for pattern in unwanted_patterns:
-        name = re.sub(pattern, '', name, flags=re.IGNORECASE)
+    name = _UNWANTED_NAME_RE.sub('', name)
 
     # Limit length
     if len(name) > 150:
@@ -154,16 +195,7 @@ def validate_url(url: str) -> bool:
     if not isinstance(url, str):
         return False
 
-    url_pattern = re.compile(
-        r'^https?://'  # http:// or https://
-        # domain...
-        r'(?:(?:[A-Z0-9](?:[A-Z0-9-]{0,61}[A-Z0-9])?\.)+[A-Z]{2,6}\.?|'
-        r'localhost|'  # localhost...
-        r'\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})'  # ...or ip
-        r'(?::\d+)?'  # optional port
-        r'(?:/?|[/?]\S+)$', re.IGNORECASE)
-
-    return url_pattern.match(url) is not None
+    return _URL_RE.match(url) is not None
 
 
 def log_performance(func_name: str, duration: float, success: bool = True):
@@ -188,62 +220,106 @@ def create_error_response(error_message: str, error_code: int = 500) -> Dict:
     }
 
 
-def filter_products_by_quality(products: List[Dict]) -> List[Dict]:
+def _passes_quality(name: str, price_value: float, url: str) -> bool:
+    """Name length, price range and URL checks applied by process_products"""
+    # Check name length (avoid very short or very long names)
+    name_length = len(name.strip())
+    if name_length < MIN_NAME_LENGTH or name_length > MAX_NAME_LENGTH:
+        return False
+
+    # Check if price is reasonable (avoid $0.00 or extremely high prices)
+    if price_value <= 0 or price_value > MAX_PRICE:
+        return False
+
+    # Check URL validity
+    return validate_url(url)
+
+
+def process_products(products: Iterable[Dict]) -> List[Dict]:
     """
-    Filter products based on quality criteria
+    Batch post-processing of raw source products in one pass: sanitize the
+    name, parse the price once (kept as price_value), then apply the quality
+    criteria (_passes_quality). Returns new dicts.
     """
-    filtered_products = []
+    processed = []
 
     for product in products:
-        # Check if product has essential information
-        if not product.get('name') or not product.get('price'):
+        name = product.get('name')
+        price = product.get('price')
+        if not name or not price:
             continue
 
-        # Check name length (avoid very short or very long names)
-        name_length = len(product['name'].strip())
-        if name_length < 5 or name_length > 200:
+        name = sanitize_product_name(name)
+        price_value = extract_price_value(price)
+        if not _passes_quality(name, price_value, product.get('url') or ''):
             continue
 
-        # Check if price is reasonable (avoid $0.00 or extremely high prices)
-        price_value = extract_price_value(product['price'])
-        if price_value <= 0 or price_value > 10000:
-            continue
+        cleaned = dict(product)
+        cleaned['name'] = name
+        cleaned['price_value'] = price_value
+        processed.append(cleaned)
+
+    return processed
+
+
+def remove_duplicate_products(products: List) -> List:
+    """
+    Drop repeats of the same listing, keeping the first seen: products with
+    the same URL or the same full name once case and punctuation are ignored.
+    Different products that merely share the search words are all kept.
+    """
+    unique_products = []
+    seen_urls = set()
+    seen_names = set()
 
-        # Check URL validity
-        if not validate_url(product.get('url', '')):
+    for product in products:
+        if isinstance(product, dict):
+            name, url = product.get('name') or '', product.get('url') or ''
+        else:
+            name, url = product.name, product.url
+        name = ' '.join(_NON_ALNUM_RE.sub('', name.lower()).split())
+
+        if (url and url in seen_urls) or name in seen_names:
             continue
 
-        filtered_products.append(product)
+        unique_products.append(product)
+        if url:
+            seen_urls.add(url)
+        seen_names.add(name)
 
-    return filtered_products
+    return unique_products
 
 
-def merge_similar_products(products: List[Dict]) -> List[Dict]:
+def merge_similar_products(products: List, min_common_words: int = DEDUPE_MIN_COMMON_WORDS,
+                           name_words: int = DEDUPE_NAME_WORDS) -> List:
     """
-    Remove very similar products to provide variety
+    Remove very similar products to provide variety, keeping the first seen.
+    Products are dicts or models.Product records.
+
+    Two names are similar when their first name_words words share at least
+    min_common_words words. That holds exactly when they share a
+    min_common_words-word combination, so every kept name is indexed by
+    its combinations and each product costs a few hash lookups instead of
+    a comparison with every name kept so far.
     """
     if len(products) <= 1:
         return products
 
     unique_products = []
-    seen_names = set()
+    seen_keys = set()
 
     for product in products:
+        name = product['name'] if isinstance(product, dict) else product.name
+
         # Create a simplified version of the name for comparison
-        simple_name = re.sub(r'[^a-zA-Z0-9\s]', '', product['name'].lower())
-        simple_name = ' '.join(simple_name.split()[:5])  # Use first 5 words
-
-        # Check if we've seen a very similar product
-        is_similar = False
-        for seen in seen_names:
-            # Calculate simple similarity
-            common_words = set(simple_name.split()) & set(seen.split())
-            if len(common_words) >= 3:  # If 3+ words in common, consider similar
-                is_similar = True
-                break
-
-        if not is_similar:
-            unique_products.append(product)
-            seen_names.add(simple_name)
+        words = _NON_ALNUM_RE.sub('', name.lower()).split()[:name_words]
+        keys = [frozenset(combo) for combo in
+                combinations(sorted(set(words)), min_common_words)]
+
+        if not seen_keys.isdisjoint(keys):
+            continue
+
+        unique_products.append(product)
+        seen_keys.update(keys)
 
     return unique_products
@@ -42,6 +42,16 @@ export const ChatWidget = () => {
     }
   }, [messages]);
 
+  // Update the assistant message with this timestamp, or append it
+  const upsertMessage = (timestamp: Date, message: Partial<Message>) => {
+    setMessages((prev) => {
+      if (prev.some((m) => m.timestamp === timestamp)) {
+        return prev.map((m) => (m.timestamp === timestamp ? { ...m, ...message } : m));
+      }
+      return [...prev, { role: "assistant", content: "", timestamp, ...message }];
+    });
+  };
+
   const handleSend = async () => {
     if (!input.trim() || isLoading) return;
 
@@ -56,31 +66,68 @@ export const ChatWidget = () => {
     setInput("");
     setIsLoading(true);
 
+    // Assistant reply and products message, both filled in as the pipeline streams
+    const replyTimestamp = new Date();
+    const productsTimestamp = new Date();
+    let streamedText = "";
+    let categoryCount = 0;
+    const streamed: Record<string, Product[]> = {};
+
     try {
-      // Send message to our Python API
-      const response = await giftService.sendChatMessage(currentInput, context);
+      // One request: chat text, recommendations and products all stream back
+      const { chat: response, products: productResponse } = await giftService.chatWithProductsStream(
+        currentInput,
+        context,
+        {},
+        {
+          onResponseText: (text) => {
+            streamedText += text;
+            upsertMessage(replyTimestamp, { content: streamedText });
+          },
+          onRecommendation: () => {
+            categoryCount += 1;
+            setIsSearchingProducts(true);
+            upsertMessage(replyTimestamp, { content: streamedText || "Looking for gift ideas..." });
+          },
+          onCategory: (category, products) => {
+            streamed[category] = products;
+            if (products.length === 0) return;
+            const snapshot = { ...streamed };
+
+            // Store products globally for navigation to gifts page
+            setAllProducts(snapshot);
+            setHasRecommendations(true);
+            upsertMessage(replyTimestamp, {});
+            upsertMessage(productsTimestamp, {
+              content: `Finding products... ${Object.keys(snapshot).length} of ${categoryCount} categories ready`,
+              products: snapshot,
+            });
+          },
+        }
+      );
       
       if (!response.success) {
         throw new Error("Failed to get AI response");
       }
 
-      // Create assistant message with AI response
-      const assistantMessage: Message = {
-        role: "assistant",
+      // Finalize assistant message with the complete AI response
+      upsertMessage(replyTimestamp, {
         content: response.response || "I've generated some gift recommendations for you!",
-        timestamp: new Date(),
         questions: response.questions,
         recommendations: response.recommendations,
-      };
-
-      setMessages((prev) => [...prev, assistantMessage]);
+      });
       
       // Update context for next message
       setContext(prev => prev + "\nUser: " + currentInput + "\nAssistant: " + response.response);
 
-      // If we have recommendations, search for products
-      if (response.recommendations && Object.keys(response.recommendations).length > 0) {
-        await searchForProducts(response.recommendations);
+      if (productResponse.total_products > 0) {
+        upsertMessage(productsTimestamp, {
+          content: `I found ${productResponse.total_products} products across ${productResponse.total_categories} categories!`,
+          products: productResponse.products,
+        });
+        toast.success(`Found ${productResponse.total_products} gift suggestions!`);
+      } else if (productResponse.total_categories > 0) {
+        toast.error("No products found for the recommendations.");
       }
 
     } catch (error) {
@@ -95,37 +142,6 @@ export const ChatWidget = () => {
       }]);
     } finally {
       setIsLoading(false);
-    }
-  };
-
-  const searchForProducts = async (recommendations: Record<string, string>) => {
-    setIsSearchingProducts(true);
-    
-    try {
-      const productResponse = await giftService.searchProducts(recommendations);
-      
-      if (productResponse.products && Object.keys(productResponse.products).length > 0) {
-        // Store products globally for navigation to gifts page
-        setAllProducts(productResponse.products);
-        setHasRecommendations(true);
-        
-        // Add products message
-        const productsMessage: Message = {
-          role: "assistant",
-          content: `I found ${productResponse.total_products} products across ${productResponse.total_categories} categories!`,
-          timestamp: new Date(),
-          products: productResponse.products,
-        };
-
-        setMessages((prev) => [...prev, productsMessage]);
-        toast.success(`Found ${productResponse.total_products} gift suggestions!`);
-      } else {
-        toast.error("No products found for the recommendations.");
-      }
-    } catch (error) {
-      console.error("Product search error:", error);
-      toast.error("Failed to search for products.");
-    } finally {
       setIsSearchingProducts(false);
     }
   };
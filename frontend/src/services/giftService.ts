@@ -25,11 +25,59 @@ export interface Product {
   shipping?: string;
 }
 
+export interface ChatStreamHandlers {
+  onResponseText?: (text: string) => void;
+  onRecommendation?: (category: string, keywords: string) => void;
+  onQuestions?: (questions: string[]) => void;
+  onCategory?: (category: string, products: Product[]) => void;
+}
+
+export interface ChatWithProductsResponse {
+  chat: ChatResponse;
+  products: ProductSearchResponse;
+}
+
 export interface QuestionsResponse {
   questions: string[];
   count: number;
 }
 
+// Read a text/event-stream body and hand each event to the callback
+async function readEventStream(
+  body: ReadableStream<Uint8Array>,
+  onEvent: (event: string, data: any) => void
+): Promise<void> {
+  const reader = body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+
+  while (true) {
+    const { done, value } = await reader.read();
+    if (done) break;
+
+    buffer += decoder.decode(value, { stream: true });
+    let boundary = buffer.indexOf('\n\n');
+    while (boundary !== -1) {
+      const rawEvent = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+      boundary = buffer.indexOf('\n\n');
+
+      let event = 'message';
+      const dataLines: string[] = [];
+      for (const line of rawEvent.split('\n')) {
+        if (line.startsWith('event:')) {
+          event = line.slice(6).trim();
+        } else if (line.startsWith('data:')) {
+          dataLines.push(line.slice(5).trim());
+        }
+      }
+      if (dataLines.length > 0) {
+        onEvent(event, JSON.parse(dataLines.join('\n')));
+      }
+    }
+  }
+}
+
 class GiftRecommendationService {
   private baseUrl: string;
 
@@ -67,7 +115,76 @@ class GiftRecommendationService {
     }
   }
 
-  async searchProducts(recommendations: Record<string, string>): Promise<ProductSearchResponse> {
+  async chatWithProductsStream(
+    message: string,
+    context: string = '',
+    preferences: Record<string, any> = {},
+    handlers: ChatStreamHandlers = {}
+  ): Promise<ChatWithProductsResponse> {
+    try {
+      const response = await fetch(`${this.baseUrl}/chat-products/stream`, {
+        method: 'POST',
+        headers: {
+          'Content-Type': 'application/json',
+        },
+        body: JSON.stringify({
+          message,
+          context,
+          preferences
+        })
+      });
+
+      if (!response.ok || !response.body) {
+        throw new Error(`HTTP error! status: ${response.status}`);
+      }
+
+      let chat: ChatResponse | null = null;
+      let streamError: string | null = null;
+      const products: Record<string, Product[]> = {};
+      let totalProducts = 0;
+      let totalCategories = 0;
+
+      await readEventStream(response.body, (event, data) => {
+        if (event === 'response') {
+          handlers.onResponseText?.(data.text);
+        } else if (event === 'recommendation') {
+          handlers.onRecommendation?.(data.category, data.keywords);
+        } else if (event === 'questions') {
+          handlers.onQuestions?.(data.questions);
+        } else if (event === 'done') {
+          chat = data;
+        } else if (event === 'error') {
+          streamError = data.error;
+        } else if (event === 'category') {
+          products[data.category] = data.products;
+          handlers.onCategory?.(data.category, data.products);
+        } else if (event === 'summary') {
+          totalProducts = data.total_products;
+          totalCategories = data.total_categories;
+        }
+      });
+
+      if (!chat) {
+        throw new Error(streamError || 'Chat stream ended without a response');
+      }
+      return {
+        chat,
+        products: {
+          products,
+          total_categories: totalCategories,
+          total_products: totalProducts
+        }
+      };
+    } catch (error) {
+      console.error('Error streaming chat with products:', error);
+      throw error;
+    }
+  }
+
+  async searchProducts(
+    recommendations: Record<string, string>,
+    preferences: Record<string, any> = {}
+  ): Promise<ProductSearchResponse> {
     try {
       const response = await fetch(`${this.baseUrl}/search-products`, {
         method: 'POST',
@@ -75,7 +192,8 @@ class GiftRecommendationService {
           'Content-Type': 'application/json',
         },
         body: JSON.stringify({
-          recommendations
+          recommendations,
+          preferences
         })
       });
 